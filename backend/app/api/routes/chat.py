@@ -7,12 +7,13 @@ router = APIRouter()
 @router.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     try:
-        result = agent_service.chat(request.message, request.session_id)
+        result = await agent_service.achat(request.message, request.session_id)
         
         return ChatResponse(
             response=result["response"],
             session_id=request.session_id,
-            appointment_id=result.get("appointment_id")
+            appointment_id=result.get("appointment_id"),
+            prompt_tokens=result.get("prompt_tokens")
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from backend.app.services.agent_service import agent_service
+from src.mcp_tools.export import FORMATS, MEDIA_TYPES, export_chunks
+
+router = APIRouter()
+
+@router.get("/export/appointments")
+def export_appointments(start_date: str, end_date: Optional[str] = None, format: str = "csv",
+                        doctor_name: Optional[str] = None, include_cancelled: bool = True):
+    """Stream every appointment in the date range as CSV or Parquet"""
+    try:
+        first = datetime.strptime(start_date, '%Y-%m-%d')
+        last = datetime.strptime(end_date or start_date, '%Y-%m-%d')
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be YYYY-MM-DD")
+    if last < first:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(FORMATS)}")
+    if format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=501, detail="Parquet export needs pyarrow installed")
+
+    doctor_id = None
+    if doctor_name:
+        doctor = agent_service.analytics_tool.directory.resolve(doctor_name)
+        if not doctor:
+            raise HTTPException(status_code=404, detail=f"Doctor {doctor_name} not found")
+        doctor_id = doctor['id']
+
+    filename = f"appointments_{first:%Y-%m-%d}_{last:%Y-%m-%d}.{format}"
+    return StreamingResponse(
+        export_chunks(format, first, last + timedelta(days=1), doctor_id, include_cancelled),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
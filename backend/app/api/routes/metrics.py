@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from backend.app.services.agent_service import agent_service
+
+router = APIRouter()
+
+@router.get("/metrics")
+async def metrics():
+    return {
+        "db_pool": agent_service.db_tool.pool.stats(),
+        "booked_interval_cache": agent_service.db_tool.cache_stats(),
+        "sessions": agent_service.session_store.stats(),
+        "notification_outbox": agent_service.outbox_worker.stats(),
+    }
@@ -1,12 +1,24 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from backend.app.api.routes import chat
+from backend.app.api.routes import chat, export, metrics
 from backend.app.models.schemas import HealthResponse
+from backend.app.services.agent_service import agent_service
+from src.mcp_tools.db_pool import close_pool
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    agent_service.start()
+    yield
+    agent_service.shutdown()
+    # Last, after the outbox worker has stopped using it
+    close_pool()
 
 app = FastAPI(
     title="Doctor Appointment Agent API",
     description="AI-powered appointment scheduling system",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -18,6 +30,8 @@ app.add_middleware(
 )
 
 app.include_router(chat.router, prefix="/api", tags=["chat"])
+app.include_router(metrics.router, prefix="/api", tags=["metrics"])
+app.include_router(export.router, prefix="/api", tags=["export"])
 
 @app.get("/", response_model=HealthResponse)
 async def root():
@@ -11,6 +11,7 @@ class ChatResponse(BaseModel):
     response: str
     session_id: str
     appointment_id: Optional[int] = None
+    prompt_tokens: Optional[int] = None
     
 class HealthResponse(BaseModel):
     """Health check response"""
@@ -1,5 +1,6 @@
 import os
 import sys
+import asyncio
 from typing import Dict, Optional
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -17,6 +18,10 @@ from src.mcp_tools.calendar_tool import CalendarTool
 from src.mcp_tools.email_tool import EmailTool
 from src.mcp_tools.analytics_tool import AnalyticsTool
 from src.mcp_tools.slack_tool import SlackTool
+from src.mcp_tools.outbox import OutboxWorker, booking_handlers, booking_batch_handlers
+from backend.app.services.session_store import create_session_store
+from backend.app.services.history_manager import HistoryManager
+from backend.app.services.tool_executor import ToolExecutor
 
 load_dotenv()
 
@@ -36,7 +41,33 @@ class AgentService:
         self.analytics_tool = AnalyticsTool()
         self.slack_tool = SlackTool()
         
-        self.sessions: Dict[str, list] = {}
+        # Calendar events and confirmation emails are delivered from the
+        # outbox after the booking commits, off the request path
+        self.outbox_worker = OutboxWorker(
+            booking_handlers(self.calendar_tool, self.email_tool),
+            batch_handlers=booking_batch_handlers(self.calendar_tool),
+            workers=int(os.getenv("OUTBOX_WORKERS", "2")),
+            batch_size=int(os.getenv("OUTBOX_BATCH_SIZE", "50")),
+            max_attempts=int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8")),
+            poll_interval=float(os.getenv("OUTBOX_POLL_INTERVAL", "5"))
+        )
+        
+        self.session_store = create_session_store()
+        self.history_manager = HistoryManager(
+            token_budget=int(os.getenv("HISTORY_TOKEN_BUDGET", "8000")),
+            keep_recent_turns=int(os.getenv("HISTORY_RECENT_TURNS", "3"))
+        )
+        
+        # Bounded pool for blocking tool calls; writes listed in AGENT_SERIAL_TOOLS
+        # run one at a time in the order the model asked for them
+        self.tool_executor = ToolExecutor(
+            max_workers=int(os.getenv("AGENT_TOOL_WORKERS", "8")),
+            serialized=[
+                name.strip()
+                for name in os.getenv("AGENT_SERIAL_TOOLS", "book_appointment").split(",")
+                if name.strip()
+            ]
+        )
         self.current_date = datetime.now()
         
         self.system_instruction = f"""You are an intelligent appointment scheduling assistant for a medical clinic.
@@ -53,14 +84,19 @@ When handling dates:
 
 You have access to these tools:
 1. check_availability - Check doctor's available time slots
-2. book_appointment - Book an appointment for a patient
-3. get_report - Generate analytics reports (patient counts, appointment stats)
+2. find_available_slots - Find the earliest free slots for a doctor or specialty across a date range
+3. book_appointment - Book an appointment for a patient
+4. get_report - Generate analytics reports (patient counts, appointment stats)
+
+For open-ended requests like "earliest cardiology slot this week", use find_available_slots once
+instead of calling check_availability for every doctor and day.
 
 For analytics queries like "how many appointments today", "patients yesterday", use the get_report tool with the appropriate query_type:
 - "today_appointments" - appointments today
 - "tomorrow_appointments" - appointments tomorrow  
 - "yesterday_visits" - unique patients yesterday
-- "summary_report" - full summary report
+- "summary_report" - full summary report (window: "day" by default, or "week" / "month")
+- "utilization" - how full doctors are: booked vs working minutes per day and the longest free gap (start_date, end_date)
 
 Always use function calls for data retrieval. Never output raw JSON to the user.
 Always be professional, friendly, and clear."""
@@ -82,6 +118,24 @@ Always be professional, friendly, and clear."""
                             'required': ['doctor_name', 'date']
                         },
                     ),
+                    types.FunctionDeclaration(
+                        name='find_available_slots',
+                        description='Find the earliest free slots for a doctor name or specialty across a date range',
+                        parameters={
+                            'type': 'object',
+                            'properties': {
+                                'doctor_or_specialty': {
+                                    'type': 'string',
+                                    'description': 'Doctor name (e.g. Dr. Ahuja) or specialty (e.g. Cardiology)'
+                                },
+                                'start_date': {'type': 'string', 'description': 'YYYY-MM-DD'},
+                                'end_date': {'type': 'string', 'description': 'YYYY-MM-DD, inclusive'},
+                                'time_preference': {'type': 'string'},
+                                'limit': {'type': 'integer', 'description': 'Maximum number of slots to return'},
+                            },
+                            'required': ['doctor_or_specialty', 'start_date']
+                        },
+                    ),
                     types.FunctionDeclaration(
                         name='book_appointment',
                         description='Book an appointment',
@@ -104,12 +158,24 @@ Always be professional, friendly, and clear."""
                             'properties': {
                                 'query_type': {
                                     'type': 'string',
-                                    'description': 'Type of report: today_appointments, tomorrow_appointments, yesterday_visits, or summary_report'
+                                    'description': 'Type of report: today_appointments, tomorrow_appointments, yesterday_visits, summary_report, or utilization'
                                 },
                                 'doctor_name': {
                                     'type': 'string',
                                     'description': 'Optional: filter by doctor name'
                                 },
+                                'window': {
+                                    'type': 'string',
+                                    'description': 'Optional for summary_report: day (yesterday to tomorrow, default), week or month'
+                                },
+                                'start_date': {
+                                    'type': 'string',
+                                    'description': 'For utilization: first date in YYYY-MM-DD format (default today)'
+                                },
+                                'end_date': {
+                                    'type': 'string',
+                                    'description': 'For utilization: last date in YYYY-MM-DD format (default start_date)'
+                                },
                             },
                             'required': ['query_type']
                         },
@@ -119,9 +185,7 @@ Always be professional, friendly, and clear."""
         ]
     
     def get_session_history(self, session_id: str) -> list:
-        if session_id not in self.sessions:
-            self.sessions[session_id] = []
-        return self.sessions[session_id]
+        return self.session_store.load(session_id)
     
     def process_function_call(self, function_name: str, args: dict) -> dict:
             try:
@@ -132,29 +196,23 @@ Always be professional, friendly, and clear."""
                         time_preference=args.get("time_preference")
                     )
             
+                elif function_name == "find_available_slots":
+                    return self.db_tool.find_available_slots(
+                        doctor_or_specialty=args.get("doctor_or_specialty"),
+                        start_date=args.get("start_date"),
+                        end_date=args.get("end_date"),
+                        time_preference=args.get("time_preference"),
+                        limit=args.get("limit", 10)
+                    )
+            
                 elif function_name == "book_appointment":
                     result = self.db_tool.book_appointment(
                         doctor_name=args.get("doctor_name"),
                         patient_name=args.get("patient_name"),
                         patient_email=args.get("patient_email"),
-                        appointment_datetime=args.get("appointment_datetime")
+                        appointment_datetime=args.get("appointment_datetime"),
+                        enqueue_notifications=True
                     )
-                
-                    if result.get("success"):
-                        self.calendar_tool.create_event(
-                            doctor_email=result["doctor_email"],
-                            patient_name=result["patient"],
-                            patient_email=result["patient_email"],
-                            start_time_iso=result["time"]
-                     )
-                    
-                        self.email_tool.send_confirmation(
-                            to_email=result["patient_email"],
-                            patient_name=result["patient"],
-                            doctor_name=result["doctor"],
-                            appointment_time=result["formatted_time"]
-                        )
-                
                     return result
             
                 elif function_name == "get_report":
@@ -168,7 +226,9 @@ Always be professional, friendly, and clear."""
                     elif query_type == "yesterday_visits":
                         result = self.analytics_tool.get_yesterday_visits()
                     elif query_type == "summary_report":
-                        report_text = self.analytics_tool.generate_summary_report(doctor_name)
+                        report_text = self.analytics_tool.generate_summary_report(
+                            doctor_name, args.get("window", "day")
+                        )
 
                          # Send to Slack
                         self.slack_tool.send_report(
@@ -180,6 +240,12 @@ Always be professional, friendly, and clear."""
                             "report": report_text,
                             "sent_to_slack": self.slack_tool.enabled
                         }
+                    elif query_type == "utilization":
+                        result = self.analytics_tool.get_utilization(
+                            args.get("start_date") or datetime.now().strftime('%Y-%m-%d'),
+                            args.get("end_date"),
+                            doctor_name
+                        )
                     else:
                         result = {"error": f"Unknown query type: {query_type}"}
             
@@ -194,14 +260,58 @@ Always be professional, friendly, and clear."""
     
     
     
+    def _generation_config(self) -> types.GenerateContentConfig:
+        return types.GenerateContentConfig(
+            system_instruction=self.system_instruction,
+            tools=self.tools,
+            temperature=0.7,
+        )
+    
+    def _record_model_turn(self, conversation_history: list, response) -> list:
+        """Append the model's turn to the history and return its function calls"""
+        parts = response.candidates[0].content.parts
+        conversation_history.append(types.Content(role='model', parts=parts))
+        return [part.function_call for part in parts if part.function_call]
+    
+    @staticmethod
+    def _booked_appointment_id(function_calls: list, results: list) -> Optional[int]:
+        appointment_id = None
+        for call, result in zip(function_calls, results):
+            if call.name == "book_appointment" and result.get("success"):
+                appointment_id = result.get("appointment_id")
+        return appointment_id
+    
+    @staticmethod
+    def _prompt_tokens(response, estimated_tokens: int) -> int:
+        """Prompt tokens the API billed for this call, or our estimate if it didn't say"""
+        usage = getattr(response, 'usage_metadata', None)
+        if usage is not None and usage.prompt_token_count:
+            return usage.prompt_token_count
+        return estimated_tokens
+    
+    @staticmethod
+    def _function_response_part(function_name: str, result: dict) -> types.Part:
+        return types.Part(
+            function_response=types.FunctionResponse(
+                name=function_name,
+                response={'result': result}
+            )
+        )
+    
     def chat(self, message: str, session_id: str) -> dict:
         conversation_history = self.get_session_history(session_id)
-        
+        try:
+            return self._run_chat(conversation_history, message)
+        finally:
+            self.session_store.save(session_id, self.history_manager.compact(conversation_history))
+    
+    def _run_chat(self, conversation_history: list, message: str) -> dict:
         conversation_history.append(
             types.Content(role='user', parts=[types.Part(text=message)])
         )
         
         appointment_id = None
+        prompt_tokens = 0
         max_iterations = 5
         iteration = 0
         
@@ -209,47 +319,104 @@ Always be professional, friendly, and clear."""
             iteration += 1
             
             try:
+                contents, estimated_tokens = self.history_manager.build_prompt(conversation_history)
                 response = self.client.models.generate_content(
                     model=self.model,
-                    contents=conversation_history,
-                    config=types.GenerateContentConfig(
-                        system_instruction=self.system_instruction,
-                        tools=self.tools,
-                        temperature=0.7,
-                    )
+                    contents=contents,
+                    config=self._generation_config()
                 )
+                prompt_tokens += self._prompt_tokens(response, estimated_tokens)
+                
+                function_calls = self._record_model_turn(conversation_history, response)
                 
-                conversation_history.append(
-                    types.Content(
-                        role='model',
-                        parts=response.candidates[0].content.parts
+                if function_calls:
+                    results = self.tool_executor.run_all(
+                        self.process_function_call,
+                        [(call.name, dict(call.args or {})) for call in function_calls]
                     )
+                    appointment_id = self._booked_appointment_id(function_calls, results) or appointment_id
+                    function_responses = [
+                        self._function_response_part(call.name, result)
+                        for call, result in zip(function_calls, results)
+                    ]
+                    
+                    conversation_history.append(
+                        types.Content(role='user', parts=function_responses)
+                    )
+                    continue
+                else:
+                    return {
+                        "response": response.text,
+                        "appointment_id": appointment_id,
+                        "prompt_tokens": prompt_tokens
+                    }
+                    
+            except Exception as e:
+                return {
+                    "response": f"I apologize, but I encountered an error: {str(e)}",
+                    "appointment_id": None
+                }
+        
+        return {
+            "response": "I apologize, but I reached the maximum number of tool calls.",
+            "appointment_id": None,
+            "prompt_tokens": prompt_tokens
+        }
+    
+    async def achat(self, message: str, session_id: str) -> dict:
+        """Async variant of chat() that never blocks the event loop.
+        
+        The model call goes through the async Gemini client; the blocking
+        tools (pooled Postgres, SMTP, Calendar) and session store I/O run
+        on a bounded executor.
+        """
+        loop = asyncio.get_running_loop()
+        conversation_history = await loop.run_in_executor(
+            self.tool_executor.pool, self.get_session_history, session_id
+        )
+        try:
+            return await self._arun_chat(conversation_history, message)
+        finally:
+            await loop.run_in_executor(
+                self.tool_executor.pool, self.session_store.save, session_id,
+                self.history_manager.compact(conversation_history)
+            )
+    
+    async def _arun_chat(self, conversation_history: list, message: str) -> dict:
+        conversation_history.append(
+            types.Content(role='user', parts=[types.Part(text=message)])
+        )
+        
+        appointment_id = None
+        prompt_tokens = 0
+        max_iterations = 5
+        iteration = 0
+        
+        while iteration < max_iterations:
+            iteration += 1
+            
+            try:
+                contents, estimated_tokens = self.history_manager.build_prompt(conversation_history)
+                response = await self.client.aio.models.generate_content(
+                    model=self.model,
+                    contents=contents,
+                    config=self._generation_config()
                 )
+                prompt_tokens += self._prompt_tokens(response, estimated_tokens)
                 
-                has_function_call = False
-                function_responses = []
-                
-                for part in response.candidates[0].content.parts:
-                    if part.function_call:
-                        has_function_call = True
-                        function_name = part.function_call.name
-                        function_args = dict(part.function_call.args)
-                        
-                        result = self.process_function_call(function_name, function_args)
-                        
-                        if function_name == "book_appointment" and result.get("success"):
-                            appointment_id = result.get("appointment_id")
-                        
-                        function_responses.append(
-                            types.Part(
-                                function_response=types.FunctionResponse(
-                                    name=function_name,
-                                    response={'result': result}
-                                )
-                            )
-                        )
+                function_calls = self._record_model_turn(conversation_history, response)
                 
-                if has_function_call:
+                if function_calls:
+                    results = await self.tool_executor.arun_all(
+                        self.process_function_call,
+                        [(call.name, dict(call.args or {})) for call in function_calls]
+                    )
+                    appointment_id = self._booked_appointment_id(function_calls, results) or appointment_id
+                    function_responses = [
+                        self._function_response_part(call.name, result)
+                        for call, result in zip(function_calls, results)
+                    ]
+                    
                     conversation_history.append(
                         types.Content(role='user', parts=function_responses)
                     )
@@ -257,7 +424,8 @@ Always be professional, friendly, and clear."""
                 else:
                     return {
                         "response": response.text,
-                        "appointment_id": appointment_id
+                        "appointment_id": appointment_id,
+                        "prompt_tokens": prompt_tokens
                     }
                     
             except Exception as e:
@@ -268,11 +436,19 @@ Always be professional, friendly, and clear."""
         
         return {
             "response": "I apologize, but I reached the maximum number of tool calls.",
-            "appointment_id": None
+            "appointment_id": None,
+            "prompt_tokens": prompt_tokens
         }
     
     def clear_session(self, session_id: str):
-        if session_id in self.sessions:
-            del self.sessions[session_id]
+        self.session_store.delete(session_id)
+    
+    def start(self):
+        self.outbox_worker.start()
+    
+    def shutdown(self):
+        self.outbox_worker.stop()
+        self.tool_executor.shutdown()
+        self.email_tool.close()
 
 agent_service = AgentService()
\ No newline at end of file
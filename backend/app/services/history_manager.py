@@ -0,0 +1,113 @@
+import json
+from typing import Any, List, Tuple
+
+from google.genai import types
+
+
+def summarize_value(value: Any, max_items: int = 3, max_chars: int = 160) -> str:
+    """Short, human-readable rendering of a tool result value"""
+    if isinstance(value, dict):
+        return "{" + ", ".join(
+            f"{key}: {summarize_value(item, max_items, max_chars)}" for key, item in value.items()
+        ) + "}"
+    if isinstance(value, list):
+        shown = ", ".join(summarize_value(item, max_items, max_chars) for item in value[:max_items])
+        more = f", … {len(value)} total" if len(value) > max_items else ""
+        return f"[{shown}{more}]"
+    text = str(value)
+    return text if len(text) <= max_chars else text[:max_chars] + "…"
+
+
+def summarize_tool_call(call: types.FunctionCall, response: types.FunctionResponse = None) -> str:
+    args = ", ".join(f"{key}={value}" for key, value in (call.args or {}).items())
+    result = (response.response or {}).get('result') if response else None
+    return f"{call.name}({args}) -> {summarize_value(result)}"
+
+
+def _is_user_message(content: types.Content) -> bool:
+    return content.role == 'user' and any(part.text for part in content.parts or [])
+
+
+class HistoryManager:
+    """Keeps Gemini prompts within a token budget.
+
+    A turn is one user message plus everything the model did to answer it.
+    The most recent turns are sent verbatim; older turns are condensed to
+    the user's text and one model message summarizing each tool call and
+    the final answer. If that is still over budget, the oldest turns go.
+    """
+
+    def __init__(self, token_budget: int = 8000, keep_recent_turns: int = 3,
+                 chars_per_token: float = 4.0):
+        self.token_budget = token_budget
+        self.keep_recent_turns = max(1, keep_recent_turns)
+        self.chars_per_token = chars_per_token
+
+    def estimate_tokens(self, contents: List[types.Content]) -> int:
+        chars = sum(
+            len(json.dumps(content.model_dump(mode='json', exclude_none=True), separators=(',', ':')))
+            for content in contents
+        )
+        return int(chars / self.chars_per_token)
+
+    @staticmethod
+    def split_turns(history: List[types.Content]) -> List[List[types.Content]]:
+        turns: List[List[types.Content]] = []
+        for content in history:
+            if _is_user_message(content) or not turns:
+                turns.append([content])
+            else:
+                turns[-1].append(content)
+        return turns
+
+    @staticmethod
+    def compact_turn(turn: List[types.Content]) -> List[types.Content]:
+        """Condense one turn to its user text and a single summarizing model message"""
+        user_text = " ".join(part.text for part in turn[0].parts or [] if part.text)
+        responses = {}
+        for content in turn[1:]:
+            for part in content.parts or []:
+                if part.function_response:
+                    responses.setdefault(part.function_response.name, []).append(part.function_response)
+
+        notes = []
+        for content in turn[1:]:
+            if content.role != 'model':
+                continue
+            for part in content.parts or []:
+                if part.function_call:
+                    pending = responses.get(part.function_call.name)
+                    response = pending.pop(0) if pending else None
+                    notes.append(f"[tool] {summarize_tool_call(part.function_call, response)}")
+                elif part.text and not part.thought:
+                    notes.append(part.text)
+
+        compacted = [types.Content(role='user', parts=[types.Part(text=user_text)])]
+        if notes:
+            compacted.append(types.Content(role='model', parts=[types.Part(text="\n".join(notes))]))
+        return compacted
+
+    def compact(self, history: List[types.Content]) -> List[types.Content]:
+        """Condense every turn except the most recent ones; no budget applied"""
+        turns = self.split_turns(history)
+        older, recent = turns[:-self.keep_recent_turns], turns[-self.keep_recent_turns:]
+        result = []
+        for turn in older:
+            result.extend(self.compact_turn(turn))
+        for turn in recent:
+            result.extend(turn)
+        return result
+
+    def build_prompt(self, history: List[types.Content]) -> Tuple[List[types.Content], int]:
+        """Contents to send and their estimated token count"""
+        turns = self.split_turns(self.compact(history))
+        sizes = [self.estimate_tokens(turn) for turn in turns]
+        total = sum(sizes)
+
+        # Drop whole turns from the front, always keeping the current one
+        first = 0
+        while total > self.token_budget and first < len(turns) - 1:
+            total -= sizes[first]
+            first += 1
+
+        return [content for turn in turns[first:] for content in turn], total
@@ -0,0 +1,223 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from google.genai import types
+
+from src.mcp_tools.db_pool import get_pool
+
+
+def serialize_history(history: List[types.Content]) -> bytes:
+    """Compact, compressed encoding of a conversation history"""
+    payload = [content.model_dump(mode='json', exclude_none=True) for content in history]
+    return zlib.compress(json.dumps(payload, separators=(',', ':')).encode('utf-8'), 6)
+
+
+def deserialize_history(blob: bytes) -> List[types.Content]:
+    return [types.Content.model_validate(item) for item in json.loads(zlib.decompress(blob))]
+
+
+class SessionStore(ABC):
+    """Where AgentService keeps conversation histories between requests"""
+
+    @abstractmethod
+    def load(self, session_id: str) -> List[types.Content]:
+        """The saved history, or [] for an unknown or expired session"""
+
+    @abstractmethod
+    def save(self, session_id: str, history: List[types.Content]):
+        pass
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        pass
+
+    def stats(self) -> Dict:
+        return {}
+
+
+class MemorySessionStore(SessionStore):
+    """In-process LRU with idle TTL and a cap on total serialized bytes"""
+
+    def __init__(self, max_sessions: int = 10_000, max_bytes: int = 64 * 1024 * 1024,
+                 ttl_seconds: float = 3600.0):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _drop(self, session_id: str):
+        _, blob = self._sessions.pop(session_id)
+        self._bytes -= len(blob)
+
+    def load(self, session_id: str) -> List[types.Content]:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return []
+            if time.monotonic() - entry[0] >= self.ttl_seconds:
+                self._drop(session_id)
+                return []
+            blob = entry[1]
+            self._sessions[session_id] = (time.monotonic(), blob)
+            self._sessions.move_to_end(session_id)
+        return deserialize_history(blob)
+
+    def save(self, session_id: str, history: List[types.Content]):
+        blob = serialize_history(history)
+        now = time.monotonic()
+        with self._lock:
+            if session_id in self._sessions:
+                self._drop(session_id)
+            self._sessions[session_id] = (now, blob)
+            self._bytes += len(blob)
+
+            # Least recently used (and so any expired) sessions sit at the front
+            while self._sessions and (
+                len(self._sessions) > self.max_sessions
+                or self._bytes > self.max_bytes
+                or now - next(iter(self._sessions.values()))[0] >= self.ttl_seconds
+            ):
+                oldest = next(iter(self._sessions))
+                if oldest == session_id:
+                    break
+                self._drop(oldest)
+                self.evictions += 1
+
+    def delete(self, session_id: str):
+        with self._lock:
+            if session_id in self._sessions:
+                self._drop(session_id)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "sessions": len(self._sessions),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+            }
+
+
+class SQLiteSessionStore(SessionStore):
+    """File-backed store that every uvicorn worker on the host can share"""
+
+    def __init__(self, path: str = "sessions.db", ttl_seconds: float = 3600.0):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS agent_sessions (
+                    session_id TEXT PRIMARY KEY,
+                    history BLOB NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_agent_sessions_updated ON agent_sessions (updated_at)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load(self, session_id: str) -> List[types.Content]:
+        row = self._connection().execute(
+            "SELECT history FROM agent_sessions WHERE session_id = ? AND updated_at >= ?",
+            (session_id, time.time() - self.ttl_seconds)
+        ).fetchone()
+        return deserialize_history(row[0]) if row else []
+
+    def save(self, session_id: str, history: List[types.Content]):
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute("""
+                INSERT INTO agent_sessions (session_id, history, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT (session_id) DO UPDATE
+                SET history = excluded.history, updated_at = excluded.updated_at
+            """, (session_id, serialize_history(history), now))
+            conn.execute("DELETE FROM agent_sessions WHERE updated_at < ?", (now - self.ttl_seconds,))
+
+    def delete(self, session_id: str):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM agent_sessions WHERE session_id = ?", (session_id,))
+
+    def stats(self) -> Dict:
+        count, total = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(history)), 0) FROM agent_sessions"
+        ).fetchone()
+        return {"backend": "sqlite", "sessions": count, "bytes": total}
+
+
+class PostgresSessionStore(SessionStore):
+    """Shares sessions across workers and hosts through the agent_sessions table"""
+
+    def __init__(self, pool=None, ttl_seconds: float = 3600.0):
+        self.pool = pool or get_pool()
+        self.ttl_seconds = ttl_seconds
+
+    def load(self, session_id: str) -> List[types.Content]:
+        with self.pool.connection() as conn, conn.cursor() as cur:
+            cur.execute("""
+                SELECT history FROM agent_sessions
+                WHERE session_id = %s AND updated_at >= NOW() - make_interval(secs => %s)
+            """, (session_id, self.ttl_seconds))
+            row = cur.fetchone()
+        return deserialize_history(bytes(row[0])) if row else []
+
+    def save(self, session_id: str, history: List[types.Content]):
+        with self.pool.connection() as conn, conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO agent_sessions (session_id, history, updated_at)
+                VALUES (%s, %s, NOW())
+                ON CONFLICT (session_id) DO UPDATE
+                SET history = EXCLUDED.history, updated_at = EXCLUDED.updated_at
+            """, (session_id, serialize_history(history)))
+            cur.execute(
+                "DELETE FROM agent_sessions WHERE updated_at < NOW() - make_interval(secs => %s)",
+                (self.ttl_seconds,)
+            )
+
+    def delete(self, session_id: str):
+        with self.pool.connection() as conn, conn.cursor() as cur:
+            cur.execute("DELETE FROM agent_sessions WHERE session_id = %s", (session_id,))
+
+    def stats(self) -> Dict:
+        with self.pool.connection() as conn, conn.cursor() as cur:
+            cur.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(history)), 0) FROM agent_sessions")
+            count, total = cur.fetchone()
+        return {"backend": "postgres", "sessions": count, "bytes": total}
+
+
+def create_session_store(backend: Optional[str] = None) -> SessionStore:
+    """Build the store selected by SESSION_STORE (memory, sqlite or postgres)"""
+    backend = (backend or os.getenv("SESSION_STORE", "memory")).lower()
+    ttl = float(os.getenv("SESSION_TTL", "3600"))
+
+    if backend == "memory":
+        return MemorySessionStore(
+            max_sessions=int(os.getenv("SESSION_MAX_COUNT", "10000")),
+            max_bytes=int(os.getenv("SESSION_MAX_BYTES", str(64 * 1024 * 1024))),
+            ttl_seconds=ttl,
+        )
+    if backend == "sqlite":
+        return SQLiteSessionStore(os.getenv("SESSION_SQLITE_PATH", "sessions.db"), ttl_seconds=ttl)
+    if backend == "postgres":
+        return PostgresSessionStore(ttl_seconds=ttl)
+    raise ValueError(f"Unknown SESSION_STORE backend: {backend}")
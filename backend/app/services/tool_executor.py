@@ -0,0 +1,66 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Tuple
+
+ToolCall = Tuple[str, dict]
+
+
+class ToolExecutor:
+    """Runs the function calls from one model turn on a bounded thread pool.
+
+    Independent calls run concurrently. Calls to tools listed in
+    `serialized` (writes such as book_appointment) run one after another in
+    their original order, alongside the parallel reads. Results always
+    come back in the order the model asked for them.
+    """
+
+    def __init__(self, max_workers: int = 8, serialized: Iterable[str] = ("book_appointment",)):
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent-tool")
+        self.serialized = set(serialized)
+
+    def _plan(self, calls: List[ToolCall]) -> Tuple[List[int], List[int]]:
+        parallel = [i for i, (name, _) in enumerate(calls) if name not in self.serialized]
+        serial = [i for i, (name, _) in enumerate(calls) if name in self.serialized]
+        return parallel, serial
+
+    @staticmethod
+    def _run_serial(fn: Callable[[str, dict], Any], calls: List[ToolCall], indexes: List[int]) -> list:
+        return [fn(*calls[i]) for i in indexes]
+
+    def run_all(self, fn: Callable[[str, dict], Any], calls: List[ToolCall]) -> list:
+        """Blocking: execute every call and return results in call order"""
+        if len(calls) <= 1:
+            return [fn(name, args) for name, args in calls]
+
+        parallel, serial = self._plan(calls)
+        futures = {i: self.pool.submit(fn, *calls[i]) for i in parallel}
+        serial_future = self.pool.submit(self._run_serial, fn, calls, serial) if serial else None
+
+        results = [None] * len(calls)
+        for i, future in futures.items():
+            results[i] = future.result()
+        if serial_future is not None:
+            for i, result in zip(serial, serial_future.result()):
+                results[i] = result
+        return results
+
+    async def arun_all(self, fn: Callable[[str, dict], Any], calls: List[ToolCall]) -> list:
+        """Async: same as run_all without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        parallel, serial = self._plan(calls)
+
+        tasks = [loop.run_in_executor(self.pool, fn, *calls[i]) for i in parallel]
+        if serial:
+            tasks.append(loop.run_in_executor(self.pool, self._run_serial, fn, calls, serial))
+        outcomes = await asyncio.gather(*tasks)
+
+        results = [None] * len(calls)
+        for i, result in zip(parallel, outcomes):
+            results[i] = result
+        if serial:
+            for i, result in zip(serial, outcomes[-1]):
+                results[i] = result
+        return results
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False)
@@ -0,0 +1,78 @@
+"""Scratch schema with synthetic appointment history for database benchmarks.
+
+Everything is created in a throwaway schema placed first on the session's
+search_path, so migrations and queries with unqualified table names run
+against the synthetic data and the real tables are never touched.
+"""
+from contextlib import contextmanager
+
+SCHEMA_DDL = """
+CREATE TABLE doctors (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    specialty VARCHAR(100),
+    email VARCHAR(100)
+);
+
+CREATE TABLE doctor_availability (
+    id SERIAL PRIMARY KEY,
+    doctor_id INTEGER REFERENCES doctors(id),
+    day_of_week INTEGER NOT NULL,
+    start_time TIME NOT NULL,
+    end_time TIME NOT NULL
+);
+
+CREATE TABLE appointments (
+    id SERIAL PRIMARY KEY,
+    doctor_id INTEGER REFERENCES doctors(id),
+    patient_name VARCHAR(100) NOT NULL,
+    patient_email VARCHAR(100),
+    appointment_time TIMESTAMP NOT NULL,
+    duration_minutes INTEGER DEFAULT 30,
+    status VARCHAR(20) DEFAULT 'confirmed'
+);
+"""
+
+
+@contextmanager
+def scratch_schema(conn, name: str, appointments: int = 1_000_000,
+                   doctors: int = 50, days: int = 365, patients: int = 200_000):
+    """Create and seed `name`, yield, then drop it again"""
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA IF EXISTS {name} CASCADE")
+        cur.execute(f"CREATE SCHEMA {name}")
+        cur.execute(f"SET search_path TO {name}, public")
+        cur.execute(SCHEMA_DDL)
+        cur.execute("""
+            INSERT INTO doctors (name, specialty, email)
+            SELECT 'Dr. Bench ' || g, 'Specialty ' || (g %% 8), 'bench' || g || '@clinic.com'
+            FROM generate_series(1, %s) g
+        """, (doctors,))
+        cur.execute("""
+            INSERT INTO doctor_availability (doctor_id, day_of_week, start_time, end_time)
+            SELECT d, dow, '09:00', '17:00'
+            FROM generate_series(1, %s) d, generate_series(0, 4) dow
+        """, (doctors,))
+        # Spread rows over `days` days ending today, ~5% cancelled
+        cur.execute("""
+            INSERT INTO appointments
+                (doctor_id, patient_name, patient_email, appointment_time, duration_minutes, status)
+            SELECT 1 + (g %% %(doctors)s),
+                   'Patient ' || (g %% %(patients)s),
+                   'patient' || (g %% %(patients)s) || '@example.com',
+                   date_trunc('day', NOW()) - make_interval(days => (g %% %(days)s))
+                       + make_interval(mins => 540 + 30 * ((g / %(doctors)s) %% 16)),
+                   30,
+                   CASE WHEN g %% 20 = 0 THEN 'cancelled' ELSE 'confirmed' END
+            FROM generate_series(1, %(appointments)s) g
+        """, {
+            "doctors": doctors, "patients": patients, "days": days, "appointments": appointments,
+        })
+        cur.execute("ANALYZE")
+    try:
+        yield
+    finally:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA IF EXISTS {name} CASCADE")
+            cur.execute("SET search_path TO DEFAULT")
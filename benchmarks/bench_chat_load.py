@@ -0,0 +1,59 @@
+"""Concurrent /api/chat load test.
+
+Start the backend first, then run from the project root:
+
+    python -m benchmarks.bench_chat_load --concurrency 1 4 16 32 --requests 64
+
+Each request uses its own session so requests do not share history.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+
+PROMPT = "Check Dr. Ahuja's availability tomorrow morning"
+
+
+async def one_request(client, url, latencies):
+    start = time.perf_counter()
+    response = await client.post(url, json={"message": PROMPT, "session_id": str(uuid.uuid4())})
+    response.raise_for_status()
+    latencies.append(time.perf_counter() - start)
+
+
+async def run_level(url, concurrency, total):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def bounded(client):
+        async with semaphore:
+            await one_request(client, url, latencies)
+
+    async with httpx.AsyncClient(timeout=120) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(bounded(client) for _ in range(total)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"  concurrency={concurrency:<4} {total / elapsed:8.2f} req/s  "
+          f"p50={p50 * 1000:7.0f}ms  p95={p95 * 1000:7.0f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8002/api/chat")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 32])
+    parser.add_argument("--requests", type=int, default=64)
+    args = parser.parse_args()
+
+    print(f"📊 Chat load test against {args.url}")
+    for concurrency in args.concurrency:
+        asyncio.run(run_level(args.url, concurrency, args.requests))
+
+
+if __name__ == "__main__":
+    main()
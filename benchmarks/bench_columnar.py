@@ -0,0 +1,112 @@
+"""Dashboard slices from ColumnarAnalytics vs the equivalent SQL.
+
+Seeds a scratch schema (default 1M appointments), times the COPY BINARY
+load into NumPy columns and an incremental refresh, then runs each slice
+both as a GROUP BY query and against the in-memory columns, checking that
+the answers agree.
+
+    python -m benchmarks.bench_columnar --appointments 1000000
+"""
+import argparse
+import time
+from contextlib import contextmanager
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from benchmarks._seed import scratch_schema
+from src.mcp_tools.columnar_analytics import ColumnarAnalytics
+from src.mcp_tools.db_pool import get_pool
+
+SQL = {
+    "per-doctor count": ("""
+        SELECT doctor_id, COUNT(*) FROM appointments
+        WHERE status != 'cancelled' GROUP BY 1
+    """, lambda rows: dict(rows), lambda engine: engine.count_by("doctor")),
+    "per-doctor minutes": ("""
+        SELECT doctor_id, SUM(duration_minutes) FROM appointments
+        WHERE status != 'cancelled' GROUP BY 1
+    """, lambda rows: dict(rows), lambda engine: engine.count_by("doctor", minutes=True)),
+    "hourly load": ("""
+        SELECT EXTRACT(HOUR FROM appointment_time)::int, COUNT(*) FROM appointments
+        WHERE status != 'cancelled' GROUP BY 1
+    """, lambda rows: [dict(rows).get(h, 0) for h in range(24)],
+        lambda engine: engine.hourly_load()),
+    "weekday heatmap": ("""
+        SELECT (EXTRACT(ISODOW FROM appointment_time)::int - 1) * 24
+                   + EXTRACT(HOUR FROM appointment_time)::int, COUNT(*)
+        FROM appointments WHERE status != 'cancelled' GROUP BY 1
+    """, lambda rows: [[dict(rows).get(d * 24 + h, 0) for h in range(24)] for d in range(7)],
+        lambda engine: engine.weekday_heatmap()),
+    "status breakdown": ("""
+        SELECT status, COUNT(*) FROM appointments GROUP BY 1
+    """, lambda rows: dict(rows), lambda engine: engine.count_by("status")),
+}
+
+
+class SingleConnection:
+    """Pool stand-in that always lends the scratch-schema connection"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    @contextmanager
+    def connection(self):
+        yield self.conn
+
+
+def best_of(fn, repeat):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--appointments", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        print(f"📊 Seeding {args.appointments:,} appointments...")
+        with scratch_schema(conn, "bench_columnar", appointments=args.appointments):
+            with conn.cursor() as cur:
+                # Only this connection has the scratch schema on its search_path
+                engine = ColumnarAnalytics(SingleConnection(conn))
+                load, _ = best_of(engine.load, 1)
+                stats = engine.stats()
+                print(f"\nCOPY load: {stats['rows']:,} rows in {load:.2f}s, "
+                      f"{stats['bytes'] / 1e6:.1f} MB of columns")
+
+                cur.execute("""
+                    INSERT INTO appointments (doctor_id, patient_name, patient_email, appointment_time)
+                    SELECT 1 + g % 50, 'New', 'new@example.com', NOW() + make_interval(days => 400 + g)
+                    FROM generate_series(1, 1000) g
+                """)
+                refresh, read = best_of(engine.refresh, 1)
+                print(f"Incremental refresh: {read:,} new rows in {refresh * 1000:.1f}ms\n")
+
+                print(f"  {'slice':<20} {'SQL':>10} {'NumPy':>10} {'speedup':>9}")
+                for name, (sql, shape, query) in SQL.items():
+                    def run_sql():
+                        cur.execute(sql)
+                        return shape(cur.fetchall())
+
+                    slow, expected = best_of(run_sql, args.repeat)
+                    fast, actual = best_of(lambda: query(engine), args.repeat)
+                    status = "✅" if actual == expected else "❌ mismatch"
+                    print(f"  {name:<20} {slow * 1000:8.2f}ms {fast * 1000:8.2f}ms "
+                          f"{slow / fast:8.1f}x {status}")
+    finally:
+        conn.autocommit = False
+        pool.putconn(conn, discard=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Query plans and latencies for the appointment date predicates.
+
+Seeds a scratch schema (default 1M appointments), then times the old
+DATE(appointment_time) predicates against the half-open range predicates,
+before and after applying migrations/001_appointment_indexes.sql.
+
+    python -m benchmarks.bench_date_queries --appointments 1000000
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from benchmarks._seed import scratch_schema
+from src.mcp_tools.migrate import MIGRATIONS_DIR
+from src.mcp_tools.db_pool import get_pool
+
+DAY = (datetime.now() - timedelta(days=3)).replace(hour=0, minute=0, second=0, microsecond=0)
+WEEK_START = DAY - timedelta(days=6)
+
+QUERIES = {
+    "doctor day (old)": ("""
+        SELECT appointment_time, duration_minutes FROM appointments
+        WHERE doctor_id = %s AND DATE(appointment_time) = %s AND status != 'cancelled'
+        ORDER BY appointment_time
+    """, (7, DAY.date())),
+    "doctor day (new)": ("""
+        SELECT appointment_time, duration_minutes FROM appointments
+        WHERE doctor_id = %s AND appointment_time >= %s AND appointment_time < %s
+        AND status != 'cancelled'
+        ORDER BY appointment_time
+    """, (7, DAY, DAY + timedelta(days=1))),
+    "day count (old)": ("""
+        SELECT COUNT(*) FROM appointments
+        WHERE DATE(appointment_time) = %s AND status != 'cancelled'
+    """, (DAY.date(),)),
+    "day count (new)": ("""
+        SELECT COUNT(*) FROM appointments
+        WHERE appointment_time >= %s AND appointment_time < %s AND status != 'cancelled'
+    """, (DAY, DAY + timedelta(days=1))),
+    "week by day (old)": ("""
+        SELECT DATE(appointment_time), COUNT(*) FROM appointments
+        WHERE DATE(appointment_time) BETWEEN %s AND %s AND status != 'cancelled'
+        GROUP BY DATE(appointment_time)
+    """, (WEEK_START.date(), DAY.date())),
+    "week by day (new)": ("""
+        SELECT DATE(appointment_time), COUNT(*) FROM appointments
+        WHERE appointment_time >= %s AND appointment_time < %s AND status != 'cancelled'
+        GROUP BY DATE(appointment_time)
+    """, (WEEK_START, DAY + timedelta(days=1))),
+}
+
+
+def time_query(cur, sql, params, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cur.execute(sql, params)
+        cur.fetchall()
+        best = min(best, time.perf_counter() - start)
+    cur.execute("EXPLAIN " + sql, params)
+    plan = cur.fetchall()[0][0].strip()
+    return best, plan
+
+
+def report(cur, label, repeat):
+    print(f"\n{label}")
+    for name, (sql, params) in QUERIES.items():
+        best, plan = time_query(cur, sql, params, repeat)
+        print(f"  {name:<20} {best * 1000:9.2f}ms   {plan}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--appointments", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        print(f"📊 Seeding {args.appointments:,} appointments...")
+        with scratch_schema(conn, "bench_date_queries", appointments=args.appointments):
+            with conn.cursor() as cur:
+                report(cur, "Before indexes", args.repeat)
+                cur.execute((MIGRATIONS_DIR / "001_appointment_indexes.sql").read_text())
+                report(cur, "After 001_appointment_indexes", args.repeat)
+    finally:
+        conn.autocommit = False
+        pool.putconn(conn, discard=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Availability and booking throughput through the shared connection pool.
+
+Run from the project root against a seeded database:
+
+    python -m benchmarks.bench_db_pool --workers 1 2 4 8 --ops 400
+
+Every booking takes its own free 30-minute slot inside the doctor's working
+hours, so each one is a real INSERT rather than a rejection. The booked
+interval cache is turned off, so every availability check queries the
+database through the pool.
+"""
+import os
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Every check_availability call misses the cache and borrows a connection
+os.environ["BOOKED_CACHE_TTL"] = "0"
+
+from src.mcp_tools import slot_engine
+from src.mcp_tools.database import DatabaseTool
+from src.mcp_tools.db_pool import get_pool
+
+BENCH_EMAIL = "bench-pool@example.com"
+# Far-future days so benchmark bookings never collide with real ones
+BASE_DATE = date(2099, 1, 5)
+
+
+def run(label, fn, workers, ops):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(fn, range(ops)))
+    elapsed = time.perf_counter() - start
+    errors = sum(1 for result in results if "error" in result)
+    print(f"  {label:<14} workers={workers:<3} {ops / elapsed:10.1f} ops/s  "
+          f"({elapsed:.2f}s, {errors} errors)")
+
+
+def working_slots(db, doctor_id, count):
+    """The first `count` 30-minute slots in the doctor's hours from BASE_DATE on, and their days"""
+    slots, days = [], []
+    day = BASE_DATE
+    while len(slots) < count:
+        free = slot_engine.free_slots(db.schedule.working_intervals(doctor_id, day), [])
+        if free:
+            slots.extend(free)
+            days.append(day)
+        day += timedelta(days=1)
+        if day > BASE_DATE + timedelta(days=3660):
+            raise SystemExit(f"Not enough working hours to place {count} bookings")
+    return slots[:count], days
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--ops", type=int, default=400)
+    parser.add_argument("--doctor", default="Dr. Ahuja")
+    args = parser.parse_args()
+
+    db = DatabaseTool()
+    doctor = db.get_doctor_by_name(args.doctor)
+    if not doctor:
+        raise SystemExit(f"Doctor {args.doctor} not found")
+    slots, days = working_slots(db, doctor['id'], args.ops * len(args.workers))
+
+    def availability(i):
+        return db.check_availability(args.doctor, days[i % len(days)].isoformat())
+
+    print(f"📊 Pool benchmark ({args.ops} ops per run, pool max={get_pool().max_size}, "
+          f"{len(slots)} slots over {len(days)} working days)")
+    with get_pool().connection() as conn, conn.cursor() as cur:
+        cur.execute("DELETE FROM appointments WHERE patient_email = %s", (BENCH_EMAIL,))
+    try:
+        for n, workers in enumerate(args.workers):
+            run_slots = slots[n * args.ops:(n + 1) * args.ops]
+
+            def booking(i):
+                return db.book_appointment(args.doctor, "Bench Patient", BENCH_EMAIL,
+                                           run_slots[i].isoformat())
+
+            run("availability", availability, workers, args.ops)
+            run("booking", booking, workers, args.ops)
+    finally:
+        with get_pool().connection() as conn, conn.cursor() as cur:
+            cur.execute("DELETE FROM appointments WHERE patient_email = %s", (BENCH_EMAIL,))
+        print(f"  pool stats: {get_pool().stats()}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
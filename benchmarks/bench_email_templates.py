@@ -0,0 +1,80 @@
+"""Render + serialize throughput for bulk email: per-call document assembly
+with a MIMEMultipart tree vs the precompiled templates and MessageSkeleton.
+
+    python -m benchmarks.bench_email_templates --messages 100000
+"""
+import argparse
+import re
+import time
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import make_msgid
+
+from src.mcp_tools.email_templates import TEMPLATE_DIR, MessageSkeleton, get_templates
+
+SENDER = "clinic@example.com"
+
+
+def legacy_sources():
+    """The confirmation email as the per-call format strings EmailTool used to build"""
+    def to_format(source):
+        source = source.replace("{", "{{").replace("}", "}}")
+        return re.sub(r"\{\{\{\{\s*(\w+)\s*\}\}\}\}", r"{\1}", source)
+
+    layout = (TEMPLATE_DIR / "layout.html").read_text(encoding="utf-8")
+    body = (TEMPLATE_DIR / "confirmation.html").read_text(encoding="utf-8")
+    text = (TEMPLATE_DIR / "confirmation.txt").read_text(encoding="utf-8").split("\n\n", 1)[1]
+    html = layout.replace("{{> body}}", body.rstrip("\n"))
+    return to_format(text), to_format(html)
+
+
+def legacy_message(text_source, html_source, to_email, values):
+    message = MIMEMultipart("alternative")
+    message["Subject"] = f"✅ Appointment Confirmed - {values['doctor_name']}"
+    message["From"] = f"Doctor Appointment Agent <{SENDER}>"
+    message["To"] = to_email
+    message["Message-ID"] = make_msgid(domain="example.com")
+    message.attach(MIMEText(text_source.format(**values), "plain"))
+    message.attach(MIMEText(html_source.format(**values), "html"))
+    return message.as_string()
+
+
+def compiled_message(skeleton, template, to_email, values):
+    return skeleton.build(template.subject.render(values), to_email,
+                          template.text.render(values), template.html.render(values))
+
+
+def run(label, build, count):
+    start = time.perf_counter()
+    size = 0
+    for i in range(count):
+        size += len(build(f"patient{i}@example.com", {
+            "patient_name": f"Patient {i}",
+            "doctor_name": "Dr. Ahuja",
+            "appointment_time": "Monday, February 16, 2026 at 09:00 AM",
+        }))
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<26} {count / elapsed:10,.0f} msg/s  {elapsed / count * 1e6:7.1f} µs/msg  "
+          f"avg size={size // count} B")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=100_000)
+    args = parser.parse_args()
+
+    text_source, html_source = legacy_sources()
+    skeleton = MessageSkeleton(SENDER)
+    template = get_templates()["confirmation"]
+
+    print(f"Rendering and serializing {args.messages:,} confirmation emails")
+    before = run("format + MIMEMultipart", lambda to, values: legacy_message(
+        text_source, html_source, to, values), args.messages)
+    after = run("compiled + skeleton", lambda to, values: compiled_message(
+        skeleton, template, to, values), args.messages)
+    print(f"  speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
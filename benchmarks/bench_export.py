@@ -0,0 +1,96 @@
+"""Throughput and peak memory of the appointment export paths.
+
+Seeds a scratch schema (default 2M appointments), then exports the whole
+range once per mode, each in a fresh process so its peak RSS is its own:
+
+  fetchall   - plain cursor + fetchall() + csv, the naive baseline
+  csv        - server-side cursor streamed through export_chunks("csv")
+  parquet    - the same batches as Parquet row groups (needs pyarrow)
+  copy-csv   - COPY ... TO STDOUT straight into the file (the CLI's CSV path)
+
+    python -m benchmarks.bench_export --appointments 2000000 --chunk-size 10000
+"""
+import os
+import csv
+import time
+import argparse
+import resource
+import tempfile
+import multiprocessing
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from benchmarks._seed import scratch_schema
+from src.mcp_tools.db_pool import get_pool
+from src.mcp_tools.export import COLUMNS, _SELECT, _params, copy_csv, export_chunks
+
+SCHEMA = "bench_export"
+MODES = ("fetchall", "csv", "parquet", "copy-csv")
+
+
+def export(mode, path, chunk_size, results):
+    # libpq applies PGOPTIONS to every connection this process opens
+    os.environ["PGOPTIONS"] = f"-c search_path={SCHEMA},public"
+    pool = get_pool()
+    if mode == "parquet":
+        import pyarrow.parquet  # noqa: F401  load the library before taking the baseline
+    start, end = datetime(2000, 1, 1), datetime.now() + timedelta(days=1)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    began = time.perf_counter()
+    if mode == "fetchall":
+        with pool.connection() as conn, conn.cursor() as cur:
+            cur.execute(_SELECT, _params(start, end, None, True))
+            rows = cur.fetchall()
+        with open(path, "w", newline="") as out:
+            writer = csv.writer(out, lineterminator="\n")
+            writer.writerow(COLUMNS)
+            writer.writerows(rows)
+    else:
+        with open(path, "wb") as out:
+            if mode == "copy-csv":
+                copy_csv(out, start, end, pool=pool)
+            else:
+                for chunk in export_chunks(mode, start, end, chunk_size=chunk_size, pool=pool):
+                    out.write(chunk)
+    elapsed = time.perf_counter() - began
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KiB on Linux
+    results.put((elapsed, os.path.getsize(path), (peak - baseline) / 1024))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--appointments", type=int, default=2_000_000)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    args = parser.parse_args()
+
+    pool = get_pool()
+    conn = pool.getconn()
+    context = multiprocessing.get_context("spawn")
+    try:
+        print(f"📊 Seeding {args.appointments:,} appointments...")
+        with scratch_schema(conn, SCHEMA, appointments=args.appointments), \
+                tempfile.TemporaryDirectory() as tmp:
+            print(f"\n  {'mode':<10} {'time':>8} {'rows/s':>11} {'size':>9} {'peak RSS +':>11}")
+            for mode in args.modes:
+                results = context.Queue()
+                worker = context.Process(target=export, args=(
+                    mode, os.path.join(tmp, f"export.{mode}"), args.chunk_size, results
+                ))
+                worker.start()
+                elapsed, size, peak_mb = results.get()
+                worker.join()
+                print(f"  {mode:<10} {elapsed:7.2f}s {args.appointments / elapsed:11,.0f} "
+                      f"{size / 1e6:7.1f}MB {peak_mb:9.1f}MB")
+    finally:
+        conn.autocommit = False
+        pool.putconn(conn, discard=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Analytics over raw appointments vs the appointment_daily_rollup table.
+
+Seeds a scratch schema (default 1M appointments over a year), applies
+001_appointment_indexes.sql, times the range queries AnalyticsTool used to
+run against appointments, then applies 009_appointment_daily_rollup.sql
+and times the same answers read from the rollup. Also checks the two agree
+and measures what the trigger adds to single-row inserts.
+
+    python -m benchmarks.bench_rollup --appointments 1000000
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from benchmarks._seed import scratch_schema
+from src.mcp_tools.migrate import MIGRATIONS_DIR
+from src.mcp_tools.db_pool import get_pool
+
+END = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+YEAR = (END - timedelta(days=365), END)
+MONTH = (END - timedelta(days=30), END)
+
+RAW = {
+    "year by day": ("""
+        SELECT DATE(appointment_time), COUNT(*) FROM appointments
+        WHERE appointment_time >= %s AND appointment_time < %s AND status != 'cancelled'
+        GROUP BY 1 ORDER BY 1
+    """, YEAR),
+    "year, one doctor": ("""
+        SELECT DATE(appointment_time), COUNT(*) FROM appointments
+        WHERE appointment_time >= %s AND appointment_time < %s AND doctor_id = 7
+        AND status != 'cancelled'
+        GROUP BY 1 ORDER BY 1
+    """, YEAR),
+    "month by doctor": ("""
+        SELECT doctor_id, COUNT(*) FILTER (WHERE status != 'cancelled'),
+               COUNT(*) FILTER (WHERE status = 'cancelled')
+        FROM appointments
+        WHERE appointment_time >= %s AND appointment_time < %s
+        GROUP BY 1 ORDER BY 1
+    """, MONTH),
+}
+
+ROLLUP = {
+    "year by day": ("""
+        SELECT day, SUM(booked) FROM appointment_daily_rollup
+        WHERE day >= %s AND day < %s
+        GROUP BY 1 HAVING SUM(booked) > 0 ORDER BY 1
+    """, (YEAR[0].date(), YEAR[1].date())),
+    "year, one doctor": ("""
+        SELECT day, booked FROM appointment_daily_rollup
+        WHERE day >= %s AND day < %s AND doctor_id = 7 AND booked > 0
+        ORDER BY 1
+    """, (YEAR[0].date(), YEAR[1].date())),
+    "month by doctor": ("""
+        SELECT doctor_id, SUM(booked), SUM(cancelled) FROM appointment_daily_rollup
+        WHERE day >= %s AND day < %s
+        GROUP BY 1 ORDER BY 1
+    """, (MONTH[0].date(), MONTH[1].date())),
+}
+
+INSERT = """
+    INSERT INTO appointments (doctor_id, patient_name, patient_email, appointment_time, status)
+    VALUES (1 + %s %% 50, 'Bench', 'bench@example.com', %s, 'confirmed')
+"""
+
+
+def run(cur, sql, params, repeat):
+    best, rows = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cur.execute(sql, params)
+        rows = cur.fetchall()
+        best = min(best, time.perf_counter() - start)
+    return best, rows
+
+
+def time_inserts(cur, count):
+    # Far-future, one row per 30-minute step so the exclusion constraint (if any) never trips
+    base = END + timedelta(days=3650)
+    start = time.perf_counter()
+    for i in range(count):
+        cur.execute(INSERT, (i, base + timedelta(minutes=30 * i)))
+    elapsed = time.perf_counter() - start
+    cur.execute("DELETE FROM appointments WHERE appointment_time >= %s", (base,))
+    return elapsed / count
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--appointments", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--inserts", type=int, default=2000)
+    args = parser.parse_args()
+
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        print(f"📊 Seeding {args.appointments:,} appointments...")
+        with scratch_schema(conn, "bench_rollup", appointments=args.appointments):
+            with conn.cursor() as cur:
+                cur.execute((MIGRATIONS_DIR / "001_appointment_indexes.sql").read_text())
+                raw = {name: run(cur, sql, params, args.repeat) for name, (sql, params) in RAW.items()}
+                insert_before = time_inserts(cur, args.inserts)
+
+                start = time.perf_counter()
+                cur.execute((MIGRATIONS_DIR / "009_appointment_daily_rollup.sql").read_text())
+                backfill = time.perf_counter() - start
+                cur.execute("ANALYZE appointment_daily_rollup")
+                cur.execute("SELECT COUNT(*) FROM appointment_daily_rollup")
+                rollup_rows = cur.fetchone()[0]
+                insert_after = time_inserts(cur, args.inserts)
+
+                print(f"\nBackfilled {rollup_rows:,} rollup rows in {backfill:.2f}s\n")
+                print(f"  {'query':<18} {'raw':>10} {'rollup':>10} {'speedup':>9}")
+                for name, (sql, params) in ROLLUP.items():
+                    fast, rows = run(cur, sql, params, args.repeat)
+                    slow, expected = raw[name]
+                    status = "✅" if rows == expected else "❌ mismatch"
+                    print(f"  {name:<18} {slow * 1000:8.2f}ms {fast * 1000:8.2f}ms "
+                          f"{slow / fast:8.1f}x {status}")
+
+                print(f"\nSingle-row insert: {insert_before * 1000:.3f}ms before trigger, "
+                      f"{insert_after * 1000:.3f}ms after")
+    finally:
+        conn.autocommit = False
+        pool.putconn(conn, discard=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Memory use and throughput of the session stores under 10k simulated sessions.
+
+    python -m benchmarks.bench_session_store --sessions 10000 --turns 4
+"""
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+from google.genai import types
+
+from backend.app.services.session_store import MemorySessionStore, SQLiteSessionStore
+
+
+def simulated_history(session: int, turns: int):
+    history = []
+    for turn in range(turns):
+        history.append(types.Content(role='user', parts=[types.Part(
+            text=f"Session {session}: please check Dr. Ahuja's availability on day {turn}"
+        )]))
+        history.append(types.Content(role='model', parts=[types.Part(
+            function_call=types.FunctionCall(
+                name='check_availability',
+                args={'doctor_name': 'Dr. Ahuja', 'date': f'2026-02-{10 + turn:02d}'}
+            )
+        )]))
+        history.append(types.Content(role='user', parts=[types.Part(
+            function_response=types.FunctionResponse(
+                name='check_availability',
+                response={'result': {
+                    'available': True, 'doctor': 'Dr. Ahuja', 'doctor_id': 1,
+                    'date': 'Tuesday, February 17, 2026',
+                    'slots': [f"{h:02d}:{m:02d}" for h in range(9, 17) for m in (0, 30)],
+                }}
+            )
+        )]))
+        history.append(types.Content(role='model', parts=[types.Part(
+            text="Dr. Ahuja has 16 open slots that day, from 9:00 AM to 4:30 PM."
+        )]))
+    return history
+
+
+def measure(label, build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    keep = build()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<28} retained={current / 2**20:8.1f} MiB  peak={peak / 2**20:8.1f} MiB  "
+          f"build={elapsed:6.2f}s")
+    return keep
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=10_000)
+    parser.add_argument("--turns", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"📊 {args.sessions:,} sessions x {args.turns} turns")
+
+    def plain_dict():
+        return {f"s{i}": simulated_history(i, args.turns) for i in range(args.sessions)}
+
+    def memory_store():
+        store = MemorySessionStore(max_sessions=args.sessions, max_bytes=1 << 40)
+        for i in range(args.sessions):
+            store.save(f"s{i}", simulated_history(i, args.turns))
+        return store
+
+    measure("dict of types.Content", plain_dict)
+    store = measure("MemorySessionStore", memory_store)
+    print(f"  serialized bytes: {store.stats()['bytes'] / 2**20:.1f} MiB")
+
+    start = time.perf_counter()
+    for i in range(args.sessions):
+        store.load(f"s{i}")
+    print(f"  memory load:  {args.sessions / (time.perf_counter() - start):10.0f} sessions/s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_store = SQLiteSessionStore(os.path.join(tmp, "sessions.db"))
+        start = time.perf_counter()
+        for i in range(args.sessions):
+            sqlite_store.save(f"s{i}", simulated_history(i, args.turns))
+        print(f"  sqlite save:  {args.sessions / (time.perf_counter() - start):10.0f} sessions/s")
+        start = time.perf_counter()
+        for i in range(args.sessions):
+            sqlite_store.load(f"s{i}")
+        print(f"  sqlite load:  {args.sessions / (time.perf_counter() - start):10.0f} sessions/s")
+
+
+if __name__ == "__main__":
+    main()
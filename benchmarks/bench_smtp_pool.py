@@ -0,0 +1,126 @@
+"""Per-message SMTP latency: a fresh connection per email vs the pooled sender.
+
+Runs against a local aiosmtpd stand-in (pip install aiosmtpd). --rtt adds a
+delay to every SMTP reply to model the round trips to a real provider. EHLO
+additionally waits --handshake-rtts round trips, standing in for the TCP,
+STARTTLS/TLS and AUTH exchanges that the stand-in does not perform.
+
+    python -m benchmarks.bench_smtp_pool --messages 200 --rtt 5
+"""
+import argparse
+import asyncio
+import logging
+import smtplib
+import socket
+import statistics
+import time
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+
+from src.mcp_tools.smtp_pool import SMTPPool
+
+SENDER = "clinic@example.com"
+MESSAGE = "Subject: Appointment Confirmed\r\n\r\nSee you on Monday at 9:00 AM."
+
+
+class SlowSink:
+    """Accepts everything after sleeping for one simulated round trip"""
+
+    def __init__(self, rtt: float, handshake_rtts: int):
+        self.rtt = rtt
+        self.handshake_rtts = handshake_rtts
+        self.received = 0
+
+    async def _wait(self, round_trips: int = 1):
+        await asyncio.sleep(self.rtt * round_trips)
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        await self._wait(1 + self.handshake_rtts)
+        session.host_name = hostname
+        return responses
+
+    async def handle_MAIL(self, server, session, envelope, address, mail_options):
+        await self._wait()
+        envelope.mail_from = address
+        return "250 OK"
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        await self._wait()
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        await self._wait()
+        self.received += 1
+        return "250 Message accepted"
+
+
+def accept_all(server, session, envelope, mechanism, auth_data):
+    return AuthResult(success=True)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def fresh_connection(host, port, to_email):
+    """What EmailTool used to do for every email"""
+    with smtplib.SMTP(host, port) as server:
+        server.login(SENDER, "secret")
+        server.sendmail(SENDER, [to_email], MESSAGE)
+
+
+def timed(label, send, count):
+    latencies = []
+    start = time.perf_counter()
+    for i in range(count):
+        t0 = time.perf_counter()
+        send(f"patient{i}@example.com")
+        latencies.append((time.perf_counter() - t0) * 1000)
+    total = time.perf_counter() - start
+    latencies.sort()
+    print(f"  {label:<22} p50={statistics.median(latencies):7.2f} ms  "
+          f"p95={latencies[int(len(latencies) * 0.95) - 1]:7.2f} ms  "
+          f"throughput={count / total:8.1f} msg/s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--rtt", type=float, default=5.0, help="Simulated round trip, ms")
+    parser.add_argument("--handshake-rtts", type=int, default=4)
+    args = parser.parse_args()
+    logging.getLogger("mail.log").setLevel(logging.ERROR)
+
+    sink = SlowSink(args.rtt / 1000, args.handshake_rtts)
+    host, port = "127.0.0.1", free_port()
+    controller = Controller(sink, hostname=host, port=port,
+                            authenticator=accept_all, auth_require_tls=False)
+    controller.start()
+    print(f"{args.messages} messages to aiosmtpd on {host}:{port}, rtt={args.rtt} ms")
+
+    try:
+        timed("new connection each", lambda to: fresh_connection(host, port, to), args.messages)
+
+        pool = SMTPPool(host, port, SENDER, "secret", starttls=False, max_size=1)
+        timed("pooled send", lambda to: pool.send(SENDER, [to], MESSAGE), args.messages)
+
+        start = time.perf_counter()
+        errors = pool.send_many(
+            (SENDER, [f"patient{i}@example.com"], MESSAGE) for i in range(args.messages)
+        )
+        total = time.perf_counter() - start
+        print(f"  {'pooled send_many':<22} mean={total / args.messages * 1000:7.2f} ms  "
+              f"throughput={args.messages / total:8.1f} msg/s  "
+              f"errors={sum(e is not None for e in errors)}")
+        print(f"  pool: {pool.stats()}")
+        pool.close()
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Process startup cost of the Google Calendar client: eager build vs lazy.
+
+Each scenario runs in a fresh interpreter (as a new uvicorn worker or CLI
+session would) and reports the median wall time over --runs. A throwaway
+service account key is generated so credentials are parsed as in
+production; nothing talks to Google.
+
+    python -m benchmarks.bench_startup --runs 10
+    python -m benchmarks.bench_startup --targets calendar backend cli   # needs .env + database
+
+"eager" forces the client build during startup, which is what
+CalendarTool.__init__ used to do; "lazy" is the current behaviour.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+FORCE_BUILD = "{}.calendar_tool.service.events()"
+
+SCENARIOS = {
+    "calendar": [
+        ("interpreter only", "pass"),
+        ("old eager __init__",
+         "from google.oauth2 import service_account\n"
+         "from googleapiclient.discovery import build\n"
+         "import os\n"
+         "creds = service_account.Credentials.from_service_account_file(\n"
+         "    os.environ['GOOGLE_CREDENTIALS_FILE'],\n"
+         "    scopes=['https://www.googleapis.com/auth/calendar'])\n"
+         "build('calendar', 'v3', credentials=creds)"),
+        ("CalendarTool() lazy",
+         "from src.mcp_tools.calendar_tool import CalendarTool\nCalendarTool()"),
+        ("CalendarTool() + first use",
+         "from src.mcp_tools.calendar_tool import CalendarTool\nCalendarTool().service.events()"),
+    ],
+    "backend": [
+        ("backend app, lazy", "import backend.app.main"),
+        ("backend app, eager",
+         "import backend.app.main\n"
+         "from backend.app.services.agent_service import agent_service\n"
+         + FORCE_BUILD.format("agent_service")),
+    ],
+    "cli": [
+        ("CLI agent, lazy",
+         "import sys; sys.path.insert(0, 'src')\n"
+         "from agent_gemini import AppointmentAgentGemini\nAppointmentAgentGemini()"),
+        ("CLI agent, eager",
+         "import sys; sys.path.insert(0, 'src')\n"
+         "from agent_gemini import AppointmentAgentGemini\n"
+         "agent = AppointmentAgentGemini()\n" + FORCE_BUILD.format("agent")),
+    ],
+}
+
+
+def fake_service_account(directory: str) -> str:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                            serialization.NoEncryption()).decode()
+    path = os.path.join(directory, "service-account-key.json")
+    with open(path, "w") as f:
+        json.dump({
+            "type": "service_account", "project_id": "bench", "private_key_id": "bench",
+            "private_key": pem, "client_email": "bench@bench.iam.gserviceaccount.com",
+            "client_id": "1", "token_uri": "https://oauth2.googleapis.com/token",
+        }, f)
+    return path
+
+
+def time_snippet(code: str, runs: int, env: dict) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--targets", nargs="+", default=["calendar"], choices=list(SCENARIOS))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ, GOOGLE_CREDENTIALS_FILE=fake_service_account(directory))
+        env.pop("GOOGLE_CALENDAR_ENDPOINT", None)
+        for target in args.targets:
+            print(f"{target} (median of {args.runs} fresh processes)")
+            for label, code in SCENARIOS[target]:
+                try:
+                    elapsed = time_snippet(code, args.runs, env)
+                except subprocess.CalledProcessError:
+                    print(f"  {label:<28} failed (check .env and database)")
+                    continue
+                print(f"  {label:<28} {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Shared fakes for the unit tests: a recording database pool, a local SMTP
+server, and tools wired to them through their constructors."""
+import socketserver
+import threading
+from contextlib import contextmanager
+from datetime import date, time
+from email import message_from_bytes
+
+import pytest
+
+from src.mcp_tools.analytics_tool import AnalyticsTool
+from src.mcp_tools.calendar_tool import CalendarTool
+from src.mcp_tools.doctor_directory import DoctorDirectory
+from src.mcp_tools.email_tool import EmailTool
+from src.mcp_tools.rate_limit import TokenBucket
+from src.mcp_tools.schedule_cache import ScheduleCache
+
+DOCTORS = [
+    {"id": 1, "name": "Dr. Ahuja", "specialty": "Cardiology", "email": "ahuja@clinic.com"},
+    {"id": 2, "name": "Dr. Sharma", "specialty": "Pediatrics", "email": "sharma@clinic.com"},
+]
+
+
+class RecordingPool:
+    """Stands in for ConnectionPool; remembers every statement and answers with canned rows"""
+
+    def __init__(self, rows=()):
+        self.statements = []
+        self.rows = list(rows)
+
+    @contextmanager
+    def connection(self):
+        yield self
+
+    def cursor(self, cursor_factory=None):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.statements.append((" ".join(sql.split()), params))
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+class SMTPStandIn(socketserver.StreamRequestHandler):
+    """Just enough SMTP (EHLO, AUTH PLAIN, MAIL, RCPT, DATA) for smtplib"""
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 localhost ready")
+        while True:
+            line = self.rfile.readline().decode().strip()
+            verb = line.split(" ", 1)[0].upper()
+            if not line or verb == "QUIT":
+                self.reply("221 bye")
+                return
+            if verb == "EHLO":
+                self.reply("250-localhost")
+                self.reply("250 AUTH PLAIN")
+            elif verb == "AUTH":
+                self.reply("235 ok")
+            elif verb == "DATA":
+                self.reply("354 go ahead")
+                data = b""
+                while not data.endswith(b"\r\n.\r\n"):
+                    data += self.rfile.readline()
+                self.server.messages.append(message_from_bytes(data[:-5]))
+                self.reply("250 queued")
+                if self.server.drop_after and len(self.server.messages) % self.server.drop_after == 0:
+                    return  # hang up without QUIT, like an idle-timeout on the server
+            elif verb == "RCPT" and "refused" in line:
+                self.reply("550 no such user")
+            else:
+                self.reply("250 ok")
+
+
+class FakeEvents:
+    """events() of a Calendar API client; insert(body) decides each response"""
+
+    def __init__(self, insert):
+        self._insert = insert
+
+    def insert(self, calendarId, body):
+        insert = self._insert
+
+        class Request:
+            def execute(self):
+                return insert(body)
+
+        return Request()
+
+
+class FakeCalendarService:
+    def __init__(self, insert):
+        self._events = FakeEvents(insert)
+
+    def events(self):
+        return self._events
+
+
+@pytest.fixture
+def make_pool():
+    """RecordingPool factory: make_pool(rows) answers every query with rows"""
+    return RecordingPool
+
+
+@pytest.fixture
+def smtp_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), SMTPStandIn)
+    server.daemon_threads = True
+    server.messages = []
+    server.connections = 0
+    server.drop_after = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def make_email_tool():
+    """EmailTool factory talking plain SMTP to 127.0.0.1:port"""
+    tools = []
+
+    def make(port):
+        tool = EmailTool("127.0.0.1", port, "clinic@example.com", "secret", starttls=False)
+        tools.append(tool)
+        return tool
+
+    yield make
+    for tool in tools:
+        tool.close()
+
+
+@pytest.fixture
+def email_tool(smtp_server, make_email_tool):
+    return make_email_tool(smtp_server.server_address[1])
+
+
+@pytest.fixture
+def make_calendar_tool():
+    """CalendarTool factory around a fake client; insert(body) returns or raises"""
+
+    def make(insert):
+        tool = CalendarTool(service=FakeCalendarService(insert), calendar_id="clinic")
+        tool.limiter = TokenBucket(1000)
+        return tool
+
+    return make
+
+
+@pytest.fixture
+def directory():
+    directory = DoctorDirectory(ttl_seconds=3600)
+    directory.refresh(DOCTORS)
+    return directory
+
+
+@pytest.fixture
+def schedule():
+    """Ahuja: Mon 9-12 and 13-17, Tue 9-12; Sharma: Mon 9-17, on leave 2026-02-23"""
+    schedule = ScheduleCache(ttl_seconds=3600)
+    schedule.refresh(
+        [{"doctor_id": 1, "day_of_week": 0, "start_time": time(9), "end_time": time(12)},
+         {"doctor_id": 1, "day_of_week": 0, "start_time": time(13), "end_time": time(17)},
+         {"doctor_id": 1, "day_of_week": 1, "start_time": time(9), "end_time": time(12)},
+         {"doctor_id": 2, "day_of_week": 0, "start_time": time(9), "end_time": time(17)}],
+        [{"doctor_id": 2, "exception_date": date(2026, 2, 23), "start_time": None, "end_time": None}],
+    )
+    return schedule
+
+
+@pytest.fixture
+def make_analytics(make_pool, directory, schedule):
+    """AnalyticsTool factory whose queries all return the given rows"""
+
+    def make(rows=()):
+        return AnalyticsTool(pool=make_pool(rows), directory=directory, schedule=schedule)
+
+    return make
@@ -1,5 +1,6 @@
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from anthropic import Anthropic
 from dotenv import load_dotenv
@@ -9,14 +10,19 @@ from rich.panel import Panel
 from mcp_tools.database import DatabaseTool
 from mcp_tools.calendar_tool import CalendarTool
 from mcp_tools.email_tool import EmailTool
+from mcp_tools.db_pool import close_pool
 
 load_dotenv()
 console = Console()
 
+# Tools with side effects; never run concurrently with each other
+WRITE_TOOLS = {"book_appointment"}
+
 class AppointmentAgent:
-    def __init__(self):
+    def __init__(self, parallel_tools: bool = False):
         self.client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
         self.conversation_history = []
+        self.parallel_tools = parallel_tools
         
         # Initialize tools
         console.print("[bold cyan]Initializing tools...[/bold cyan]")
@@ -156,6 +162,36 @@ Format times in 12-hour format (e.g., 2:00 PM) when talking to users.
         except Exception as e:
             return json.dumps({"error": str(e)})
     
+    def _run_tool(self, block) -> str:
+        console.print(f"[dim]🔧 Using tool: {block.name}[/dim]")
+        result = self.process_tool_call(block.name, block.input)
+        console.print(f"[dim]✓ Tool completed[/dim]\n")
+        return result
+    
+    def execute_tools(self, tool_uses: list) -> list:
+        """Run every tool_use block once and return the matching tool_result entries"""
+        reads = [block for block in tool_uses if block.name not in WRITE_TOOLS]
+        results = {}
+        
+        if self.parallel_tools and len(reads) > 1:
+            with ThreadPoolExecutor(max_workers=min(len(reads), 4)) as executor:
+                for block, result in zip(reads, executor.map(self._run_tool, reads)):
+                    results[block.id] = result
+        
+        # Writes (and everything, when not parallel) run in the order Claude asked
+        for block in tool_uses:
+            if block.id not in results:
+                results[block.id] = self._run_tool(block)
+        
+        return [
+            {
+                "type": "tool_result",
+                "tool_use_id": block.id,
+                "content": results[block.id]
+            }
+            for block in tool_uses
+        ]
+    
     def chat(self, user_message: str) -> str:
         """Process a user message and return the agent's response"""
         # Add user message to history
@@ -179,6 +215,7 @@ Format times in 12-hour format (e.g., 2:00 PM) when talking to users.
             if response.stop_reason == "tool_use":
                 # Build assistant message with text and tool uses
                 assistant_message = {"role": "assistant", "content": []}
+                tool_uses = []
                 
                 for block in response.content:
                     if block.type == "text":
@@ -193,29 +230,15 @@ Format times in 12-hour format (e.g., 2:00 PM) when talking to users.
                             "name": block.name,
                             "input": block.input
                         })
-                        
-                        # Execute the tool
-                        console.print(f"[dim]🔧 Using tool: {block.name}[/dim]")
-                        tool_result = self.process_tool_call(block.name, block.input)
-                        console.print(f"[dim]✓ Tool completed[/dim]\n")
+                        tool_uses.append(block)
                 
                 # Add assistant message to history
                 self.conversation_history.append(assistant_message)
                 
-                # Add tool results to history
-                tool_results = []
-                for block in response.content:
-                    if block.type == "tool_use":
-                        tool_result_content = self.process_tool_call(block.name, block.input)
-                        tool_results.append({
-                            "type": "tool_result",
-                            "tool_use_id": block.id,
-                            "content": tool_result_content
-                        })
-                
+                # Execute each tool exactly once and reuse its result
                 self.conversation_history.append({
                     "role": "user",
-                    "content": tool_results
+                    "content": self.execute_tools(tool_uses)
                 })
                 
                 # Continue the loop to get Claude's next response
@@ -279,8 +302,8 @@ Format times in 12-hour format (e.g., 2:00 PM) when talking to users.
                 import traceback
                 console.print(traceback.format_exc())
         
-        # Cleanup
-        self.db_tool.close()
+        # Cleanup: the pool is shared by every tool, so it is closed once here
+        close_pool()
 
 
 def main():
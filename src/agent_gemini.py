@@ -10,6 +10,7 @@ from rich.panel import Panel
 from mcp_tools.database import DatabaseTool
 from mcp_tools.calendar_tool import CalendarTool
 from mcp_tools.email_tool import EmailTool
+from mcp_tools.db_pool import close_pool
 
 load_dotenv()
 console = Console()
@@ -285,8 +286,8 @@ Always be professional, friendly, and clear."""
                 import traceback
                 console.print(traceback.format_exc())
         
-        # Cleanup
-        self.db_tool.close()
+        # Cleanup: the pool is shared by every tool, so it is closed once here
+        close_pool()
 
 
 def main():
@@ -1,41 +1,162 @@
-import os
-import psycopg2
 from psycopg2.extras import RealDictCursor
-from datetime import datetime, timedelta
-from typing import Dict, List
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from . import slot_engine
+from .db_pool import ConnectionPool, get_pool
+from .doctor_directory import DoctorDirectory, get_directory
+from .schedule_cache import ScheduleCache, get_schedule
+from .hll import HyperLogLog, union
+
+
+def day_range(start_date: str, end_date: str = None):
+    """Half-open [start, end) timestamps covering start_date..end_date inclusive"""
+    start = datetime.strptime(start_date, '%Y-%m-%d')
+    end = datetime.strptime(end_date or start_date, '%Y-%m-%d') + timedelta(days=1)
+    return start, end
+
+
+def _minutes(start: datetime, end: datetime) -> int:
+    return int((end - start).total_seconds() // 60)
+
+
+def _percent(part: int, whole: int) -> float:
+    return round(100.0 * part / whole, 1) if whole else 0.0
+
+
+def summary_window(window: str = "day", today: date = None) -> Tuple[date, date]:
+    """Inclusive date range for a summary: day (yesterday..tomorrow), week or month"""
+    today = today or datetime.now().date()
+    if window == "day":
+        return today - timedelta(days=1), today + timedelta(days=1)
+    if window == "week":
+        monday = today - timedelta(days=today.weekday())
+        return monday, monday + timedelta(days=6)
+    if window == "month":
+        first = today.replace(day=1)
+        next_month = (first + timedelta(days=32)).replace(day=1)
+        return first, next_month - timedelta(days=1)
+    raise ValueError(f"Unknown summary window: {window}")
+
+
+@dataclass
+class DayStats:
+    day: date
+    appointments: int = 0
+    unique_patients: int = 0
+    cancelled: int = 0
+
+
+@dataclass
+class SummaryReport:
+    """Per-day appointment stats for one window, from a single query"""
+    start: date
+    end: date
+    today: date
+    doctor: Optional[str] = None
+    window: str = "day"
+    days: List[DayStats] = field(default_factory=list)
+    unique_patients: int = 0
+    exact_patients: bool = True
+    generated_at: datetime = field(default_factory=datetime.now)
+
+    def day(self, day: date) -> DayStats:
+        for stats in self.days:
+            if stats.day == day:
+                return stats
+        return DayStats(day)
+
+    @property
+    def total_appointments(self) -> int:
+        return sum(stats.appointments for stats in self.days)
+
+    @property
+    def total_cancelled(self) -> int:
+        return sum(stats.cancelled for stats in self.days)
+
+
+def format_summary_report(report: SummaryReport) -> str:
+    """Slack-flavoured text for a SummaryReport"""
+    doctor_label = report.doctor or "All Doctors"
+    lines = [
+        "*📊 Appointment Summary Report*",
+        f"*Doctor:* {doctor_label}",
+        f"*Generated:* {report.generated_at.strftime('%B %d, %Y at %I:%M %p')}",
+        "",
+    ]
+
+    if report.window == "day":
+        yesterday = report.day(report.today - timedelta(days=1))
+        today = report.day(report.today)
+        tomorrow = report.day(report.today + timedelta(days=1))
+        lines += [
+            f"*📅 Yesterday ({yesterday.day.isoformat()})*",
+            f"- Unique patients visited: *{yesterday.unique_patients}*",
+            "",
+            f"*📅 Today ({today.day.isoformat()})*",
+            f"- Scheduled appointments: *{today.appointments}*",
+            "",
+            f"*📅 Tomorrow ({tomorrow.day.isoformat()})*",
+            f"- Scheduled appointments: *{tomorrow.appointments}*",
+        ]
+    else:
+        lines.append(f"*📅 {report.start.isoformat()} to {report.end.isoformat()}*")
+        for stats in report.days:
+            if stats.appointments or stats.cancelled:
+                lines.append(
+                    f"- {stats.day.strftime('%a %b %d')}: *{stats.appointments}* appointments, "
+                    f"{stats.unique_patients} patients, {stats.cancelled} cancelled"
+                )
+        lines += [
+            "",
+            f"*Total:* {report.total_appointments} appointments, {report.total_cancelled} cancelled, "
+            f"{'' if report.exact_patients else '~'}{report.unique_patients} unique patients",
+        ]
+
+    lines += ["", "_Report generated automatically by Doctor Report Bot_", ""]
+    return "\n".join(lines)
+
 
 class AnalyticsTool:
-    def __init__(self):
-        self.conn = psycopg2.connect(
-            host=os.getenv("DB_HOST", "localhost"),
-            database=os.getenv("DB_NAME", "appointments"),
-            user=os.getenv("DB_USER"),
-            password=os.getenv("DB_PASSWORD", "")
-        )
+    # Ranges up to this many days count distinct patients exactly; longer
+    # ones union the per-day HyperLogLog sketches on the rollup
+    EXACT_MAX_DAYS = 7
+    MAX_UTILIZATION_DAYS = 92
+
+    def __init__(self, pool: ConnectionPool = None, directory: DoctorDirectory = None,
+                 schedule: ScheduleCache = None):
+        self.pool = pool or get_pool()
+        self.directory = directory or get_directory()
+        self.schedule = schedule or get_schedule()
+    
+    def _doctor(self, doctor_name: str = None) -> Tuple[Optional[int], Optional[str]]:
+        """(id, canonical name) for an optional doctor filter"""
+        if not doctor_name:
+            return None, None
+        doctor = self.directory.resolve(doctor_name)
+        if not doctor:
+            raise ValueError(f"Doctor {doctor_name} not found")
+        return doctor['id'], doctor['name']
     
     def get_appointments_count(self, date: str, doctor_name: str = None) -> Dict:
         """Get count of appointments for a specific date"""
-        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+        with self.pool.connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
             if doctor_name:
-                # Get doctor ID
-                cur.execute("SELECT id FROM doctors WHERE name ILIKE %s", (f"%{doctor_name}%",))
-                doctor = cur.fetchone()
+                doctor = self.directory.resolve(doctor_name)
                 if not doctor:
                     return {"error": f"Doctor {doctor_name} not found"}
                 
                 cur.execute("""
-                    SELECT COUNT(*) as count
-                    FROM appointments
-                    WHERE DATE(appointment_time) = %s
-                    AND doctor_id = %s
-                    AND status != 'cancelled'
+                    SELECT COALESCE(SUM(booked), 0) as count
+                    FROM appointment_daily_rollup
+                    WHERE day = %s AND doctor_id = %s
                 """, (date, doctor['id']))
             else:
                 cur.execute("""
-                    SELECT COUNT(*) as count
-                    FROM appointments
-                    WHERE DATE(appointment_time) = %s
-                    AND status != 'cancelled'
+                    SELECT COALESCE(SUM(booked), 0) as count
+                    FROM appointment_daily_rollup
+                    WHERE day = %s
                 """, (date,))
             
             result = cur.fetchone()
@@ -48,34 +169,28 @@ class AnalyticsTool:
     def get_appointments_by_date_range(self, start_date: str, end_date: str, 
                                       doctor_name: str = None) -> Dict:
         """Get appointments in a date range"""
-        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+        with self.pool.connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
             if doctor_name:
-                cur.execute("SELECT id FROM doctors WHERE name ILIKE %s", (f"%{doctor_name}%",))
-                doctor = cur.fetchone()
+                doctor = self.directory.resolve(doctor_name)
                 if not doctor:
                     return {"error": f"Doctor {doctor_name} not found"}
                 
                 cur.execute("""
-                    SELECT 
-                        DATE(appointment_time) as date,
-                        COUNT(*) as count
-                    FROM appointments
-                    WHERE DATE(appointment_time) BETWEEN %s AND %s
+                    SELECT day as date, booked as count
+                    FROM appointment_daily_rollup
+                    WHERE day BETWEEN %s AND %s
                     AND doctor_id = %s
-                    AND status != 'cancelled'
-                    GROUP BY DATE(appointment_time)
-                    ORDER BY date
+                    AND booked > 0
+                    ORDER BY day
                 """, (start_date, end_date, doctor['id']))
             else:
                 cur.execute("""
-                    SELECT 
-                        DATE(appointment_time) as date,
-                        COUNT(*) as count
-                    FROM appointments
-                    WHERE DATE(appointment_time) BETWEEN %s AND %s
-                    AND status != 'cancelled'
-                    GROUP BY DATE(appointment_time)
-                    ORDER BY date
+                    SELECT day as date, SUM(booked) as count
+                    FROM appointment_daily_rollup
+                    WHERE day BETWEEN %s AND %s
+                    GROUP BY day
+                    HAVING SUM(booked) > 0
+                    ORDER BY day
                 """, (start_date, end_date))
             
             results = [dict(row) for row in cur.fetchall()]
@@ -91,13 +206,13 @@ class AnalyticsTool:
     
     def get_patient_visits(self, date: str) -> Dict:
         """Get unique patient count for a date"""
-        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+        with self.pool.connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute("""
                 SELECT COUNT(DISTINCT patient_email) as unique_patients
                 FROM appointments
-                WHERE DATE(appointment_time) = %s
+                WHERE appointment_time >= %s AND appointment_time < %s
                 AND status != 'cancelled'
-            """, (date,))
+            """, day_range(date))
             
             result = cur.fetchone()
             return {
@@ -105,6 +220,153 @@ class AnalyticsTool:
                 "unique_patients": result['unique_patients']
             }
     
+    def get_unique_patients(self, start_date: str, end_date: str = None,
+                            doctor_name: str = None, exact: bool = None) -> Dict:
+        """Distinct patients with a live booking in a date range.
+
+        exact=None counts exactly for ranges of up to EXACT_MAX_DAYS and
+        estimates longer ones from the rollup's sketches (about 1.6% error).
+        """
+        end_date = end_date or start_date
+        try:
+            doctor_id, doctor_name = self._doctor(doctor_name)
+        except ValueError as e:
+            return {"error": str(e)}
+        days = (datetime.strptime(end_date, '%Y-%m-%d') - datetime.strptime(start_date, '%Y-%m-%d')).days + 1
+        if exact is None:
+            exact = days <= self.EXACT_MAX_DAYS
+
+        with self.pool.connection() as conn, conn.cursor() as cur:
+            if exact:
+                cur.execute("""
+                    SELECT COUNT(DISTINCT patient_email)
+                    FROM appointments
+                    WHERE appointment_time >= %s AND appointment_time < %s
+                    AND status != 'cancelled'
+                    AND (%s::int IS NULL OR doctor_id = %s)
+                """, (*day_range(start_date, end_date), doctor_id, doctor_id))
+                unique_patients = cur.fetchone()[0]
+            else:
+                cur.execute("""
+                    SELECT patient_sketch
+                    FROM appointment_daily_rollup
+                    WHERE day BETWEEN %s AND %s
+                    AND (%s::int IS NULL OR doctor_id = %s)
+                    AND patient_sketch IS NOT NULL
+                """, (start_date, end_date, doctor_id, doctor_id))
+                unique_patients = union(row[0] for row in cur).count()
+
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            "doctor": doctor_name or "All doctors",
+            "unique_patients": unique_patients,
+            "exact": exact
+        }
+    
+    def get_utilization(self, start_date: str, end_date: str = None,
+                        doctor_name: str = None) -> Dict:
+        """Booked vs working minutes per doctor and day, with the longest free gap.
+
+        Working hours come from the schedule cache (weekly hours and
+        exceptions) and every booking in the range from one query; each
+        doctor-day is then a single interval sweep. Minutes booked outside
+        working hours are not counted, so utilization tops out at 100%.
+        """
+        first_day = datetime.strptime(start_date, '%Y-%m-%d').date()
+        last_day = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else first_day
+        if last_day < first_day:
+            return {"error": "end_date must not be before start_date"}
+        if (last_day - first_day).days >= self.MAX_UTILIZATION_DAYS:
+            return {"error": f"Utilization range is limited to {self.MAX_UTILIZATION_DAYS} days"}
+
+        try:
+            doctor_id, _ = self._doctor(doctor_name)
+        except ValueError as e:
+            return {"error": str(e)}
+        if doctor_id is not None:
+            doctors = [self.directory.get(doctor_id)]
+        else:
+            doctors = sorted(self.directory.all(), key=lambda d: d['name'])
+
+        with self.pool.connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("""
+                SELECT doctor_id, appointment_time, duration_minutes
+                FROM appointments
+                WHERE doctor_id = ANY(%s)
+                AND appointment_time >= %s AND appointment_time < %s
+                AND status != 'cancelled'
+            """, ([d['id'] for d in doctors], *day_range(first_day.isoformat(), last_day.isoformat())))
+            rows_by_day: Dict[tuple, List[Dict]] = {}
+            for row in cur.fetchall():
+                rows_by_day.setdefault((row['doctor_id'], row['appointment_time'].date()), []).append(row)
+
+        report = []
+        for doctor in doctors:
+            days, booked_total, capacity_total = [], 0, 0
+            day = first_day
+            while day <= last_day:
+                working = self.schedule.working_intervals(doctor['id'], day)
+                if working:
+                    booked = slot_engine.booked_intervals(rows_by_day.get((doctor['id'], day), []))
+                    free = slot_engine.subtract_intervals(working, booked)
+                    capacity = sum(_minutes(start, end) for start, end in working)
+                    free_minutes = [_minutes(start, end) for start, end in free]
+                    booked_minutes = capacity - sum(free_minutes)
+                    days.append({
+                        "date": day.isoformat(),
+                        "booked_minutes": booked_minutes,
+                        "capacity_minutes": capacity,
+                        "utilization": _percent(booked_minutes, capacity),
+                        "longest_free_minutes": max(free_minutes, default=0),
+                    })
+                    booked_total += booked_minutes
+                    capacity_total += capacity
+                day += timedelta(days=1)
+            report.append({
+                "doctor": doctor['name'],
+                "doctor_id": doctor['id'],
+                "booked_minutes": booked_total,
+                "capacity_minutes": capacity_total,
+                "utilization": _percent(booked_total, capacity_total),
+                "days": days,
+            })
+
+        booked_all = sum(d['booked_minutes'] for d in report)
+        capacity_all = sum(d['capacity_minutes'] for d in report)
+        return {
+            "start_date": first_day.isoformat(),
+            "end_date": last_day.isoformat(),
+            "booked_minutes": booked_all,
+            "capacity_minutes": capacity_all,
+            "utilization": _percent(booked_all, capacity_all),
+            "doctors": report
+        }
+    
+    def iter_appointments(self, start_date: str, end_date: str = None, after_id: int = 0,
+                          page_size: int = 1000) -> Iterator[Dict]:
+        """Stream live appointments in id order through a server-side cursor.
+
+        Rows arrive page_size at a time, so memory stays flat however many
+        appointments match. The pooled connection is held until the
+        iterator is exhausted or closed.
+        """
+        with self.pool.connection() as conn:
+            with conn.cursor(name="iter_appointments", cursor_factory=RealDictCursor) as cur:
+                cur.itersize = page_size
+                cur.execute("""
+                    SELECT a.id, a.patient_name, a.patient_email, a.appointment_time,
+                           a.doctor_id, d.name AS doctor_name
+                    FROM appointments a
+                    JOIN doctors d ON d.id = a.doctor_id
+                    WHERE a.appointment_time >= %s AND a.appointment_time < %s
+                    AND a.status != 'cancelled'
+                    AND a.id > %s
+                    ORDER BY a.id
+                """, (*day_range(start_date, end_date), after_id))
+                for row in cur:
+                    yield row
+    
     def get_today_appointments(self, doctor_name: str = None) -> Dict:
         """Get today's appointments"""
         today = datetime.now().strftime('%Y-%m-%d')
@@ -120,37 +382,92 @@ class AnalyticsTool:
         yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
         return self.get_patient_visits(yesterday)
     
-    def generate_summary_report(self, doctor_name: str = None) -> str:
-        """Generate a comprehensive summary report"""
-        today = datetime.now().strftime('%Y-%m-%d')
-        yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-        tomorrow = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
-        
-        # Get data
-        yesterday_visits = self.get_patient_visits(yesterday)
-        today_appts = self.get_appointments_count(today, doctor_name)
-        tomorrow_appts = self.get_appointments_count(tomorrow, doctor_name)
-        
-        # Format report
-        doctor_label = f"Dr. {doctor_name}" if doctor_name else "All Doctors"
-        
-        report = f"""*📊 Appointment Summary Report*
-*Doctor:* {doctor_label}
-*Generated:* {datetime.now().strftime('%B %d, %Y at %I:%M %p')}
-
-*📅 Yesterday ({yesterday})*
-- Unique patients visited: *{yesterday_visits['unique_patients']}*
-
-*📅 Today ({today})*
-- Scheduled appointments: *{today_appts['count']}*
-
-*📅 Tomorrow ({tomorrow})*
-- Scheduled appointments: *{tomorrow_appts['count']}*
-
-_Report generated automatically by Doctor Report Bot_
-"""
-        
+    def get_summary(self, doctor_name: str = None, window: str = "day",
+                    start_date: str = None, end_date: str = None) -> SummaryReport:
+        """Per-day counts for a window in one query, mostly off the daily rollup.
+
+        window is day (yesterday..tomorrow), week or month around today;
+        start_date/end_date override it with an explicit range. Unique
+        patients are exact up to EXACT_MAX_DAYS, sketch estimates beyond.
+        """
+        today = datetime.now().date()
+        if start_date:
+            start = datetime.strptime(start_date, '%Y-%m-%d').date()
+            end = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else start
+        else:
+            start, end = summary_window(window, today)
+
+        doctor_id, doctor_name = self._doctor(doctor_name)
+        exact = (end - start).days < self.EXACT_MAX_DAYS
+        report = SummaryReport(start=start, end=end, today=today, doctor=doctor_name,
+                               window=window, exact_patients=exact)
+        params = {"start": start, "end": end, "doctor_id": doctor_id,
+                  "from": datetime.combine(start, datetime.min.time()),
+                  "until": datetime.combine(end + timedelta(days=1), datetime.min.time())}
+
+        with self.pool.connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+            if exact:
+                # Counts come from the rollup; only distinct patients need raw rows
+                cur.execute("""
+                    WITH counts AS (
+                        SELECT day, SUM(booked) AS appointments, SUM(cancelled) AS cancelled
+                        FROM appointment_daily_rollup
+                        WHERE day BETWEEN %(start)s AND %(end)s
+                        AND (%(doctor_id)s::int IS NULL OR doctor_id = %(doctor_id)s)
+                        GROUP BY day
+                    ), live AS (
+                        SELECT appointment_time::date AS day, patient_email
+                        FROM appointments
+                        WHERE appointment_time >= %(from)s AND appointment_time < %(until)s
+                        AND status != 'cancelled'
+                        AND (%(doctor_id)s::int IS NULL OR doctor_id = %(doctor_id)s)
+                    ), patients AS (
+                        SELECT day, COUNT(DISTINCT patient_email) AS unique_patients
+                        FROM live GROUP BY day
+                    )
+                    SELECT counts.day, counts.appointments,
+                           COALESCE(patients.unique_patients, 0) AS unique_patients, counts.cancelled,
+                           (SELECT COUNT(DISTINCT patient_email) FROM live) AS window_patients
+                    FROM counts LEFT JOIN patients USING (day)
+                """, params)
+                rows = cur.fetchall()
+                report.unique_patients = rows[0]['window_patients'] if rows else 0
+            else:
+                cur.execute("""
+                    SELECT day, SUM(booked) AS appointments, SUM(cancelled) AS cancelled,
+                           array_agg(patient_sketch) FILTER (WHERE patient_sketch IS NOT NULL) AS sketches
+                    FROM appointment_daily_rollup
+                    WHERE day BETWEEN %(start)s AND %(end)s
+                    AND (%(doctor_id)s::int IS NULL OR doctor_id = %(doctor_id)s)
+                    GROUP BY day
+                """, params)
+                rows = cur.fetchall()
+                window_sketch = HyperLogLog()
+                for row in rows:
+                    day_sketch = union(row['sketches'] or [])
+                    row['unique_patients'] = day_sketch.count()
+                    window_sketch.merge(day_sketch)
+                report.unique_patients = window_sketch.count()
+            found = {row['day']: row for row in rows}
+
+        day = start
+        while day <= end:
+            row = found.get(day)
+            report.days.append(DayStats(
+                day, row['appointments'], row['unique_patients'], row['cancelled']
+            ) if row else DayStats(day))
+            day += timedelta(days=1)
         return report
     
+    def rebuild_patient_sketches(self, start_date: str, end_date: str = None) -> int:
+        """Recompute sketches from live bookings; the trigger keeps them current, so this is for repairs"""
+        with self.pool.connection() as conn, conn.cursor() as cur:
+            cur.execute("SELECT rebuild_patient_sketches(%s, %s)", (start_date, end_date or start_date))
+            return cur.fetchone()[0]
+    
+    def generate_summary_report(self, doctor_name: str = None, window: str = "day") -> str:
+        """Generate a comprehensive summary report"""
+        return format_summary_report(self.get_summary(doctor_name, window))
+    
     def close(self):
-        self.conn.close()
\ No newline at end of file
+        """Nothing to release: the shared pool is closed once at process shutdown"""
\ No newline at end of file
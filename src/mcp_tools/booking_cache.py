@@ -0,0 +1,105 @@
+import time
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from . import slot_engine
+
+Key = Tuple[int, date]
+
+
+class BookedIntervalCache:
+    """Bounded LRU of merged booked intervals keyed by (doctor_id, date).
+
+    Entries expire after `ttl_seconds` as a backstop; bookings made through
+    this process update entries in place, and `appointments_changed`
+    notifications (migration 005) drop entries changed by other nodes.
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Key, Tuple[float, List[slot_engine.Interval]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation and write-through, so a load that
+        # raced a write is not cached
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def epoch(self) -> int:
+        """Capture before loading from the database; pass to put()"""
+        return self._epoch
+
+    def get(self, doctor_id: int, day: date) -> Optional[List[slot_engine.Interval]]:
+        key = (doctor_id, day)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] >= self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, doctor_id: int, day: date, intervals: List[slot_engine.Interval], epoch: int):
+        with self._lock:
+            if epoch != self._epoch:
+                return
+            self._entries[(doctor_id, day)] = (time.monotonic(), intervals)
+            self._entries.move_to_end((doctor_id, day))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def add(self, doctor_id: int, day: date, interval: slot_engine.Interval):
+        """Write-through for a booking this process just committed.
+
+        Also bumps the epoch: a load that started before the commit may not
+        include this booking, so its put() must be dropped.
+        """
+        key = (doctor_id, day)
+        with self._lock:
+            self._epoch += 1
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = (entry[0], slot_engine.merge_intervals(entry[1] + [interval]))
+
+    def invalidate(self, doctor_id: int, day: date):
+        with self._lock:
+            self._epoch += 1
+            self.invalidations += 1
+            self._entries.pop((doctor_id, day), None)
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self.invalidations += 1
+            self._entries.clear()
+
+    def handle_notification(self, payload: str):
+        """Apply an appointments_changed payload ('<doctor_id>:<YYYY-MM-DD>')"""
+        try:
+            doctor_id, day = payload.split(":", 1)
+            self.invalidate(int(doctor_id), date.fromisoformat(day))
+        except ValueError:
+            # TRUNCATE, reconnects and unknown payloads drop everything
+            self.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
@@ -1,15 +1,84 @@
 import os
+import time
+import random
+import hashlib
+import threading
 from datetime import datetime, timedelta
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
+from typing import Any, Dict, List, Optional
+from urllib.parse import urljoin
+
+from googleapiclient.errors import HttpError
+
+from .rate_limit import TokenBucket
+
+SCOPES = ['https://www.googleapis.com/auth/calendar']
+
+# Google caps a batch request at 50 calls
+MAX_BATCH_SIZE = 50
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# Credentials are loaded once per process. Clients are built once per
+# thread, since httplib2 connections must not be shared between threads.
+_credentials: Dict[str, Any] = {}
+_credentials_lock = threading.Lock()
+_thread_clients = threading.local()
+
+
+def _load_credentials(credentials_file: str):
+    with _credentials_lock:
+        if credentials_file not in _credentials:
+            from google.oauth2 import service_account
+            _credentials[credentials_file] = service_account.Credentials.from_service_account_file(
+                credentials_file, scopes=SCOPES)
+        return _credentials[credentials_file]
+
+
+def calendar_service(credentials_file: Optional[str] = None, endpoint: Optional[str] = None):
+    """Calendar API client for this thread, built on first use.
+
+    Uses the discovery document bundled with google-api-python-client, so
+    nothing is fetched over the network, and keeps the authorized HTTP
+    transport (and its open connection) for every later call on the thread.
+    """
+    clients = getattr(_thread_clients, "clients", None)
+    if clients is None:
+        clients = _thread_clients.clients = {}
+    key = (credentials_file, endpoint)
+    if key not in clients:
+        import httplib2
+        from googleapiclient.discovery import build
+
+        http = httplib2.Http(timeout=30)
+        if credentials_file:
+            import google_auth_httplib2
+            http = google_auth_httplib2.AuthorizedHttp(_load_credentials(credentials_file), http=http)
+        clients[key] = build(
+            'calendar', 'v3', http=http, static_discovery=True, cache_discovery=False,
+            client_options={"api_endpoint": endpoint} if endpoint else None
+        )
+    return clients[key]
+
 
 class CalendarTool:
-    def __init__(self):
-        SCOPES = ['https://www.googleapis.com/auth/calendar']
-        credentials_file = os.getenv("GOOGLE_CREDENTIALS_FILE")
+    def __init__(self, service=None, calendar_id: str = None):
+        """Pass service to use an already built (or fake) Calendar API client"""
+        credentials_file = os.getenv("GOOGLE_CREDENTIALS_FILE", "service-account-key.json")
         
         # Calendar ID = your Gmail (the calendar you shared with the service account)
-        self.calendar_id = os.getenv("GOOGLE_CALENDAR_ID")
+        self.calendar_id = calendar_id or os.getenv("GOOGLE_CALENDAR_ID")
+        
+        # Optional API root, e.g. http://127.0.0.1:8085/calendar/v3/ for a local fake
+        self.endpoint = os.getenv("GOOGLE_CALENDAR_ENDPOINT")
+        self.batch_uri = (
+            urljoin(self.endpoint, "/batch/calendar/v3") if self.endpoint
+            else "https://www.googleapis.com/batch/calendar/v3"
+        )
+        
+        # Every call inside a batch counts against the per-second quota
+        self.limiter = TokenBucket(
+            float(os.getenv("CALENDAR_QPS", "10")),
+            capacity=max(float(os.getenv("CALENDAR_QPS", "10")), MAX_BATCH_SIZE)
+        )
         
         # Build full path
         if not credentials_file.startswith('/'):
@@ -20,52 +89,83 @@ class CalendarTool:
                 credentials_file
             )
         
-        if os.path.exists(credentials_file):
-            try:
-                creds = service_account.Credentials.from_service_account_file(
-                    credentials_file, scopes=SCOPES)
-                self.service = build('calendar', 'v3', credentials=creds)
-                self.enabled = True
-                print(f"✅ Google Calendar integration enabled")
-            except Exception as e:
-                print(f"⚠️  Google Calendar setup failed: {e}")
-                self.enabled = False
+        # The API client itself is built lazily, on the first calendar call
+        self._service = service
+        if service is not None:
+            self.credentials_file = None
+            self.enabled = True
+        elif os.path.exists(credentials_file):
+            self.credentials_file = credentials_file
+            self.enabled = True
+            print(f"✅ Google Calendar integration enabled")
+        elif self.endpoint:
+            # Local fake server: no credentials needed
+            self.credentials_file = None
+            self.enabled = True
+            print(f"✅ Google Calendar using {self.endpoint}")
         else:
+            self.credentials_file = None
             print(f"⚠️  Google Calendar not configured - file not found: {credentials_file}")
             self.enabled = False
     
+    @property
+    def service(self):
+        if self._service is not None:
+            return self._service
+        return calendar_service(self.credentials_file, self.endpoint)
+    
+    @service.setter
+    def service(self, service):
+        self._service = service
+    
+    @staticmethod
+    def event_id_for(key: str) -> str:
+        """Deterministic event id for an idempotency key (hex is valid base32hex)"""
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def _event_body(doctor_email: str, patient_name: str, patient_email: str,
+                    start_time_iso: str, duration: int = 30, event_id: str = None) -> Dict:
+        start = datetime.fromisoformat(start_time_iso)
+        end = start + timedelta(minutes=duration)
+        
+        event = {
+            'summary': f'📅 Appointment: {patient_name}',
+            'description': f'Medical appointment with {patient_name}\n\nPatient Email: {patient_email}\nDoctor Email: {doctor_email}',
+            'start': {
+                'dateTime': start.isoformat(),
+                'timeZone': 'Asia/Kolkata',
+            },
+            'end': {
+                'dateTime': end.isoformat(),
+                'timeZone': 'Asia/Kolkata',
+            },
+            'reminders': {
+                'useDefault': False,
+                'overrides': [
+                    {'method': 'email', 'minutes': 24 * 60},
+                    {'method': 'popup', 'minutes': 30},
+                ],
+            },
+            'colorId': '2',  # Green color for appointments
+        }
+        if event_id:
+            event['id'] = event_id
+        return event
+    
     def create_event(self, doctor_email: str, patient_name: str, 
-                     patient_email: str, start_time_iso: str, duration: int = 30):
-        """Create a calendar event"""
+                     patient_email: str, start_time_iso: str, duration: int = 30,
+                     event_id: str = None):
+        """Create a calendar event; with event_id, retrying the same insert is a no-op"""
         if not self.enabled:
             print("⚠️  Calendar event skipped (not configured)")
             return None
         
         try:
-            start = datetime.fromisoformat(start_time_iso)
-            end = start + timedelta(minutes=duration)
-            
-            event = {
-                'summary': f'📅 Appointment: {patient_name}',
-                'description': f'Medical appointment with {patient_name}\n\nPatient Email: {patient_email}\nDoctor Email: {doctor_email}',
-                'start': {
-                    'dateTime': start.isoformat(),
-                    'timeZone': 'Asia/Kolkata',
-                },
-                'end': {
-                    'dateTime': end.isoformat(),
-                    'timeZone': 'Asia/Kolkata',
-                },
-                'reminders': {
-                    'useDefault': False,
-                    'overrides': [
-                        {'method': 'email', 'minutes': 24 * 60},
-                        {'method': 'popup', 'minutes': 30},
-                    ],
-                },
-                'colorId': '2',  # Green color for appointments
-            }
+            event = self._event_body(doctor_email, patient_name, patient_email,
+                                     start_time_iso, duration, event_id)
             
+            self.limiter.acquire()
             event_result = self.service.events().insert(
                 calendarId=self.calendar_id,
                 body=event
@@ -77,10 +177,112 @@ class CalendarTool:
             print(f"✅ Calendar event created: {event_link}")
             return event_id
             
+        except HttpError as e:
+            if event_id and e.resp.status == 409:
+                # An earlier attempt already created it
+                return event_id
+            print(f"⚠️  Calendar event creation failed: {e}")
+            return None
         except Exception as e:
             print(f"⚠️  Calendar event creation failed: {e}")
             return None
     
+    def create_events_batch(self, appointments: List[Dict], batch_size: int = MAX_BATCH_SIZE,
+                            max_attempts: int = 5, retry_base_seconds: float = 1.0,
+                            key: str = 'appointment_id') -> Dict:
+        """Create many events through batch requests, keyed by item[key].
+        
+        Each item carries appointment_id plus the create_event arguments;
+        key names a field that is unique per item (appointment_id unless
+        given). Event ids are derived from the appointment id unless given,
+        so re-running an import never duplicates events (a 409 is success).
+        Items answered with 429 or 5xx are retried with backoff.
+        Returns {"created": {item key: event_id}, "failed": {item key: error}}.
+        """
+        created: Dict[Any, str] = {}
+        failed: Dict[Any, str] = {}
+        if not self.enabled:
+            return {"created": created, "failed": {
+                item[key]: "Calendar not configured" for item in appointments
+            }}
+        
+        batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+        bodies = {}
+        for item in appointments:
+            item_key = item[key]
+            try:
+                bodies[item_key] = self._event_body(
+                    item['doctor_email'], item['patient_name'], item['patient_email'],
+                    item['start_time_iso'], item.get('duration', 30),
+                    item.get('event_id') or self.event_id_for(
+                        f"appointment:{item['appointment_id']}:calendar_event")
+                )
+            except (KeyError, ValueError) as e:
+                failed[item_key] = f"Invalid appointment: {e}"
+        
+        pending = list(bodies)
+        for attempt in range(1, max_attempts + 1):
+            retry: List[Any] = []
+            for i in range(0, len(pending), batch_size):
+                chunk = pending[i:i + batch_size]
+                retry.extend(self._insert_batch(chunk, bodies, created, failed))
+            if not retry:
+                break
+            pending = retry
+            if attempt < max_attempts:
+                delay = retry_base_seconds * 2 ** (attempt - 1)
+                time.sleep(delay * random.uniform(0.8, 1.2))
+        else:
+            for item_key in pending:
+                failed.setdefault(item_key, "Gave up after repeated rate limiting or server errors")
+        
+        print(f"✅ Calendar batch: {len(created)} created, {len(failed)} failed")
+        return {"created": created, "failed": failed}
+    
+    def _insert_batch(self, chunk: List[Any], bodies: Dict[Any, Dict],
+                      created: Dict[Any, str], failed: Dict[Any, str]) -> List[Any]:
+        """Send one batch request; returns the item keys worth retrying"""
+        retry: List[Any] = []
+        # Batch request ids must be strings; map them back to the item keys
+        keys = {str(item_key): item_key for item_key in chunk}
+        
+        def on_response(request_id: str, response: Optional[Dict], exception: Optional[Exception]):
+            item_key = keys[request_id]
+            if exception is None:
+                created[item_key] = response.get('id')
+                return
+            status = getattr(getattr(exception, 'resp', None), 'status', None)
+            if status == 409:
+                created[item_key] = bodies[item_key]['id']
+            elif status in RETRYABLE_STATUSES:
+                retry.append(item_key)
+                failed[item_key] = str(exception)
+            else:
+                failed[item_key] = str(exception)
+        
+        from googleapiclient.http import BatchHttpRequest
+        
+        batch = BatchHttpRequest(callback=on_response, batch_uri=self.batch_uri)
+        for request_id, item_key in keys.items():
+            failed.pop(item_key, None)
+            batch.add(
+                self.service.events().insert(calendarId=self.calendar_id,
+                                             body=bodies[item_key]),
+                request_id=request_id
+            )
+        
+        self.limiter.acquire(len(chunk))
+        try:
+            batch.execute()
+        except Exception as e:
+            # The whole batch failed to go through (network, 429 on the batch itself)
+            for item_key in chunk:
+                if item_key not in created:
+                    failed[item_key] = str(e)
+                    if item_key not in retry:
+                        retry.append(item_key)
+        return retry
+    
     def test_connection(self):
         """Test if Google Calendar connection works"""
         if not self.enabled:
@@ -0,0 +1,265 @@
+import io
+import threading
+from datetime import date, datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .db_pool import ConnectionPool, get_pool
+from .db_events import get_listener, listen_enabled
+
+# status is free text in the table; anything unlisted is coded as "other"
+STATUSES = ("confirmed", "cancelled", "no_show", "completed", "other")
+CANCELLED = STATUSES.index("cancelled")
+NO_SHOW = STATUSES.index("no_show")
+
+# One fixed-width COPY BINARY tuple: field count, then (length, value) per column
+_COPY_ROW = np.dtype([
+    ("fields", ">i2"),
+    ("id_len", ">i4"), ("id", ">i4"),
+    ("doctor_len", ">i4"), ("doctor_id", ">i4"),
+    ("time_len", ">i4"), ("time", ">i8"),
+    ("duration_len", ">i4"), ("duration", ">i4"),
+    ("status_len", ">i4"), ("status", ">i2"),
+])
+_COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\0"
+# Binary timestamps are microseconds since 2000-01-01
+_PG_EPOCH = np.datetime64("2000-01-01T00:00:00", "us")
+
+_COPY_SQL = """
+    COPY (
+        SELECT id, COALESCE(doctor_id, 0), appointment_time,
+               COALESCE(duration_minutes, 30),
+               CASE status {cases} ELSE {other} END::smallint
+        FROM appointments
+        WHERE {where}
+        ORDER BY id
+    ) TO STDOUT WITH (FORMAT binary)
+"""
+
+
+def _copy_sql(where: str) -> str:
+    cases = " ".join(f"WHEN '{status}' THEN {code}" for code, status in enumerate(STATUSES[:-1]))
+    return _COPY_SQL.format(cases=cases, other=len(STATUSES) - 1, where=where)
+
+
+def parse_copy_binary(data: bytes) -> Dict[str, np.ndarray]:
+    """Columns from a COPY ... (FORMAT binary) of the _COPY_SQL select list.
+
+    Every field is fixed width and non-null, so the tuples form one
+    structured array and no per-row Python runs at all.
+    """
+    if not data.startswith(_COPY_SIGNATURE):
+        raise ValueError("Not a COPY BINARY stream")
+    extension = int.from_bytes(data[15:19], "big")
+    body = data[19 + extension:]
+    if body[-2:] != b"\xff\xff":
+        raise ValueError("COPY BINARY stream is truncated")
+    body = body[:-2]
+    if len(body) % _COPY_ROW.itemsize:
+        raise ValueError("Unexpected COPY BINARY row layout")
+    rows = np.frombuffer(body, dtype=_COPY_ROW)
+    if len(rows) and ((rows["fields"] != 5).any() or (rows["status_len"] != 2).any()):
+        raise ValueError("Unexpected COPY BINARY row layout")
+    return {
+        "id": rows["id"].astype(np.int32),
+        "doctor_id": rows["doctor_id"].astype(np.int32),
+        "time": _PG_EPOCH + rows["time"].astype("timedelta64[us]"),
+        "duration": rows["duration"].astype(np.int32),
+        "status": rows["status"].astype(np.int8),
+    }
+
+
+class _Columns:
+    """Immutable snapshot of the appointments table, one array per column"""
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.id = columns["id"]
+        self.doctor_id = columns["doctor_id"]
+        self.time = columns["time"]
+        self.duration = columns["duration"]
+        self.status = columns["status"]
+        self.day = self.time.astype("datetime64[D]")
+        self.hour = ((self.time - self.day) // np.timedelta64(1, "h")).astype(np.int8)
+        # 1970-01-01 was a Thursday; shift so Monday is 0 like date.weekday()
+        self.weekday = ((self.day.astype(np.int64) + 3) % 7).astype(np.int8)
+
+    @classmethod
+    def empty(cls) -> "_Columns":
+        return cls({
+            "id": np.empty(0, np.int32), "doctor_id": np.empty(0, np.int32),
+            "time": np.empty(0, "datetime64[us]"), "duration": np.empty(0, np.int32),
+            "status": np.empty(0, np.int8),
+        })
+
+    def raw(self) -> Dict[str, np.ndarray]:
+        return {"id": self.id, "doctor_id": self.doctor_id, "time": self.time,
+                "duration": self.duration, "status": self.status}
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+
+def _day_keys(doctor_ids: np.ndarray, days: np.ndarray) -> np.ndarray:
+    return doctor_ids.astype(np.int64) * 1_000_000 + days.astype(np.int64)
+
+
+class ColumnarAnalytics:
+    """Appointments held as NumPy columns for dashboard-style slicing.
+
+    load() pulls the table with one COPY BINARY; refresh() appends rows
+    past the highest id seen and re-reads only the (doctor, day) pairs an
+    appointments_changed notification (migration 005) reported, so edits
+    and cancellations are picked up without a full reload. Queries are
+    vectorized over a snapshot and never touch the database.
+
+    Needs numpy, which is optional for the rest of the tools.
+    """
+
+    def __init__(self, pool: ConnectionPool = None):
+        self.pool = pool
+        self._columns = _Columns.empty()
+        self._high_water_mark = 0
+        self._dirty: Set[Tuple[int, date]] = set()
+        self._full_reload = True
+        self._lock = threading.Lock()
+        # Separate so the listener thread never waits behind a running refresh
+        self._dirty_lock = threading.Lock()
+
+    def _copy(self, where: str, params: tuple = ()) -> Dict[str, np.ndarray]:
+        buffer = io.BytesIO()
+        with (self.pool or get_pool()).connection() as conn, conn.cursor() as cur:
+            sql = cur.mogrify(_copy_sql(where), params).decode()
+            cur.copy_expert(sql, buffer)
+        return parse_copy_binary(buffer.getvalue())
+
+    def load(self) -> int:
+        """Replace the snapshot with a full copy of the table"""
+        with self._dirty_lock:
+            self._full_reload = True
+        return self.refresh()
+
+    def refresh(self) -> int:
+        """Catch up with the table; returns the number of rows read"""
+        with self._lock:
+            with self._dirty_lock:
+                full_reload, self._full_reload = self._full_reload, False
+                dirty, self._dirty = self._dirty, set()
+            if full_reload:
+                columns = self._copy("TRUE")
+                self._high_water_mark = 0
+                self._install(columns)
+                return len(columns["id"])
+
+            current = self._columns.raw()
+            changed = None
+            if dirty:
+                doctors = [doctor_id for doctor_id, _ in dirty]
+                days = [day for _, day in dirty]
+                changed = self._copy(
+                    "id <= %s AND (COALESCE(doctor_id, 0), appointment_time::date) IN "
+                    "(SELECT * FROM unnest(%s::int[], %s::date[]))",
+                    (self._high_water_mark, doctors, days)
+                )
+                stale = np.isin(
+                    _day_keys(self._columns.doctor_id, self._columns.day),
+                    _day_keys(np.array(doctors), np.array(days, dtype="datetime64[D]"))
+                ) | np.isin(self._columns.id, changed["id"])
+                current = {name: values[~stale] for name, values in current.items()}
+
+            appended = self._copy("id > %s", (self._high_water_mark,))
+            parts = [current] + ([changed] if changed is not None else []) + [appended]
+            self._install({
+                name: np.concatenate([part[name] for part in parts]) for name in current
+            })
+            return len(appended["id"]) + (len(changed["id"]) if changed is not None else 0)
+
+    def _install(self, columns: Dict[str, np.ndarray]):
+        snapshot = _Columns(columns)
+        if len(snapshot):
+            self._high_water_mark = max(self._high_water_mark, int(snapshot.id.max()))
+        self._columns = snapshot
+
+    def handle_notification(self, payload: str):
+        """Apply an appointments_changed payload ('<doctor_id>:<YYYY-MM-DD>')"""
+        try:
+            doctor_id, day = payload.split(":", 1)
+            key = (int(doctor_id), date.fromisoformat(day))
+        except ValueError:
+            # TRUNCATE, reconnects and unknown payloads need a full reload
+            with self._dirty_lock:
+                self._full_reload = True
+            return
+        with self._dirty_lock:
+            self._dirty.add(key)
+
+    def subscribe(self) -> "ColumnarAnalytics":
+        if listen_enabled():
+            get_listener().subscribe("appointments_changed", self.handle_notification)
+        return self
+
+    def _select(self, start_date: str = None, end_date: str = None, doctor_id: int = None,
+                statuses: Optional[Tuple[int, ...]] = None) -> Tuple[_Columns, np.ndarray]:
+        """Snapshot plus a boolean mask; by default every status but cancelled"""
+        cols = self._columns
+        mask = np.ones(len(cols), dtype=bool)
+        if start_date:
+            mask &= cols.day >= np.datetime64(start_date, "D")
+        if end_date:
+            mask &= cols.day <= np.datetime64(end_date, "D")
+        if doctor_id is not None:
+            mask &= cols.doctor_id == doctor_id
+        if statuses is None:
+            mask &= cols.status != CANCELLED
+        else:
+            mask &= np.isin(cols.status, statuses)
+        return cols, mask
+
+    def count_by(self, key: str, start_date: str = None, end_date: str = None,
+                 doctor_id: int = None, minutes: bool = False) -> Dict:
+        """Live appointments (or booked minutes) grouped by doctor, day, hour, weekday or status"""
+        statuses = tuple(range(len(STATUSES))) if key == "status" else None
+        cols, mask = self._select(start_date, end_date, doctor_id, statuses)
+        values = {
+            "doctor": cols.doctor_id, "day": cols.day, "hour": cols.hour,
+            "weekday": cols.weekday, "status": cols.status,
+        }[key][mask]
+        weights = cols.duration[mask] if minutes else None
+        groups, inverse = np.unique(values, return_inverse=True)
+        totals = np.bincount(inverse, weights=weights, minlength=len(groups))
+        labels = {
+            "day": lambda g: str(g),
+            "status": lambda g: STATUSES[int(g)],
+        }.get(key, int)
+        return {labels(group): int(total) for group, total in zip(groups, totals)}
+
+    def hourly_load(self, start_date: str = None, end_date: str = None,
+                    doctor_id: int = None) -> List[int]:
+        """Live appointments starting in each hour of the day, 0-23"""
+        cols, mask = self._select(start_date, end_date, doctor_id)
+        return np.bincount(cols.hour[mask], minlength=24).tolist()
+
+    def weekday_heatmap(self, start_date: str = None, end_date: str = None,
+                        doctor_id: int = None) -> List[List[int]]:
+        """7x24 grid of live appointments, Monday first"""
+        cols, mask = self._select(start_date, end_date, doctor_id)
+        cells = cols.weekday[mask].astype(np.int32) * 24 + cols.hour[mask]
+        return np.bincount(cells, minlength=7 * 24).reshape(7, 24).tolist()
+
+    def no_show_rates(self, start_date: str = None, end_date: str = None) -> Dict[int, float]:
+        """Share of each doctor's past, non-cancelled appointments marked no_show"""
+        cols, mask = self._select(start_date, end_date)
+        mask &= cols.time < np.datetime64(datetime.now(), "us")
+        doctors, inverse = np.unique(cols.doctor_id[mask], return_inverse=True)
+        total = np.bincount(inverse, minlength=len(doctors))
+        no_shows = np.bincount(inverse, weights=cols.status[mask] == NO_SHOW, minlength=len(doctors))
+        return {int(d): round(float(n / t), 4) for d, n, t in zip(doctors, no_shows, total)}
+
+    def stats(self) -> Dict:
+        cols = self._columns
+        return {
+            "rows": len(cols),
+            "high_water_mark": self._high_water_mark,
+            "bytes": sum(values.nbytes for values in cols.raw().values()),
+            "pending_days": len(self._dirty),
+        }
@@ -1,99 +1,107 @@
 import os
-import psycopg2
+from psycopg2 import errors
 from psycopg2.extras import RealDictCursor
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import List, Dict, Optional
 
+from . import slot_engine
+from .db_pool import ConnectionPool, get_pool
+from .doctor_directory import DoctorDirectory, get_directory
+from .schedule_cache import ScheduleCache, get_schedule
+from .booking_cache import BookedIntervalCache
+from .db_events import get_listener, listen_enabled
+from .outbox import enqueue_booking_notifications
+
+# Upper bound on the days find_available_slots will scan in one call
+MAX_SEARCH_DAYS = 31
+
 class DatabaseTool:
-    def __init__(self):
-        self.conn = psycopg2.connect(
-            host=os.getenv("DB_HOST", "localhost"),
-            database=os.getenv("DB_NAME", "appointments"),
-            user=os.getenv("DB_USER", "postgres"),
-            password=os.getenv("DB_PASSWORD")
+    def __init__(self, pool: ConnectionPool = None, directory: DoctorDirectory = None,
+                 schedule: ScheduleCache = None):
+        self.pool = pool or get_pool()
+        self.directory = directory or get_directory()
+        self.schedule = schedule or get_schedule()
+        self.booked_cache = BookedIntervalCache(
+            max_entries=int(os.getenv("BOOKED_CACHE_SIZE", "2048")),
+            ttl_seconds=float(os.getenv("BOOKED_CACHE_TTL", "60"))
         )
+        if listen_enabled():
+            get_listener().subscribe("appointments_changed", self.booked_cache.handle_notification)
+        # Whether migration 002's exclusion constraint exists; looked up on the first booking
+        self._overlap_constraint: Optional[bool] = None
+        
+        # Load the static tables up front so the first request doesn't pay for it
+        self.directory.warm()
+        self.schedule.warm()
     
     def get_doctor_by_name(self, doctor_name: str) -> Optional[Dict]:
         """Find doctor by name"""
-        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(
-                "SELECT * FROM doctors WHERE name ILIKE %s",
-                (f"%{doctor_name}%",)
-            )
-            result = cur.fetchone()
-            return dict(result) if result else None
+        return self.directory.resolve(doctor_name)
     
-    def check_availability(self, doctor_name: str, date: str, time_preference: str = None) -> Dict:
-        """Check doctor's availability for a specific date"""
-        doctor = self.get_doctor_by_name(doctor_name)
-        if not doctor:
-            return {"error": f"Doctor {doctor_name} not found"}
+    def get_booked_intervals(self, doctor_id: int, day: date) -> List[slot_engine.Interval]:
+        """Merged booked intervals for one doctor-day, served from the LRU when possible"""
+        booked = self.booked_cache.get(doctor_id, day)
+        if booked is not None:
+            return booked
         
-        target_date = datetime.strptime(date, '%Y-%m-%d')
-        day_of_week = target_date.weekday()
-        
-        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
-            # Get doctor's working hours
-            cur.execute("""
-                SELECT start_time, end_time 
-                FROM doctor_availability 
-                WHERE doctor_id = %s AND day_of_week = %s
-            """, (doctor['id'], day_of_week))
-            
-            availability = cur.fetchone()
-            if not availability:
-                return {
-                    "available": False,
-                    "message": f"Dr. {doctor['name']} is not available on {target_date.strftime('%A')}"
-                }
-            
-            # Get existing appointments
+        epoch = self.booked_cache.epoch()
+        day_start = datetime.combine(day, datetime.min.time())
+        with self.pool.connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute("""
                 SELECT appointment_time, duration_minutes 
                 FROM appointments 
                 WHERE doctor_id = %s 
-                AND DATE(appointment_time) = %s 
+                AND appointment_time >= %s 
+                AND appointment_time < %s 
                 AND status != 'cancelled'
                 ORDER BY appointment_time
-            """, (doctor['id'], date))
-            
-            booked_slots = [dict(row) for row in cur.fetchall()]
-        
-        # Generate available time slots
-        start_hour = availability['start_time'].hour
-        end_hour = availability['end_time'].hour
-        
-        if time_preference:
-            time_pref = time_preference.lower()
-            if time_pref == 'morning':
-                end_hour = min(end_hour, 12)
-            elif time_pref == 'afternoon':
-                start_hour = max(start_hour, 12)
-                end_hour = min(end_hour, 17)
-            elif time_pref == 'evening':
-                start_hour = max(start_hour, 17)
-        
-        available_slots = []
-        current_time = target_date.replace(hour=start_hour, minute=0, second=0, microsecond=0)
-        end_time = target_date.replace(hour=end_hour, minute=0, second=0, microsecond=0)
-        
-        while current_time < end_time:
-            slot_end = current_time + timedelta(minutes=30)
+            """, (doctor_id, day_start, day_start + timedelta(days=1)))
             
-            # Check conflicts
-            is_available = True
-            for booking in booked_slots:
-                booking_start = booking['appointment_time']
-                booking_end = booking_start + timedelta(minutes=booking['duration_minutes'])
-                
-                if not (slot_end <= booking_start or current_time >= booking_end):
-                    is_available = False
-                    break
-            
-            if is_available:
-                available_slots.append(current_time.strftime('%H:%M'))
-            
-            current_time += timedelta(minutes=30)
+            booked = slot_engine.booked_intervals(cur.fetchall())
+        
+        self.booked_cache.put(doctor_id, day, booked, epoch)
+        return booked
+    
+    def has_overlap_constraint(self) -> bool:
+        """True when appointments_no_overlap (migration 002) guards the table"""
+        if self._overlap_constraint is None:
+            with self.pool.connection() as conn, conn.cursor() as cur:
+                cur.execute("""
+                    SELECT 1 FROM pg_constraint
+                    WHERE conname = 'appointments_no_overlap'
+                    AND conrelid = 'appointments'::regclass
+                """)
+                self._overlap_constraint = cur.fetchone() is not None
+            if not self._overlap_constraint:
+                print("⚠️  appointments_no_overlap constraint missing (migration 002 needs btree_gist)"
+                      " - serializing bookings per doctor with advisory locks")
+        return self._overlap_constraint
+    
+    def cache_stats(self) -> Dict:
+        return self.booked_cache.stats()
+    
+    def check_availability(self, doctor_name: str, date: str, time_preference: str = None,
+                           slot_minutes: int = 30) -> Dict:
+        """Check doctor's availability for a specific date"""
+        doctor = self.get_doctor_by_name(doctor_name)
+        if not doctor:
+            return {"error": f"Doctor {doctor_name} not found"}
+        
+        target_date = datetime.strptime(date, '%Y-%m-%d')
+        
+        if not self.schedule.hours_for(doctor['id'], target_date.date()):
+            return {
+                "available": False,
+                "message": f"Dr. {doctor['name']} is not available on {target_date.strftime('%A')}"
+            }
+        working = self.schedule.working_intervals(doctor['id'], target_date.date(), time_preference)
+        
+        booked = self.get_booked_intervals(doctor['id'], target_date.date())
+        
+        available_slots = [
+            slot.strftime('%H:%M')
+            for slot in slot_engine.free_slots(working, booked, slot_minutes)
+        ]
         
         return {
             "available": len(available_slots) > 0,
@@ -103,48 +111,169 @@ class DatabaseTool:
             "doctor_id": doctor['id']
         }
     
+    def find_available_slots(self, doctor_or_specialty: str, start_date: str, end_date: str = None,
+                             time_preference: str = None, limit: int = 10,
+                             slot_minutes: int = 30) -> Dict:
+        """Find the earliest free slots across doctors and days in one round trip"""
+        first_day = datetime.strptime(start_date, '%Y-%m-%d').date()
+        last_day = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else first_day
+        if last_day < first_day:
+            return {"error": "end_date must not be before start_date"}
+        if (last_day - first_day).days >= MAX_SEARCH_DAYS:
+            return {"error": f"Search range is limited to {MAX_SEARCH_DAYS} days"}
+        limit = max(1, min(int(limit or 10), 50))
+        
+        matched = self.directory.match(doctor_or_specialty)
+        if not matched:
+            return {"error": f"No doctor or specialty matching {doctor_or_specialty}"}
+        
+        epoch = self.booked_cache.epoch()
+        with self.pool.connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+            # Bookings for every matching doctor over the whole range
+            cur.execute("""
+                SELECT doctor_id, appointment_time, duration_minutes
+                FROM appointments
+                WHERE doctor_id = ANY(%s)
+                AND appointment_time >= %s
+                AND appointment_time < %s
+                AND status != 'cancelled'
+            """, ([doctor['id'] for doctor in matched], first_day, last_day + timedelta(days=1)))
+            
+            rows_by_day: Dict[tuple, List[Dict]] = {}
+            for row in cur.fetchall():
+                rows_by_day.setdefault((row['doctor_id'], row['appointment_time'].date()), []).append(row)
+        
+        # The range query saw every doctor-day, so it warms the cache for later checks
+        bookings: Dict[tuple, List[slot_engine.Interval]] = {}
+        day = first_day
+        while day <= last_day:
+            for doctor in matched:
+                booked = slot_engine.booked_intervals(rows_by_day.get((doctor['id'], day), []))
+                bookings[(doctor['id'], day)] = booked
+                self.booked_cache.put(doctor['id'], day, booked, epoch)
+            day += timedelta(days=1)
+        
+        found = []
+        day = first_day
+        while day <= last_day and len(found) < limit:
+            day_slots = []
+            for doctor in matched:
+                working = self.schedule.working_intervals(doctor['id'], day, time_preference)
+                if not working:
+                    continue
+                booked = bookings[(doctor['id'], day)]
+                for slot in slot_engine.free_slots(working, booked, slot_minutes):
+                    day_slots.append((slot, doctor['name'], doctor['id'], doctor['specialty']))
+            day_slots.sort()
+            for slot, name, doctor_id, specialty in day_slots[:limit - len(found)]:
+                found.append({
+                    "doctor": name,
+                    "doctor_id": doctor_id,
+                    "specialty": specialty,
+                    "date": slot.strftime('%A, %B %d, %Y'),
+                    "time": slot.strftime('%H:%M'),
+                    "datetime": slot.isoformat()
+                })
+            day += timedelta(days=1)
+        
+        return {
+            "available": len(found) > 0,
+            "doctors": sorted(doctor['name'] for doctor in matched),
+            "start_date": first_day.isoformat(),
+            "end_date": last_day.isoformat(),
+            "slots": found
+        }
+    
     def book_appointment(self, doctor_name: str, patient_name: str, 
-                        patient_email: str, appointment_datetime: str) -> Dict:
-        """Book an appointment"""
+                        patient_email: str, appointment_datetime: str,
+                        enqueue_notifications: bool = False) -> Dict:
+        """Book an appointment.
+
+        With enqueue_notifications, the calendar event and confirmation email
+        are written to notification_outbox in the same transaction, for the
+        OutboxWorker to deliver after the booking commits.
+        """
         doctor = self.get_doctor_by_name(doctor_name)
         if not doctor:
             return {"error": f"Doctor {doctor_name} not found"}
         
         appt_time = datetime.fromisoformat(appointment_datetime)
+        appt_end = appt_time + timedelta(minutes=30)
         
-        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
-            # Check if slot is available
-            cur.execute("""
-                SELECT * FROM appointments 
-                WHERE doctor_id = %s 
-                AND appointment_time = %s 
-                AND status != 'cancelled'
-            """, (doctor['id'], appt_time))
-            
-            if cur.fetchone():
-                return {"error": "This time slot is already booked"}
-            
-            # Book the appointment
+        working = self.schedule.working_intervals(doctor['id'], appt_time.date())
+        if not slot_engine.fits_within(working, appt_time, appt_end):
+            return {"error": f"{doctor['name']} is not working at {appt_time.strftime('%A %I:%M %p')}"}
+        
+        # Normally a single INSERT: the appointments_no_overlap exclusion constraint
+        # rejects any overlap with a live booking, even under concurrent writers
+        guarded = self.has_overlap_constraint()
+        try:
+            with self.pool.connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+                if not guarded:
+                    # Without the constraint, one writer per doctor checks and inserts at a time
+                    cur.execute("SELECT pg_advisory_xact_lock(hashtext('appointments'), %s)",
+                                (doctor['id'],))
+                    day_start = datetime.combine(appt_time.date(), datetime.min.time())
+                    cur.execute("""
+                        SELECT appointment_time, duration_minutes 
+                        FROM appointments 
+                        WHERE doctor_id = %s 
+                        AND appointment_time >= %s 
+                        AND appointment_time < %s 
+                        AND status != 'cancelled'
+                        ORDER BY appointment_time
+                    """, (doctor['id'], day_start, day_start + timedelta(days=1)))
+                    if not slot_engine.is_free(slot_engine.booked_intervals(cur.fetchall()),
+                                               appt_time, appt_end):
+                        return {"error": "This time slot is already booked"}
+                
+                cur.execute("""
+                    INSERT INTO appointments 
+                    (doctor_id, patient_name, patient_email, appointment_time, duration_minutes)
+                    VALUES (%s, %s, %s, %s, %s)
+                    RETURNING id
+                """, (doctor['id'], patient_name, patient_email, appt_time, 30))
+                
+                appointment_id = cur.fetchone()['id']
+                result = {
+                    "success": True,
+                    "appointment_id": appointment_id,
+                    "doctor": doctor['name'],
+                    "doctor_email": doctor['email'],
+                    "patient": patient_name,
+                    "patient_email": patient_email,
+                    "time": appt_time.isoformat(),
+                    "formatted_time": appt_time.strftime('%A, %B %d, %Y at %I:%M %p')
+                }
+                if enqueue_notifications:
+                    enqueue_booking_notifications(cur, appointment_id, result)
+                    result["notifications"] = "queued"
+        except errors.ExclusionViolation:
+            return {"error": "This time slot is already booked"}
+        
+        self.booked_cache.add(doctor['id'], appt_time.date(), (appt_time, appt_end))
+        return result
+    
+    def cancel_appointment(self, appointment_id: int) -> Dict:
+        """Cancel an appointment and free its slot"""
+        with self.pool.connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
             cur.execute("""
-                INSERT INTO appointments 
-                (doctor_id, patient_name, patient_email, appointment_time, duration_minutes)
-                VALUES (%s, %s, %s, %s, %s)
-                RETURNING id
-            """, (doctor['id'], patient_name, patient_email, appt_time, 30))
-            
-            appointment_id = cur.fetchone()['id']
-            self.conn.commit()
+                UPDATE appointments 
+                SET status = 'cancelled' 
+                WHERE id = %s AND status != 'cancelled'
+                RETURNING doctor_id, appointment_time
+            """, (appointment_id,))
+            row = cur.fetchone()
+        
+        if not row:
+            return {"error": f"Appointment {appointment_id} not found or already cancelled"}
         
+        self.booked_cache.invalidate(row['doctor_id'], row['appointment_time'].date())
         return {
             "success": True,
             "appointment_id": appointment_id,
-            "doctor": doctor['name'],
-            "doctor_email": doctor['email'],
-            "patient": patient_name,
-            "patient_email": patient_email,
-            "time": appt_time.isoformat(),
-            "formatted_time": appt_time.strftime('%A, %B %d, %Y at %I:%M %p')
+            "time": row['appointment_time'].isoformat()
         }
     
     def close(self):
-        self.conn.close()
\ No newline at end of file
+        """Nothing to release: the shared pool is closed once at process shutdown"""
\ No newline at end of file
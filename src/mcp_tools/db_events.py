@@ -0,0 +1,122 @@
+import os
+import select
+import threading
+from typing import Callable, Dict, List
+
+import psycopg2
+from psycopg2 import extensions
+
+
+class NotificationListener:
+    """Background LISTEN loop that fans Postgres NOTIFY payloads out to callbacks.
+
+    Uses its own autocommit connection (a pooled one would be held forever)
+    and reconnects with backoff if the connection drops.
+    """
+
+    def __init__(self, poll_timeout: float = 5.0, **connect_kwargs):
+        self.poll_timeout = poll_timeout
+        self.connect_kwargs = connect_kwargs
+        self._subscribers: Dict[str, List[Callable[[str], None]]] = {}
+        self._lock = threading.Lock()
+        self._conn = None
+        self._listening: set = set()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def subscribe(self, channel: str, callback: Callable[[str], None]):
+        """Call `callback(payload)` for every NOTIFY on `channel`"""
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append(callback)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="pg-listener", daemon=True
+                )
+                self._thread.start()
+
+    def _connect(self):
+        conn = psycopg2.connect(**self.connect_kwargs)
+        conn.set_isolation_level(extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        self._listening = set()
+        return conn
+
+    def _listen_new_channels(self):
+        with self._lock:
+            channels = set(self._subscribers) - self._listening
+        with self._conn.cursor() as cur:
+            for channel in channels:
+                cur.execute(f'LISTEN "{channel}"')
+                self._listening.add(channel)
+
+    def _dispatch(self, channel: str, payload: str):
+        with self._lock:
+            callbacks = list(self._subscribers.get(channel, []))
+        for callback in callbacks:
+            try:
+                callback(payload)
+            except Exception as e:
+                print(f"⚠️  Notification handler for {channel} failed: {e}")
+
+    def _reconnected(self):
+        # Anything may have changed while we were not listening
+        with self._lock:
+            channels = list(self._subscribers)
+        for channel in channels:
+            self._dispatch(channel, "")
+
+    def _run(self):
+        backoff = 1.0
+        while not self._stop.is_set():
+            try:
+                if self._conn is None or self._conn.closed:
+                    had_connection = self._conn is not None
+                    self._conn = self._connect()
+                    if had_connection:
+                        self._reconnected()
+                    backoff = 1.0
+                self._listen_new_channels()
+
+                if select.select([self._conn], [], [], self.poll_timeout) == ([], [], []):
+                    continue
+                self._conn.poll()
+                while self._conn.notifies:
+                    notify = self._conn.notifies.pop(0)
+                    self._dispatch(notify.channel, notify.payload)
+            except Exception as e:
+                if backoff == 1.0:
+                    print(f"⚠️  Database listener disconnected: {e}")
+                try:
+                    if self._conn is not None:
+                        self._conn.close()
+                except Exception:
+                    pass
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 60.0)
+
+    def stop(self):
+        self._stop.set()
+        if self._conn is not None:
+            self._conn.close()
+
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def get_listener() -> NotificationListener:
+    """Return the process-wide listener, configured like the connection pool"""
+    global _listener
+    if _listener is None:
+        with _listener_lock:
+            if _listener is None:
+                _listener = NotificationListener(
+                    host=os.getenv("DB_HOST", "localhost"),
+                    database=os.getenv("DB_NAME", "appointments"),
+                    user=os.getenv("DB_USER", "postgres"),
+                    password=os.getenv("DB_PASSWORD"),
+                )
+    return _listener
+
+
+def listen_enabled() -> bool:
+    return os.getenv("DB_LISTEN", "1") != "0"
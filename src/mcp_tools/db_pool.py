@@ -0,0 +1,204 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import psycopg2
+from psycopg2 import extensions
+
+
+class PoolExhaustedError(Exception):
+    """Raised when no connection becomes free before the checkout timeout"""
+
+
+class ConnectionPool:
+    """Thread-safe PostgreSQL connection pool shared by the database tools.
+
+    Connections are health-checked on checkout and transparently replaced
+    when they are closed, broken, or stuck in an aborted transaction.
+    """
+
+    def __init__(self, min_size: int = 1, max_size: int = 10,
+                 checkout_timeout: float = 10.0, health_check_interval: float = 30.0,
+                 **connect_kwargs):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool size: min={min_size}, max={max_size}")
+
+        self.min_size = min_size
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+        self.connect_kwargs = connect_kwargs
+
+        self._idle: List = []
+        self._last_used: Dict[int, float] = {}
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+
+        for _ in range(min_size):
+            self._idle.append(self._open())
+            self._size += 1
+
+    def _open(self):
+        conn = psycopg2.connect(**self.connect_kwargs)
+        self._last_used[id(conn)] = time.monotonic()
+        return conn
+
+    def _discard(self, conn):
+        self._last_used.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, conn) -> bool:
+        """Check a connection before handing it out"""
+        if conn.closed:
+            return False
+
+        status = conn.get_transaction_status()
+        if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        if status != extensions.TRANSACTION_STATUS_IDLE:
+            # Left mid-transaction or aborted - reset it
+            try:
+                conn.rollback()
+            except Exception:
+                return False
+
+        # Only ping connections that sat idle long enough to have gone stale
+        idle_for = time.monotonic() - self._last_used.get(id(conn), 0)
+        if idle_for >= self.health_check_interval:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+                conn.rollback()
+            except Exception:
+                return False
+        return True
+
+    def getconn(self):
+        """Check out a healthy connection, reconnecting if needed"""
+        deadline = time.monotonic() + self.checkout_timeout
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolExhaustedError("Connection pool is closed")
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    # Reserve the slot, connect outside the lock
+                    self._size += 1
+                    conn = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolExhaustedError(
+                        f"No database connection available after {self.checkout_timeout}s "
+                        f"(max_size={self.max_size})"
+                    )
+                self._cond.wait(remaining)
+
+        try:
+            if conn is None or not self._is_healthy(conn):
+                if conn is not None:
+                    self._discard(conn)
+                conn = self._open()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        return conn
+
+    def putconn(self, conn, discard: bool = False):
+        """Return a connection to the pool"""
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+
+        with self._cond:
+            if discard or conn.closed or self._closed:
+                self._size -= 1
+                self._discard(conn)
+            else:
+                self._last_used[id(conn)] = time.monotonic()
+                self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; commits on success, rolls back on error"""
+        conn = self.getconn()
+        discard = False
+        try:
+            yield conn
+            conn.commit()
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            discard = True
+            raise
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                discard = True
+            raise
+        finally:
+            self.putconn(conn, discard=discard)
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+            }
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            self._discard(conn)
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Return the process-wide pool, creating it from the environment on first use"""
+    global _pool
+    if _pool is None or _pool._closed:
+        with _pool_lock:
+            if _pool is None or _pool._closed:
+                _pool = ConnectionPool(
+                    min_size=int(os.getenv("DB_POOL_MIN", "1")),
+                    max_size=int(os.getenv("DB_POOL_MAX", "10")),
+                    checkout_timeout=float(os.getenv("DB_POOL_TIMEOUT", "10")),
+                    host=os.getenv("DB_HOST", "localhost"),
+                    database=os.getenv("DB_NAME", "appointments"),
+                    user=os.getenv("DB_USER", "postgres"),
+                    password=os.getenv("DB_PASSWORD"),
+                )
+    return _pool
+
+
+def close_pool():
+    """Close the process-wide pool; the next get_pool() call opens a fresh one"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
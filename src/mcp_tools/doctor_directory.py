@@ -0,0 +1,151 @@
+import re
+import time
+import threading
+from difflib import get_close_matches
+from typing import Dict, List, Optional
+
+from psycopg2.extras import RealDictCursor
+
+from .db_pool import ConnectionPool, get_pool
+from .db_events import get_listener, listen_enabled
+
+TITLE_WORDS = {"dr", "doctor", "prof", "professor"}
+
+
+def normalize_name(name: str) -> str:
+    """'Dr. Ahuja' / 'dr ahuja' / 'AHUJA' -> 'ahuja'"""
+    tokens = re.sub(r"[^a-z0-9 ]+", " ", (name or "").lower()).split()
+    return " ".join(token for token in tokens if token not in TITLE_WORDS)
+
+
+class _Index:
+    """Immutable lookup tables built from one snapshot of the doctors table"""
+
+    def __init__(self, rows: List[Dict]):
+        self.by_id: Dict[int, Dict] = {}
+        self.by_name: Dict[str, int] = {}
+        self.by_token: Dict[str, List[int]] = {}
+        for row in sorted(rows, key=lambda r: r['id']):
+            doctor = dict(row)
+            key = normalize_name(doctor['name'])
+            self.by_id[doctor['id']] = doctor
+            self.by_name.setdefault(key, doctor['id'])
+            for token in key.split():
+                self.by_token.setdefault(token, []).append(doctor['id'])
+        self.fuzzy_keys = list(self.by_name) + [t for t in self.by_token if t not in self.by_name]
+        self.resolved: Dict[str, Optional[int]] = {}
+
+
+class DoctorDirectory:
+    """In-process cache of the doctors table with normalized and fuzzy name lookup.
+
+    Loaded once, then refreshed after `ttl_seconds` or as soon as a
+    `doctors_changed` notification arrives from migration 003's trigger.
+    """
+
+    MAX_MEMOIZED = 1024
+
+    def __init__(self, pool: ConnectionPool = None, ttl_seconds: float = 300.0):
+        self.pool = pool
+        self.ttl_seconds = ttl_seconds
+        self._index: Optional[_Index] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self, rows: List[Dict] = None):
+        """Reload from the database, or install the given rows directly"""
+        if rows is None:
+            with (self.pool or get_pool()).connection() as conn, \
+                    conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute("SELECT * FROM doctors ORDER BY id")
+                rows = cur.fetchall()
+        self._index = _Index(rows)
+        self._loaded_at = time.monotonic()
+
+    def invalidate(self, payload: str = None):
+        self._loaded_at = 0.0
+
+    def warm(self):
+        """Load now unless a fresh snapshot is already in memory"""
+        self._current()
+
+    def _current(self) -> _Index:
+        if self._index is None or time.monotonic() - self._loaded_at >= self.ttl_seconds:
+            with self._lock:
+                if self._index is None or time.monotonic() - self._loaded_at >= self.ttl_seconds:
+                    self.refresh()
+        return self._index
+
+    def get(self, doctor_id: int) -> Optional[Dict]:
+        return self._current().by_id.get(doctor_id)
+
+    def all(self) -> List[Dict]:
+        return list(self._current().by_id.values())
+
+    def resolve(self, doctor_name: str) -> Optional[Dict]:
+        """Find a doctor by exact, normalized, partial or misspelled name"""
+        index = self._current()
+        query = normalize_name(doctor_name)
+        if query in index.resolved:
+            doctor_id = index.resolved[query]
+        else:
+            doctor_id = self._resolve_id(index, query)
+            if len(index.resolved) < self.MAX_MEMOIZED:
+                index.resolved[query] = doctor_id
+        return index.by_id.get(doctor_id) if doctor_id is not None else None
+
+    @staticmethod
+    def _resolve_id(index: _Index, query: str) -> Optional[int]:
+        if not query:
+            return None
+        if query in index.by_name:
+            return index.by_name[query]
+
+        # Every query token names the same doctor ("ahuja", "rakesh ahuja")
+        candidates = None
+        for token in query.split():
+            ids = set(index.by_token.get(token, ()))
+            candidates = ids if candidates is None else candidates & ids
+        if candidates:
+            return min(candidates)
+
+        # Substring, matching the old ILIKE '%name%' behaviour
+        for key, doctor_id in index.by_name.items():
+            if query in key:
+                return doctor_id
+
+        # Typos: "ahuha", "sharmaa"
+        match = get_close_matches(query, index.fuzzy_keys, n=1, cutoff=0.75)
+        if match:
+            key = match[0]
+            return index.by_name[key] if key in index.by_name else index.by_token[key][0]
+        return None
+
+    def match(self, doctor_or_specialty: str) -> List[Dict]:
+        """Doctors whose specialty contains the term, or the doctor the name resolves to"""
+        term = (doctor_or_specialty or "").strip().lower()
+        by_specialty = [
+            doctor for doctor in self.all()
+            if term and term in (doctor.get('specialty') or '').lower()
+        ]
+        if by_specialty:
+            return by_specialty
+        doctor = self.resolve(doctor_or_specialty)
+        return [doctor] if doctor else []
+
+
+_directory: Optional[DoctorDirectory] = None
+_directory_lock = threading.Lock()
+
+
+def get_directory() -> DoctorDirectory:
+    """Return the process-wide directory, subscribed to doctors_changed when enabled"""
+    global _directory
+    if _directory is None:
+        with _directory_lock:
+            if _directory is None:
+                directory = DoctorDirectory()
+                if listen_enabled():
+                    get_listener().subscribe("doctors_changed", directory.invalidate)
+                _directory = directory
+    return _directory
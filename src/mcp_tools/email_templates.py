@@ -0,0 +1,137 @@
+import re
+import base64
+import html
+import threading
+from pathlib import Path
+from email.utils import formatdate, make_msgid
+from typing import Dict, List, Optional
+
+TEMPLATE_DIR = Path(__file__).parent / "templates"
+KINDS = ("confirmation", "reminder", "cancellation")
+
+# {{field}} is substituted per message; {{> name}} is a partial inlined at compile time
+_FIELD = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+_PARTIAL = re.compile(r"\{\{>\s*(\w+)\s*\}\}")
+
+
+class Template:
+    """A template split once into static chunks and field slots.
+
+    Rendering only converts the field values and joins the pre-split
+    chunks, so the static markup is never re-scanned or re-built.
+    """
+
+    def __init__(self, source: str, escape: bool = False, partials: Optional[Dict[str, str]] = None):
+        if partials:
+            source = _PARTIAL.sub(lambda m: partials[m.group(1)], source)
+        parts = _FIELD.split(source)
+        self.escape = escape
+        self._chunks: List[str] = parts[0::2]
+        self.fields: List[str] = parts[1::2]
+
+    def render(self, values: Dict) -> str:
+        convert = (lambda v: html.escape(str(v), quote=True)) if self.escape else str
+        out = [self._chunks[0]]
+        for field, chunk in zip(self.fields, self._chunks[1:]):
+            out.append(convert(values[field]))
+            out.append(chunk)
+        return "".join(out)
+
+
+class EmailTemplate:
+    """Subject, plain-text and HTML templates for one kind of email"""
+
+    def __init__(self, name: str, template_dir: Path = TEMPLATE_DIR):
+        text = (template_dir / f"{name}.txt").read_text(encoding="utf-8")
+        subject_line, _, body = text.partition("\n\n")
+        if not subject_line.startswith("Subject:"):
+            raise ValueError(f"{name}.txt must start with a 'Subject:' line")
+
+        layout = (template_dir / "layout.html").read_text(encoding="utf-8")
+        fragment = (template_dir / f"{name}.html").read_text(encoding="utf-8")
+
+        self.name = name
+        self.subject = Template(subject_line[len("Subject:"):].strip())
+        self.text = Template(body)
+        self.html = Template(layout, escape=True, partials={"body": fragment.rstrip("\n")})
+        self.fields = sorted(set(self.subject.fields) | set(self.text.fields) | set(self.html.fields))
+
+
+def _header(value: str) -> str:
+    """Single-line header value, RFC 2047 encoded only when needed.
+
+    email.header.Header does the same job but re-measures the value once per
+    character; plain base64 encoded-words of at most 45 bytes are enough here.
+    """
+    value = " ".join(str(value).split())
+    if value.isascii():
+        return value
+    words, chunk = [], b""
+    for char in value:
+        encoded = char.encode("utf-8")
+        if len(chunk) + len(encoded) > 45:
+            words.append(chunk)
+            chunk = b""
+        chunk += encoded
+    words.append(chunk)
+    return "\n ".join(f"=?utf-8?b?{base64.b64encode(word).decode('ascii')}?=" for word in words)
+
+
+def _base64_body(text: str) -> str:
+    return base64.encodebytes(text.encode("utf-8")).decode("ascii")
+
+
+class MessageSkeleton:
+    """Serialized multipart/alternative layout reused for every message.
+
+    Equivalent to building a MIMEMultipart with a text and an HTML part and
+    calling as_string(), without the per-message object tree. Parts are
+    base64 encoded, so the fixed boundary can never collide with a body.
+    """
+
+    BOUNDARY = "==clinic-alt-boundary=="
+
+    def __init__(self, sender_email: str, sender_name: str = "Doctor Appointment Agent"):
+        self.from_header = f"{sender_name} <{sender_email}>"
+        self.domain = (sender_email or "localhost").rsplit("@", 1)[-1]
+        part = (
+            f"--{self.BOUNDARY}\n"
+            'Content-Type: text/{subtype}; charset="utf-8"\n'
+            "MIME-Version: 1.0\n"
+            "Content-Transfer-Encoding: base64\n\n"
+        )
+        self._text_head = part.format(subtype="plain")
+        self._html_head = "\n" + part.format(subtype="html")
+        self._tail = f"\n--{self.BOUNDARY}--\n"
+        self._head = (
+            f'Content-Type: multipart/alternative; boundary="{self.BOUNDARY}"\n'
+            "MIME-Version: 1.0\n"
+        )
+
+    def build(self, subject: str, to_email: str, text: str, html_body: str,
+              message_id: Optional[str] = None) -> str:
+        return "".join((
+            self._head,
+            "Subject: ", _header(subject), "\n",
+            "From: ", self.from_header, "\n",
+            "To: ", _header(to_email), "\n",
+            "Message-ID: ", message_id or make_msgid(domain=self.domain), "\n",
+            "Date: ", formatdate(localtime=True), "\n\n",
+            self._text_head, _base64_body(text),
+            self._html_head, _base64_body(html_body),
+            self._tail,
+        ))
+
+
+_templates: Optional[Dict[str, EmailTemplate]] = None
+_templates_lock = threading.Lock()
+
+
+def get_templates() -> Dict[str, EmailTemplate]:
+    """Compile every template once per process"""
+    global _templates
+    if _templates is None:
+        with _templates_lock:
+            if _templates is None:
+                _templates = {name: EmailTemplate(name) for name in KINDS}
+    return _templates
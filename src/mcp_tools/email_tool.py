@@ -1,236 +1,78 @@
 import os
+import hashlib
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from datetime import datetime
+from typing import Dict
+
+from .smtp_pool import SMTPPool
+from .email_templates import MessageSkeleton, get_templates
 
 class EmailTool:
-    def __init__(self):
-        self.smtp_server = "smtp.gmail.com"
-        self.smtp_port = 587
-        self.sender_email = os.getenv("GMAIL_USER")
-        self.sender_password = os.getenv("GMAIL_APP_PASSWORD")
+    def __init__(self, smtp_server: str = None, smtp_port: int = None,
+                 sender_email: str = None, sender_password: str = None,
+                 starttls: bool = None):
+        """Settings default to the SMTP_* / GMAIL_* environment variables"""
+        self.smtp_server = smtp_server or os.getenv("SMTP_HOST", "smtp.gmail.com")
+        self.smtp_port = smtp_port or int(os.getenv("SMTP_PORT", "587"))
+        self.use_starttls = (
+            starttls if starttls is not None else os.getenv("SMTP_STARTTLS", "1") != "0"
+        )
+        self.sender_email = sender_email or os.getenv("GMAIL_USER")
+        self.sender_password = sender_password or os.getenv("GMAIL_APP_PASSWORD")
         self.enabled = bool(self.sender_email and self.sender_password)
         
+        # Templates are compiled once; each send only fills in the fields
+        self.templates = get_templates()
+        self.skeleton = MessageSkeleton(self.sender_email)
+        
+        # Authenticated sessions are reused across emails; opened on first send
+        self.smtp_pool = SMTPPool(
+            self.smtp_server, self.smtp_port,
+            username=self.sender_email, password=self.sender_password,
+            starttls=self.use_starttls,
+            max_size=int(os.getenv("SMTP_POOL_SIZE", "3")),
+            idle_timeout=float(os.getenv("SMTP_IDLE_TIMEOUT", "240"))
+        )
+        
         if not self.enabled:
             print("⚠️  Gmail not configured - skipping email notifications")
         else:
             print(f"✅ Email notifications enabled ({self.sender_email})")
     
-    def send_confirmation(self, to_email: str, patient_name: str,
-                         doctor_name: str, appointment_time: str):
-        """Send appointment confirmation email"""
+    def message_id_for(self, key: str) -> str:
+        """Stable Message-ID for an idempotency key, so resends can be deduplicated"""
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        domain = (self.sender_email or "localhost").rsplit("@", 1)[-1]
+        return f"<{digest}@{domain}>"
+    
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=30)
+        if self.use_starttls:
+            server.starttls()
+        server.login(self.sender_email, self.sender_password)
+        return server
+    
+    def render_message(self, kind: str, to_email: str, values: Dict,
+                       message_id: str = None) -> str:
+        """Serialized email of the given kind (confirmation, reminder, cancellation)"""
+        template = self.templates[kind]
+        return self.skeleton.build(
+            template.subject.render(values),
+            to_email,
+            template.text.render(values),
+            template.html.render(values),
+            message_id
+        )
+    
+    def _send(self, kind: str, to_email: str, values: Dict, message_id: str = None) -> bool:
         if not self.enabled:
             print(f"⚠️  Email skipped (not configured)")
             return False
         
         try:
-            message = MIMEMultipart("alternative")
-            message["Subject"] = f"✅ Appointment Confirmed - {doctor_name}"
-            message["From"] = f"Doctor Appointment Agent <{self.sender_email}>"
-            message["To"] = to_email
-            
-            # Plain text version
-            text = f"""
-Dear {patient_name},
-
-Your appointment has been successfully confirmed!
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━
-APPOINTMENT DETAILS
-━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Doctor  : {doctor_name}
-Patient : {patient_name}
-Time    : {appointment_time}
-━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-Important Reminders:
-- Please arrive 10 minutes early
-- Bring any previous medical records
-- Bring a valid ID
-
-If you need to reschedule or cancel, please contact us.
-
-Thank you,
-Doctor Appointment Scheduling System
-            """
+            message = self.render_message(kind, to_email, values, message_id)
+            self.smtp_pool.send(self.sender_email, [to_email], message)
             
-            # HTML version
-            html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <style>
-        body {{
-            font-family: Arial, sans-serif;
-            background-color: #f0f2f5;
-            margin: 0;
-            padding: 20px;
-        }}
-        .container {{
-            max-width: 600px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 16px;
-            overflow: hidden;
-            box-shadow: 0 4px 20px rgba(0,0,0,0.1);
-        }}
-        .header {{
-            background: linear-gradient(135deg, #1e3a8a, #2563eb);
-            color: white;
-            padding: 30px;
-            text-align: center;
-        }}
-        .header h1 {{
-            margin: 0;
-            font-size: 24px;
-        }}
-        .header p {{
-            margin: 8px 0 0;
-            opacity: 0.9;
-        }}
-        .success-badge {{
-            background: #dcfce7;
-            border: 2px solid #86efac;
-            border-radius: 50px;
-            padding: 12px 24px;
-            text-align: center;
-            margin: 24px;
-            color: #166534;
-            font-size: 18px;
-            font-weight: bold;
-        }}
-        .details-card {{
-            margin: 0 24px 24px;
-            background: #f8fafc;
-            border-radius: 12px;
-            padding: 24px;
-            border: 1px solid #e2e8f0;
-        }}
-        .details-card h2 {{
-            color: #1e293b;
-            font-size: 16px;
-            margin: 0 0 16px;
-            text-transform: uppercase;
-            letter-spacing: 1px;
-            color: #64748b;
-        }}
-        .detail-row {{
-            display: flex;
-            padding: 10px 0;
-            border-bottom: 1px solid #e2e8f0;
-        }}
-        .detail-row:last-child {{
-            border-bottom: none;
-        }}
-        .detail-label {{
-            font-weight: bold;
-            color: #475569;
-            width: 100px;
-            flex-shrink: 0;
-        }}
-        .detail-value {{
-            color: #1e293b;
-        }}
-        .reminders {{
-            margin: 0 24px 24px;
-            padding: 20px;
-            background: #fffbeb;
-            border-radius: 12px;
-            border: 1px solid #fde68a;
-        }}
-        .reminders h3 {{
-            color: #92400e;
-            margin: 0 0 12px;
-            font-size: 14px;
-        }}
-        .reminders ul {{
-            margin: 0;
-            padding-left: 20px;
-            color: #78350f;
-        }}
-        .reminders li {{
-            margin-bottom: 6px;
-            font-size: 14px;
-        }}
-        .footer {{
-            background: #f8fafc;
-            padding: 20px;
-            text-align: center;
-            color: #94a3b8;
-            font-size: 12px;
-            border-top: 1px solid #e2e8f0;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <!-- Header -->
-        <div class="header">
-            <h1>🏥 Doctor Appointment System</h1>
-            <p>Your appointment has been confirmed</p>
-        </div>
-        
-        <!-- Success Badge -->
-        <div class="success-badge">
-            ✅ Appointment Confirmed!
-        </div>
-        
-        <!-- Appointment Details -->
-        <div class="details-card">
-            <h2>Appointment Details</h2>
-            <div class="detail-row">
-                <span class="detail-label">👨‍⚕️ Doctor</span>
-                <span class="detail-value">{doctor_name}</span>
-            </div>
-            <div class="detail-row">
-                <span class="detail-label">👤 Patient</span>
-                <span class="detail-value">{patient_name}</span>
-            </div>
-            <div class="detail-row">
-                <span class="detail-label">📅 Date & Time</span>
-                <span class="detail-value">{appointment_time}</span>
-            </div>
-        </div>
-        
-        <!-- Reminders -->
-        <div class="reminders">
-            <h3>⚠️ Important Reminders</h3>
-            <ul>
-                <li>Please arrive 10 minutes early</li>
-                <li>Bring any previous medical records</li>
-                <li>Bring a valid ID</li>
-                <li>Contact us if you need to reschedule</li>
-            </ul>
-        </div>
-        
-        <!-- Footer -->
-        <div class="footer">
-            <p>This is an automated confirmation email.</p>
-            <p>Doctor Appointment Scheduling System</p>
-        </div>
-    </div>
-</body>
-</html>
-            """
-            
-            part1 = MIMEText(text, "plain")
-            part2 = MIMEText(html, "html")
-            message.attach(part1)
-            message.attach(part2)
-            
-            # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.sender_email, self.sender_password)
-                server.sendmail(
-                    self.sender_email,
-                    to_email,
-                    message.as_string()
-                )
-            
-            print(f"✅ Confirmation email sent to {to_email}")
+            print(f"✅ {kind.capitalize()} email sent to {to_email}")
             return True
             
         except smtplib.SMTPAuthenticationError:
@@ -244,17 +86,46 @@ Doctor Appointment Scheduling System
             print(f"❌ Email error: {e}")
             return False
     
+    def send_confirmation(self, to_email: str, patient_name: str,
+                         doctor_name: str, appointment_time: str, message_id: str = None):
+        """Send appointment confirmation email"""
+        return self._send("confirmation", to_email, {
+            "patient_name": patient_name,
+            "doctor_name": doctor_name,
+            "appointment_time": appointment_time,
+        }, message_id)
+    
+    def send_reminder(self, to_email: str, patient_name: str,
+                      doctor_name: str, appointment_time: str, message_id: str = None):
+        """Send a reminder for an upcoming appointment"""
+        return self._send("reminder", to_email, {
+            "patient_name": patient_name,
+            "doctor_name": doctor_name,
+            "appointment_time": appointment_time,
+        }, message_id)
+    
+    def send_cancellation(self, to_email: str, patient_name: str,
+                          doctor_name: str, appointment_time: str, message_id: str = None):
+        """Tell the patient their appointment was cancelled"""
+        return self._send("cancellation", to_email, {
+            "patient_name": patient_name,
+            "doctor_name": doctor_name,
+            "appointment_time": appointment_time,
+        }, message_id)
+    
     def test_connection(self):
         """Test if Gmail connection works"""
         if not self.enabled:
             return False, "Gmail not configured"
         
         try:
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.sender_email, self.sender_password)
+            with self._connect():
+                pass
             return True, "Connection successful"
         except smtplib.SMTPAuthenticationError:
             return False, "Authentication failed - check credentials"
         except Exception as e:
-            return False, str(e)
\ No newline at end of file
+            return False, str(e)
+    
+    def close(self):
+        self.smtp_pool.close()
@@ -0,0 +1,181 @@
+import io
+import os
+import csv
+from datetime import datetime
+from typing import IO, Iterable, Iterator, List, Optional
+
+from .db_pool import ConnectionPool, get_pool
+
+COLUMNS = ("id", "doctor_id", "doctor_name", "patient_name", "patient_email",
+           "appointment_time", "duration_minutes", "status")
+FORMATS = ("csv", "parquet")
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "parquet": "application/vnd.apache.parquet"}
+
+_SELECT = """
+    SELECT a.id, a.doctor_id, d.name, a.patient_name, a.patient_email,
+           a.appointment_time, a.duration_minutes, a.status
+    FROM appointments a
+    LEFT JOIN doctors d ON d.id = a.doctor_id
+    WHERE a.appointment_time >= %(start)s AND a.appointment_time < %(end)s
+    AND (%(doctor_id)s::int IS NULL OR a.doctor_id = %(doctor_id)s)
+    AND (%(include_cancelled)s OR a.status != 'cancelled')
+"""
+
+
+def default_chunk_size() -> int:
+    return int(os.getenv("EXPORT_CHUNK_SIZE", "10000"))
+
+
+def _params(start: datetime, end: datetime, doctor_id: Optional[int], include_cancelled: bool):
+    return {"start": start, "end": end, "doctor_id": doctor_id,
+            "include_cancelled": include_cancelled}
+
+
+def iter_batches(start: datetime, end: datetime, doctor_id: int = None,
+                 include_cancelled: bool = True, chunk_size: int = None,
+                 pool: ConnectionPool = None) -> Iterator[List[tuple]]:
+    """Appointments in [start, end) as lists of at most chunk_size tuples.
+
+    Rows come from a server-side cursor, so only one chunk is ever in
+    memory. The pooled connection is held until the iterator is exhausted
+    or closed.
+    """
+    chunk_size = chunk_size or default_chunk_size()
+    with (pool or get_pool()).connection() as conn:
+        with conn.cursor(name="export_appointments") as cur:
+            cur.itersize = chunk_size
+            cur.execute(_SELECT + " ORDER BY a.appointment_time, a.id",
+                        _params(start, end, doctor_id, include_cancelled))
+            while True:
+                batch = cur.fetchmany(chunk_size)
+                if not batch:
+                    return
+                yield batch
+
+
+def csv_chunks(batches: Iterable[List[tuple]]) -> Iterator[bytes]:
+    """Header, then one encoded CSV block per batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(COLUMNS)
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back whatever was written since the last drain"""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._parts = b"".join(self._parts), []
+        return data
+
+
+def parquet_chunks(batches: Iterable[List[tuple]]) -> Iterator[bytes]:
+    """One Parquet row group per batch, yielded as soon as it is encoded.
+
+    Needs pyarrow, which is optional for the rest of the tools.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.int32()), ("doctor_id", pa.int32()), ("doctor_name", pa.string()),
+        ("patient_name", pa.string()), ("patient_email", pa.string()),
+        ("appointment_time", pa.timestamp("us")), ("duration_minutes", pa.int32()),
+        ("status", pa.string()),
+    ])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    try:
+        for batch in batches:
+            columns = list(zip(*batch))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema
+            ))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def export_chunks(fmt: str, start: datetime, end: datetime, doctor_id: int = None,
+                  include_cancelled: bool = True, chunk_size: int = None,
+                  pool: ConnectionPool = None) -> Iterator[bytes]:
+    """Encoded export, chunk by chunk, ready for a file or a streaming response"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    batches = iter_batches(start, end, doctor_id, include_cancelled, chunk_size, pool)
+    return csv_chunks(batches) if fmt == "csv" else parquet_chunks(batches)
+
+
+def copy_csv(out: IO[bytes], start: datetime, end: datetime, doctor_id: int = None,
+             include_cancelled: bool = True, pool: ConnectionPool = None):
+    """Fastest CSV path for files: Postgres formats the rows itself via COPY"""
+    with (pool or get_pool()).connection() as conn, conn.cursor() as cur:
+        query = cur.mogrify(_SELECT + " ORDER BY a.appointment_time, a.id",
+                            _params(start, end, doctor_id, include_cancelled)).decode()
+        cur.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)", out)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    import argparse
+    from datetime import timedelta
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    from .doctor_directory import get_directory
+
+    parser = argparse.ArgumentParser(description="Export appointments to CSV or Parquet")
+    parser.add_argument("--start", required=True, help="First day, YYYY-MM-DD")
+    parser.add_argument("--end", help="Last day, YYYY-MM-DD (default: --start)")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--doctor", help="Only this doctor's appointments")
+    parser.add_argument("--live-only", action="store_true", help="Leave out cancelled appointments")
+    parser.add_argument("--chunk-size", type=int, default=default_chunk_size())
+    parser.add_argument("--output", help="File to write (default: appointments_<start>_<end>.<format>)")
+    args = parser.parse_args()
+
+    first = datetime.strptime(args.start, '%Y-%m-%d')
+    last = datetime.strptime(args.end or args.start, '%Y-%m-%d')
+    doctor_id = None
+    if args.doctor:
+        doctor = get_directory().resolve(args.doctor)
+        if not doctor:
+            print(f"❌ Doctor {args.doctor} not found")
+            sys.exit(1)
+        doctor_id = doctor['id']
+
+    output = args.output or f"appointments_{first:%Y-%m-%d}_{last:%Y-%m-%d}.{args.format}"
+    started = time.perf_counter()
+    with open(output, "wb") as out:
+        if args.format == "csv":
+            copy_csv(out, first, last + timedelta(days=1), doctor_id, not args.live_only)
+        else:
+            for chunk in export_chunks("parquet", first, last + timedelta(days=1), doctor_id,
+                                       not args.live_only, args.chunk_size):
+                out.write(chunk)
+        size = out.tell()
+    print(f"✅ Wrote {output} ({size / 1e6:.1f} MB in {time.perf_counter() - started:.1f}s)")
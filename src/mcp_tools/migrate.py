@@ -0,0 +1,60 @@
+from pathlib import Path
+from typing import List
+
+from .db_pool import ConnectionPool, get_pool
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+
+# Arbitrary constant so concurrent deploys don't apply migrations twice
+MIGRATION_LOCK_ID = 740_193_001
+
+
+def pending_migrations(applied: set) -> List[Path]:
+    return [
+        path for path in sorted(MIGRATIONS_DIR.glob("*.sql"))
+        if path.stem not in applied
+    ]
+
+
+def migrate(pool: ConnectionPool = None) -> List[str]:
+    """Apply every pending SQL migration in order, each in its own transaction"""
+    pool = pool or get_pool()
+    applied_now = []
+
+    with pool.connection() as conn, conn.cursor() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version VARCHAR(255) PRIMARY KEY,
+                applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+            )
+        """)
+
+    while True:
+        with pool.connection() as conn, conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+            cur.execute("SELECT version FROM schema_migrations")
+            applied = {row[0] for row in cur.fetchall()}
+
+            pending = pending_migrations(applied)
+            if not pending:
+                return applied_now
+
+            migration = pending[0]
+            cur.execute(migration.read_text())
+            cur.execute(
+                "INSERT INTO schema_migrations (version) VALUES (%s)",
+                (migration.stem,)
+            )
+            applied_now.append(migration.stem)
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    applied = migrate()
+    if applied:
+        for version in applied:
+            print(f"✅ Applied {version}")
+    else:
+        print("✅ Database schema is up to date")
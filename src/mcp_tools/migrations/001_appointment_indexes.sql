@@ -0,0 +1,20 @@
+-- Composite and partial indexes for the doctor/day and date-range lookups.
+-- Queries filter with half-open ranges on appointment_time, so plain
+-- btree indexes on the raw column are usable.
+
+CREATE INDEX IF NOT EXISTS idx_appointments_doctor_time
+    ON appointments (doctor_id, appointment_time);
+
+-- Availability checks and booking validation only look at live bookings
+CREATE INDEX IF NOT EXISTS idx_appointments_active_doctor_time
+    ON appointments (doctor_id, appointment_time)
+    INCLUDE (duration_minutes)
+    WHERE status <> 'cancelled';
+
+-- Analytics counts across all doctors for a day or range
+CREATE INDEX IF NOT EXISTS idx_appointments_active_time
+    ON appointments (appointment_time)
+    INCLUDE (patient_email)
+    WHERE status <> 'cancelled';
+
+ANALYZE appointments;
@@ -0,0 +1,18 @@
+-- Let Postgres reject overlapping bookings for the same doctor atomically,
+-- so concurrent book_appointment calls cannot both win the same slot.
+-- Cancelled rows are excluded and free the slot up again.
+-- Fails if the table already holds overlapping live bookings; cancel the
+-- duplicates first.
+
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+ALTER TABLE appointments
+    ADD CONSTRAINT appointments_no_overlap
+    EXCLUDE USING gist (
+        doctor_id WITH =,
+        tsrange(
+            appointment_time,
+            appointment_time + COALESCE(duration_minutes, 30) * INTERVAL '1 minute'
+        ) WITH &&
+    )
+    WHERE (status <> 'cancelled');
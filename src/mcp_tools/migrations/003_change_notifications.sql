@@ -0,0 +1,14 @@
+-- Broadcast changes to rarely-modified configuration tables so in-process
+-- caches on every node can reload instead of polling.
+
+CREATE OR REPLACE FUNCTION notify_table_change() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify(TG_ARGV[0], TG_OP);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS doctors_changed ON doctors;
+CREATE TRIGGER doctors_changed
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON doctors
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change('doctors_changed');
@@ -0,0 +1,27 @@
+-- Date-specific overrides of the weekly doctor_availability schedule.
+-- A row with NULL times marks the whole day off (holiday, leave); rows
+-- with times replace that day's weekly hours.
+
+CREATE TABLE IF NOT EXISTS doctor_schedule_exceptions (
+    id SERIAL PRIMARY KEY,
+    doctor_id INTEGER NOT NULL REFERENCES doctors(id),
+    exception_date DATE NOT NULL,
+    start_time TIME,
+    end_time TIME,
+    reason VARCHAR(100),
+    CHECK ((start_time IS NULL) = (end_time IS NULL)),
+    CHECK (start_time IS NULL OR start_time < end_time)
+);
+
+CREATE INDEX IF NOT EXISTS idx_schedule_exceptions_doctor_date
+    ON doctor_schedule_exceptions (doctor_id, exception_date);
+
+DROP TRIGGER IF EXISTS doctor_availability_changed ON doctor_availability;
+CREATE TRIGGER doctor_availability_changed
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON doctor_availability
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change('schedule_changed');
+
+DROP TRIGGER IF EXISTS doctor_schedule_exceptions_changed ON doctor_schedule_exceptions;
+CREATE TRIGGER doctor_schedule_exceptions_changed
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON doctor_schedule_exceptions
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change('schedule_changed');
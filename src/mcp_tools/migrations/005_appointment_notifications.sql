@@ -0,0 +1,27 @@
+-- Tell every node which (doctor, day) changed so cached booked intervals
+-- are dropped as soon as another node books, cancels or moves a slot.
+-- Payload: '<doctor_id>:<YYYY-MM-DD>'
+
+CREATE OR REPLACE FUNCTION notify_appointment_change() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM pg_notify('appointments_changed',
+                          OLD.doctor_id || ':' || OLD.appointment_time::date);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM pg_notify('appointments_changed',
+                          NEW.doctor_id || ':' || NEW.appointment_time::date);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS appointments_changed ON appointments;
+CREATE TRIGGER appointments_changed
+    AFTER INSERT OR UPDATE OR DELETE ON appointments
+    FOR EACH ROW EXECUTE FUNCTION notify_appointment_change();
+
+DROP TRIGGER IF EXISTS appointments_truncated ON appointments;
+CREATE TRIGGER appointments_truncated
+    AFTER TRUNCATE ON appointments
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change('appointments_changed');
@@ -0,0 +1,10 @@
+-- Conversation histories for SESSION_STORE=postgres, shared by every
+-- backend worker. history is zlib-compressed JSON.
+
+CREATE TABLE IF NOT EXISTS agent_sessions (
+    session_id VARCHAR(128) PRIMARY KEY,
+    history BYTEA NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_agent_sessions_updated ON agent_sessions (updated_at);
@@ -0,0 +1,28 @@
+-- Transactional outbox for side effects of a booking (calendar event,
+-- confirmation email). Rows are written in the same transaction as the
+-- appointment and drained by OutboxWorker with retries and backoff.
+
+CREATE TABLE IF NOT EXISTS notification_outbox (
+    id BIGSERIAL PRIMARY KEY,
+    appointment_id INTEGER REFERENCES appointments(id),
+    kind VARCHAR(40) NOT NULL,
+    payload JSONB NOT NULL,
+    idempotency_key VARCHAR(128) NOT NULL UNIQUE,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',  -- pending, done, dead
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    locked_until TIMESTAMP,
+    last_error TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    processed_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_notification_outbox_due
+    ON notification_outbox (next_attempt_at)
+    WHERE status = 'pending';
+
+-- Wake idle workers as soon as a booking commits
+DROP TRIGGER IF EXISTS notification_outbox_ready ON notification_outbox;
+CREATE TRIGGER notification_outbox_ready
+    AFTER INSERT ON notification_outbox
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_table_change('outbox_ready');
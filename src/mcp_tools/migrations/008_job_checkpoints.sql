@@ -0,0 +1,11 @@
+-- Progress of resumable batch jobs (e.g. reminders:2026-02-17). last_id is
+-- the highest appointment id the job has finished with.
+
+CREATE TABLE IF NOT EXISTS job_checkpoints (
+    job_name VARCHAR(128) PRIMARY KEY,
+    last_id INTEGER NOT NULL DEFAULT 0,
+    processed INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    completed_at TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
@@ -0,0 +1,131 @@
+-- HyperLogLog sketch of patient emails per (day, doctor) on the rollup, so
+-- unique patients over weeks, months or several doctors come from unions
+-- of small sketches instead of COUNT(DISTINCT) over every row in range.
+-- Layout matches src/mcp_tools/hll.py: 4096 one-byte registers (p = 12),
+-- hash = first 64 bits of md5(lower(email)).
+--
+-- A sketch cannot forget one value, so when a live booking is cancelled,
+-- deleted, moved or re-addressed, the trigger recomputes the sketch of
+-- the (day, doctor) it left from that day's remaining live bookings.
+
+ALTER TABLE appointment_daily_rollup ADD COLUMN IF NOT EXISTS patient_sketch BYTEA;
+
+CREATE OR REPLACE FUNCTION hll_add(sketch BYTEA, value TEXT) RETURNS BYTEA AS $$
+DECLARE
+    h BIT(64);
+    idx INTEGER;
+    rank INTEGER;
+BEGIN
+    IF value IS NULL THEN
+        RETURN sketch;
+    END IF;
+    h := ('x' || substr(md5(lower(value)), 1, 16))::BIT(64);
+    idx := substring(h FROM 1 FOR 12)::BIT(12)::INTEGER;
+    rank := position(B'1' IN substring(h FROM 13));
+    IF rank = 0 THEN
+        rank := 53;
+    END IF;
+    IF sketch IS NULL THEN
+        sketch := decode(repeat('00', 4096), 'hex');
+    END IF;
+    IF get_byte(sketch, idx) < rank THEN
+        sketch := set_byte(sketch, idx, rank);
+    END IF;
+    RETURN sketch;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+DROP AGGREGATE IF EXISTS hll_agg(TEXT);
+CREATE AGGREGATE hll_agg(TEXT) (SFUNC = hll_add, STYPE = BYTEA);
+
+CREATE OR REPLACE FUNCTION rollup_appointment_change() RETURNS trigger AS $$
+DECLARE
+    live BOOLEAN;
+    left_sketch BOOLEAN := FALSE;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.doctor_id IS NOT NULL THEN
+        UPDATE appointment_daily_rollup
+        SET booked = booked - COALESCE((OLD.status <> 'cancelled')::int, 0),
+            cancelled = cancelled - COALESCE((OLD.status = 'cancelled')::int, 0)
+        WHERE day = OLD.appointment_time::date AND doctor_id = OLD.doctor_id;
+
+        IF COALESCE(OLD.status <> 'cancelled', FALSE) THEN
+            IF TG_OP = 'DELETE' THEN
+                left_sketch := TRUE;
+            ELSE
+                left_sketch := NOT COALESCE(NEW.status <> 'cancelled', FALSE)
+                    OR NEW.doctor_id IS DISTINCT FROM OLD.doctor_id
+                    OR NEW.appointment_time::date <> OLD.appointment_time::date
+                    OR lower(NEW.patient_email) IS DISTINCT FROM lower(OLD.patient_email);
+            END IF;
+        END IF;
+        IF left_sketch THEN
+            -- The UPDATE above holds this rollup row's lock, so a concurrent
+            -- booking for the day waits and then adds itself to the rebuilt
+            -- sketch; this statement's snapshot sees everything committed.
+            UPDATE appointment_daily_rollup
+            SET patient_sketch = (
+                SELECT hll_agg(a.patient_email)
+                FROM appointments a
+                WHERE a.doctor_id = OLD.doctor_id
+                AND a.appointment_time >= OLD.appointment_time::date
+                AND a.appointment_time < OLD.appointment_time::date + 1
+                AND a.status <> 'cancelled'
+            )
+            WHERE day = OLD.appointment_time::date AND doctor_id = OLD.doctor_id;
+        END IF;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.doctor_id IS NOT NULL THEN
+        live := COALESCE(NEW.status <> 'cancelled', FALSE);
+        INSERT INTO appointment_daily_rollup AS r (day, doctor_id, booked, cancelled, patient_sketch)
+        VALUES (NEW.appointment_time::date, NEW.doctor_id,
+                live::int,
+                COALESCE((NEW.status = 'cancelled')::int, 0),
+                CASE WHEN live THEN hll_add(NULL, NEW.patient_email) END)
+        ON CONFLICT (day, doctor_id) DO UPDATE
+        SET booked = r.booked + EXCLUDED.booked,
+            cancelled = r.cancelled + EXCLUDED.cancelled,
+            patient_sketch = CASE WHEN live THEN hll_add(r.patient_sketch, NEW.patient_email)
+                                  ELSE r.patient_sketch END;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS appointments_rollup ON appointments;
+CREATE TRIGGER appointments_rollup
+    AFTER INSERT OR UPDATE OF doctor_id, appointment_time, status, patient_email OR DELETE
+    ON appointments
+    FOR EACH ROW EXECUTE FUNCTION rollup_appointment_change();
+
+-- Recompute sketches for [from_day, to_day] from live bookings only, for
+-- the backfill below and for repairs. Holds off writers until the caller
+-- commits so no concurrent booking is lost.
+CREATE OR REPLACE FUNCTION rebuild_patient_sketches(from_day DATE, to_day DATE)
+RETURNS INTEGER AS $$
+DECLARE
+    updated INTEGER;
+BEGIN
+    LOCK TABLE appointments IN SHARE MODE;
+    UPDATE appointment_daily_rollup r
+    SET patient_sketch = s.sketch
+    FROM (
+        SELECT rr.day, rr.doctor_id, hll_agg(a.patient_email) AS sketch
+        FROM appointment_daily_rollup rr
+        LEFT JOIN appointments a
+            ON a.doctor_id = rr.doctor_id
+            AND a.appointment_time >= rr.day AND a.appointment_time < rr.day + 1
+            AND a.status <> 'cancelled'
+        WHERE rr.day BETWEEN from_day AND to_day
+        GROUP BY rr.day, rr.doctor_id
+    ) s
+    WHERE r.day = s.day AND r.doctor_id = s.doctor_id;
+    GET DIAGNOSTICS updated = ROW_COUNT;
+    RETURN updated;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT rebuild_patient_sketches(
+    COALESCE((SELECT MIN(day) FROM appointment_daily_rollup), CURRENT_DATE),
+    COALESCE((SELECT MAX(day) FROM appointment_daily_rollup), CURRENT_DATE)
+);
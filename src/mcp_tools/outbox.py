@@ -0,0 +1,238 @@
+import random
+import threading
+from typing import Callable, Dict, List, Optional
+
+from psycopg2.extras import Json, RealDictCursor
+
+from .db_pool import ConnectionPool, get_pool
+from .db_events import get_listener, listen_enabled
+
+CALENDAR_EVENT = "calendar_event"
+CONFIRMATION_EMAIL = "confirmation_email"
+
+# handler(payload, idempotency_key); raise to retry
+Handler = Callable[[Dict, str], None]
+# batch_handler(rows) -> {row id: error message} for the rows that failed
+BatchHandler = Callable[[List[Dict]], Dict[int, str]]
+
+
+def idempotency_key(appointment_id: int, kind: str) -> str:
+    return f"appointment:{appointment_id}:{kind}"
+
+
+def enqueue(cur, appointment_id: int, kind: str, payload: Dict, key: str = None):
+    """Queue a notification on the caller's cursor, inside the caller's transaction"""
+    cur.execute("""
+        INSERT INTO notification_outbox (appointment_id, kind, payload, idempotency_key)
+        VALUES (%s, %s, %s, %s)
+        ON CONFLICT (idempotency_key) DO NOTHING
+    """, (appointment_id, kind, Json(payload), key or idempotency_key(appointment_id, kind)))
+
+
+def enqueue_booking_notifications(cur, appointment_id: int, booking: Dict):
+    """Calendar event and confirmation email for a freshly inserted appointment"""
+    enqueue(cur, appointment_id, CALENDAR_EVENT, {
+        "doctor_email": booking["doctor_email"],
+        "patient_name": booking["patient"],
+        "patient_email": booking["patient_email"],
+        "start_time_iso": booking["time"],
+    })
+    enqueue(cur, appointment_id, CONFIRMATION_EMAIL, {
+        "to_email": booking["patient_email"],
+        "patient_name": booking["patient"],
+        "doctor_name": booking["doctor"],
+        "appointment_time": booking["formatted_time"],
+    })
+
+
+def retry_delay(attempts: int, base_seconds: float = 5.0, cap_seconds: float = 3600.0,
+                jitter: float = 0.2) -> float:
+    """Exponential backoff after `attempts` failures, with +/- jitter"""
+    delay = min(cap_seconds, base_seconds * (2 ** max(0, attempts - 1)))
+    return delay * (1 + random.uniform(-jitter, jitter))
+
+
+def booking_handlers(calendar_tool, email_tool) -> Dict[str, Handler]:
+    """Handlers that deliver booking notifications through the existing tools"""
+
+    def create_calendar_event(payload: Dict, key: str):
+        if not calendar_tool.enabled:
+            return
+        if calendar_tool.create_event(event_id=calendar_tool.event_id_for(key), **payload) is None:
+            raise RuntimeError("Calendar event creation failed")
+
+    def send_confirmation_email(payload: Dict, key: str):
+        if not email_tool.enabled:
+            return
+        if not email_tool.send_confirmation(message_id=email_tool.message_id_for(key), **payload):
+            raise RuntimeError("Confirmation email failed")
+
+    return {
+        CALENDAR_EVENT: create_calendar_event,
+        CONFIRMATION_EMAIL: send_confirmation_email,
+    }
+
+
+def booking_batch_handlers(calendar_tool) -> Dict[str, BatchHandler]:
+    """Calendar rows go out as Google batch requests, e.g. when replaying a backlog"""
+
+    def create_calendar_events(rows: List[Dict]) -> Dict[int, str]:
+        if not calendar_tool.enabled:
+            return {}
+        # Keyed by outbox row id: appointment_id is nullable and two rows may
+        # share one. A few quick in-batch retries; anything still failing
+        # backs off in the outbox.
+        result = calendar_tool.create_events_batch([
+            {**row['payload'], 'outbox_id': row['id'], 'appointment_id': row['appointment_id'],
+             'event_id': calendar_tool.event_id_for(row['idempotency_key'])}
+            for row in rows
+        ], max_attempts=3, key='outbox_id')
+        return result['failed']
+
+    return {CALENDAR_EVENT: create_calendar_events}
+
+
+class OutboxWorker:
+    """Drains notification_outbox on background threads.
+
+    Rows are leased with FOR UPDATE SKIP LOCKED, so several workers and
+    several nodes can drain the table together. A crashed worker's lease
+    expires and the row is picked up again. Failures back off
+    exponentially until `max_attempts`, then the row is marked dead.
+    """
+
+    def __init__(self, handlers: Dict[str, Handler], pool: ConnectionPool = None,
+                 workers: int = 2, batch_size: int = 10, max_attempts: int = 8,
+                 lease_seconds: int = 300, poll_interval: float = 5.0,
+                 batch_handlers: Dict[str, BatchHandler] = None):
+        self.handlers = handlers
+        self.batch_handlers = batch_handlers or {}
+        self.pool = pool
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def _pool(self) -> ConnectionPool:
+        return self.pool or get_pool()
+
+    def claim(self) -> List[Dict]:
+        """Lease up to batch_size due rows"""
+        with self._pool().connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("""
+                UPDATE notification_outbox
+                SET locked_until = NOW() + make_interval(secs => %s),
+                    attempts = attempts + 1
+                WHERE id IN (
+                    SELECT id FROM notification_outbox
+                    WHERE status = 'pending'
+                    AND next_attempt_at <= NOW()
+                    AND (locked_until IS NULL OR locked_until < NOW())
+                    ORDER BY id
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id, appointment_id, kind, payload, idempotency_key, attempts
+            """, (self.lease_seconds, self.batch_size))
+            return [dict(row) for row in cur.fetchall()]
+
+    def process(self, row: Dict) -> bool:
+        """Run one leased row's handler and record the outcome"""
+        handler = self.handlers.get(row['kind'])
+        try:
+            if handler is None:
+                raise RuntimeError(f"No handler for outbox kind {row['kind']}")
+            handler(row['payload'], row['idempotency_key'])
+        except Exception as e:
+            self._mark_failed(row, str(e))
+            return False
+        self._mark_done(row)
+        return True
+
+    def process_batch(self, kind: str, rows: List[Dict]) -> int:
+        """Hand every leased row of one kind to its batch handler; returns successes"""
+        try:
+            errors = self.batch_handlers[kind](rows)
+        except Exception as e:
+            errors = {row['id']: str(e) for row in rows}
+        for row in rows:
+            if row['id'] in errors:
+                self._mark_failed(row, errors[row['id']])
+            else:
+                self._mark_done(row)
+        return len(rows) - len(errors)
+
+    def _mark_done(self, row: Dict):
+        with self._pool().connection() as conn, conn.cursor() as cur:
+            cur.execute("""
+                UPDATE notification_outbox
+                SET status = 'done', processed_at = NOW(), locked_until = NULL, last_error = NULL
+                WHERE id = %s
+            """, (row['id'],))
+
+    def _mark_failed(self, row: Dict, error: str):
+        dead = row['attempts'] >= self.max_attempts
+        with self._pool().connection() as conn, conn.cursor() as cur:
+            cur.execute("""
+                UPDATE notification_outbox
+                SET status = %s,
+                    last_error = %s,
+                    locked_until = NULL,
+                    next_attempt_at = NOW() + make_interval(secs => %s)
+                WHERE id = %s
+            """, ('dead' if dead else 'pending', error[:1000],
+                  retry_delay(row['attempts']), row['id']))
+        if dead:
+            print(f"❌ Outbox {row['kind']} #{row['id']} gave up after {row['attempts']} attempts: {error}")
+
+    def run_once(self) -> int:
+        """Claim and process one batch; returns how many rows were handled"""
+        rows = self.claim()
+        batches: Dict[str, List[Dict]] = {}
+        for row in rows:
+            if row['kind'] in self.batch_handlers:
+                batches.setdefault(row['kind'], []).append(row)
+            else:
+                self.process(row)
+        for kind, group in batches.items():
+            self.process_batch(kind, group)
+        return len(rows)
+
+    def stats(self) -> Dict:
+        with self._pool().connection() as conn, conn.cursor() as cur:
+            cur.execute("SELECT status, COUNT(*) FROM notification_outbox GROUP BY status")
+            counts = dict(cur.fetchall())
+        return {"workers": len(self._threads), **{status: counts.get(status, 0)
+                                                   for status in ("pending", "done", "dead")}}
+
+    def wake(self, payload: str = None):
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self.run_once() == self.batch_size:
+                    continue
+            except Exception as e:
+                print(f"⚠️  Outbox worker error: {e}")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def start(self):
+        if listen_enabled():
+            get_listener().subscribe("outbox_ready", self.wake)
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"outbox-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        print(f"✅ Notification outbox worker started ({self.workers} threads)")
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
@@ -0,0 +1,148 @@
+import os
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
+
+from .db_pool import ConnectionPool, get_pool
+from .rate_limit import TokenBucket
+
+
+class JobCheckpoints:
+    """Per-job progress in the job_checkpoints table"""
+
+    def __init__(self, pool: ConnectionPool = None):
+        self.pool = pool or get_pool()
+
+    def load(self, job_name: str) -> Dict:
+        with self.pool.connection() as conn, conn.cursor() as cur:
+            cur.execute("""
+                SELECT last_id, processed, failed, completed_at
+                FROM job_checkpoints WHERE job_name = %s
+            """, (job_name,))
+            row = cur.fetchone()
+        if not row:
+            return {"last_id": 0, "processed": 0, "failed": 0, "completed": False}
+        return {"last_id": row[0], "processed": row[1], "failed": row[2],
+                "completed": row[3] is not None}
+
+    def save(self, job_name: str, last_id: int, processed: int, failed: int,
+             completed: bool = False):
+        with self.pool.connection() as conn, conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO job_checkpoints (job_name, last_id, processed, failed, completed_at, updated_at)
+                VALUES (%s, %s, %s, %s, CASE WHEN %s THEN NOW() END, NOW())
+                ON CONFLICT (job_name) DO UPDATE
+                SET last_id = EXCLUDED.last_id, processed = EXCLUDED.processed,
+                    failed = EXCLUDED.failed, completed_at = EXCLUDED.completed_at,
+                    updated_at = EXCLUDED.updated_at
+            """, (job_name, last_id, processed, failed, completed))
+
+
+class ReminderJob:
+    """Emails a reminder for every live appointment on one day.
+
+    Appointments stream from a server-side cursor and each message is
+    rendered just before it is sent, so memory stays flat. Sends share the
+    EmailTool's pooled SMTP session and are throttled by a token bucket.
+
+    The checkpoint advances after every send, so a crashed run resumes
+    where it stopped and can repeat at most the one in-flight message
+    (with the same Message-ID). A lone failure, such as a refused address,
+    is skipped; max_consecutive_failures in a row stops the run with the
+    checkpoint rolled back to before the streak.
+    """
+
+    def __init__(self, analytics_tool, email_tool, checkpoints: JobCheckpoints = None,
+                 rate: float = 5.0, page_size: int = 1000,
+                 max_consecutive_failures: int = 5):
+        self.analytics_tool = analytics_tool
+        self.email_tool = email_tool
+        self.checkpoints = checkpoints or JobCheckpoints()
+        self.limiter = TokenBucket(rate)
+        self.page_size = page_size
+        self.max_consecutive_failures = max_consecutive_failures
+
+    @staticmethod
+    def job_name(day: date) -> str:
+        return f"reminders:{day.isoformat()}"
+
+    def _send(self, row: Dict) -> Optional[Exception]:
+        to_email = row['patient_email']
+        message = self.email_tool.render_message("reminder", to_email, {
+            "patient_name": row['patient_name'],
+            "doctor_name": row['doctor_name'],
+            "appointment_time": row['appointment_time'].strftime('%A, %B %d, %Y at %I:%M %p'),
+        }, self.email_tool.message_id_for(f"appointment:{row['id']}:reminder"))
+        try:
+            self.email_tool.smtp_pool.send(self.email_tool.sender_email, [to_email], message)
+        except Exception as e:
+            return e
+        return None
+
+    def run(self, day: date = None) -> Dict:
+        """Send reminders for `day` (default tomorrow), resuming from the last checkpoint"""
+        day = day or (datetime.now() + timedelta(days=1)).date()
+        name = self.job_name(day)
+        state = self.checkpoints.load(name)
+        result = {"job": name, "resumed_from": state["last_id"], "sent": 0, "failed": 0,
+                  "completed": state["completed"]}
+
+        if state["completed"]:
+            return result
+        if not self.email_tool.enabled:
+            result["error"] = "Email not configured"
+            return result
+
+        last_id, processed, failed = state["last_id"], state["processed"], state["failed"]
+        streak, before_streak = 0, None
+        rows = self.analytics_tool.iter_appointments(
+            day.isoformat(), after_id=last_id, page_size=self.page_size
+        )
+        try:
+            for row in rows:
+                self.limiter.acquire()
+                error = self._send(row)
+                if error is None:
+                    result["sent"] += 1
+                    processed += 1
+                    streak = 0
+                else:
+                    print(f"⚠️  Reminder for appointment {row['id']} failed: {error}")
+                    if streak == 0:
+                        before_streak = (last_id, processed, failed)
+                    result["failed"] += 1
+                    failed += 1
+                    streak += 1
+                    if streak >= self.max_consecutive_failures:
+                        self.checkpoints.save(name, *before_streak)
+                        result["error"] = f"Stopped after {streak} failures in a row"
+                        return result
+                last_id = row['id']
+                self.checkpoints.save(name, last_id, processed, failed)
+        finally:
+            rows.close()
+
+        self.checkpoints.save(name, last_id, processed, failed, completed=True)
+        result["completed"] = True
+        return result
+
+
+if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    from .analytics_tool import AnalyticsTool
+    from .email_tool import EmailTool
+
+    parser = argparse.ArgumentParser(description="Email reminders for one day's appointments")
+    parser.add_argument("--date", help="YYYY-MM-DD (default: tomorrow)")
+    parser.add_argument("--rate", type=float, default=float(os.getenv("REMINDER_RATE", "5")),
+                        help="Emails per second")
+    args = parser.parse_args()
+
+    job = ReminderJob(AnalyticsTool(), EmailTool(), rate=args.rate)
+    result = job.run(datetime.strptime(args.date, '%Y-%m-%d').date() if args.date else None)
+    if result.get("error"):
+        print(f"❌ {result['job']}: {result['error']} (sent {result['sent']}, failed {result['failed']})")
+    else:
+        print(f"✅ {result['job']}: sent {result['sent']}, failed {result['failed']}")
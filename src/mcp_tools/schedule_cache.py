@@ -0,0 +1,114 @@
+import time
+import threading
+from datetime import date, time as dtime
+from typing import Dict, List, Optional, Tuple
+
+from psycopg2.extras import RealDictCursor
+
+from . import slot_engine
+from .db_pool import ConnectionPool, get_pool
+from .db_events import get_listener, listen_enabled
+
+Hours = List[Tuple[dtime, dtime]]
+
+
+class _Schedule:
+    """Immutable snapshot: weekly hours per doctor/weekday plus per-date overrides"""
+
+    def __init__(self, availability_rows: List[Dict], exception_rows: List[Dict]):
+        self.weekly: Dict[int, Dict[int, Hours]] = {}
+        for row in availability_rows:
+            self.weekly.setdefault(row['doctor_id'], {}).setdefault(row['day_of_week'], []).append(
+                (row['start_time'], row['end_time'])
+            )
+        self.exceptions: Dict[Tuple[int, date], Hours] = {}
+        days_off = set()
+        for row in exception_rows:
+            key = (row['doctor_id'], row['exception_date'])
+            if row['start_time'] is None:
+                days_off.add(key)
+            else:
+                self.exceptions.setdefault(key, []).append((row['start_time'], row['end_time']))
+        # A day off wins over any replacement hours for the same date
+        for key in days_off:
+            self.exceptions[key] = []
+        for hours in list(self.weekly.values()) + [self.exceptions]:
+            for intervals in hours.values():
+                intervals.sort()
+
+
+class ScheduleCache:
+    """Working hours per doctor and weekday, with holiday/leave exceptions.
+
+    Replaces the per-request doctor_availability query. Reloads after
+    `ttl_seconds` or on a `schedule_changed` notification (migration 004).
+    """
+
+    def __init__(self, pool: ConnectionPool = None, ttl_seconds: float = 300.0):
+        self.pool = pool
+        self.ttl_seconds = ttl_seconds
+        self._schedule: Optional[_Schedule] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self, availability_rows: List[Dict] = None, exception_rows: List[Dict] = None):
+        """Reload from the database, or install the given rows directly"""
+        if availability_rows is None:
+            with (self.pool or get_pool()).connection() as conn, \
+                    conn.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute("""
+                    SELECT doctor_id, day_of_week, start_time, end_time
+                    FROM doctor_availability
+                """)
+                availability_rows = cur.fetchall()
+                cur.execute("""
+                    SELECT doctor_id, exception_date, start_time, end_time
+                    FROM doctor_schedule_exceptions
+                    WHERE exception_date >= CURRENT_DATE - 366
+                """)
+                exception_rows = cur.fetchall()
+        self._schedule = _Schedule(availability_rows, exception_rows or [])
+        self._loaded_at = time.monotonic()
+
+    def invalidate(self, payload: str = None):
+        self._loaded_at = 0.0
+
+    def warm(self):
+        """Load now unless a fresh snapshot is already in memory"""
+        self._current()
+
+    def _current(self) -> _Schedule:
+        if self._schedule is None or time.monotonic() - self._loaded_at >= self.ttl_seconds:
+            with self._lock:
+                if self._schedule is None or time.monotonic() - self._loaded_at >= self.ttl_seconds:
+                    self.refresh()
+        return self._schedule
+
+    def hours_for(self, doctor_id: int, day: date) -> Hours:
+        """Working (start, end) times for one doctor on one date"""
+        schedule = self._current()
+        exception = schedule.exceptions.get((doctor_id, day))
+        if exception is not None:
+            return exception
+        return schedule.weekly.get(doctor_id, {}).get(day.weekday(), [])
+
+    def working_intervals(self, doctor_id: int, day: date,
+                          time_preference: str = None) -> List[slot_engine.Interval]:
+        return slot_engine.working_intervals(day, self.hours_for(doctor_id, day), time_preference)
+
+
+_schedule: Optional[ScheduleCache] = None
+_schedule_lock = threading.Lock()
+
+
+def get_schedule() -> ScheduleCache:
+    """Return the process-wide schedule cache, subscribed to schedule_changed when enabled"""
+    global _schedule
+    if _schedule is None:
+        with _schedule_lock:
+            if _schedule is None:
+                schedule = ScheduleCache()
+                if listen_enabled():
+                    get_listener().subscribe("schedule_changed", schedule.invalidate)
+                _schedule = schedule
+    return _schedule
@@ -0,0 +1,108 @@
+from bisect import bisect_right
+from datetime import datetime, date, time, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+Interval = Tuple[datetime, datetime]
+
+# Minute-of-day windows for the time_preference argument; None means "until the day ends"
+TIME_PREFERENCE_WINDOWS: Dict[str, Tuple[time, Optional[time]]] = {
+    'morning': (time(0, 0), time(12, 0)),
+    'afternoon': (time(12, 0), time(17, 0)),
+    'evening': (time(17, 0), None),
+}
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Sort intervals and merge the ones that overlap or touch"""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_intervals(base: List[Interval], removed: List[Interval]) -> List[Interval]:
+    """Remove `removed` from `base` in one pass; both must be sorted and merged"""
+    result: List[Interval] = []
+    j = 0
+    for start, end in base:
+        # Skip removed intervals that end before this base interval starts
+        while j < len(removed) and removed[j][1] <= start:
+            j += 1
+        cursor = start
+        k = j
+        while k < len(removed) and removed[k][0] < end:
+            r_start, r_end = removed[k]
+            if r_start > cursor:
+                result.append((cursor, r_start))
+            cursor = max(cursor, r_end)
+            if cursor >= end:
+                break
+            k += 1
+        if cursor < end:
+            result.append((cursor, end))
+    return result
+
+
+def booked_intervals(rows: Iterable[Dict], default_minutes: int = 30) -> List[Interval]:
+    """Turn appointment rows (appointment_time, duration_minutes) into merged intervals"""
+    return merge_intervals(
+        (row['appointment_time'],
+         row['appointment_time'] + timedelta(minutes=row.get('duration_minutes') or default_minutes))
+        for row in rows
+    )
+
+
+def working_intervals(day: date, hours: Iterable[Tuple[time, time]],
+                      time_preference: Optional[str] = None) -> List[Interval]:
+    """Build the day's working intervals, clipped to the time_preference window"""
+    window = TIME_PREFERENCE_WINDOWS.get((time_preference or '').lower())
+    intervals = []
+    for start_time, end_time in hours:
+        start = datetime.combine(day, start_time)
+        end = datetime.combine(day, end_time)
+        if window:
+            window_start = datetime.combine(day, window[0])
+            window_end = datetime.combine(day, window[1]) if window[1] else end
+            start, end = max(start, window_start), min(end, window_end)
+        if start < end:
+            intervals.append((start, end))
+    return merge_intervals(intervals)
+
+
+def free_slots(working: List[Interval], booked: List[Interval],
+               slot_minutes: int = 30) -> List[datetime]:
+    """Start times of every slot of `slot_minutes` that fits in working time minus bookings.
+
+    Slots are laid on a grid anchored at the start of each working interval,
+    so a 09:15 start yields 09:15, 09:45, ... regardless of where bookings fall.
+    """
+    step = timedelta(minutes=slot_minutes)
+    slots: List[datetime] = []
+    for work in working:
+        anchor = work[0]
+        for free_start, free_end in subtract_intervals([work], booked):
+            # First grid point at or after the free interval's start
+            offset = free_start - anchor
+            steps = -(-offset // step)
+            slot = anchor + steps * step
+            while slot + step <= free_end:
+                slots.append(slot)
+                slot += step
+    return slots
+
+
+def is_free(booked: List[Interval], start: datetime, end: datetime) -> bool:
+    """Check [start, end) against sorted, merged booked intervals in O(log n)"""
+    i = bisect_right(booked, (start, datetime.max))
+    if i > 0 and booked[i - 1][1] > start:
+        return False
+    return i >= len(booked) or booked[i][0] >= end
+
+
+def fits_within(working: List[Interval], start: datetime, end: datetime) -> bool:
+    """Check that [start, end) lies entirely inside one working interval"""
+    return any(w_start <= start and end <= w_end for w_start, w_end in working)
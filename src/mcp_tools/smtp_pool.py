@@ -0,0 +1,221 @@
+import time
+import smtplib
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+Envelope = Tuple[str, Sequence[str], str]
+
+
+def is_disconnect(error: Exception) -> bool:
+    """True if the session is gone and the send may be retried on a new one.
+
+    SMTPException subclasses OSError, so socket errors and SMTP replies
+    have to be told apart explicitly.
+    """
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+class SMTPPoolExhaustedError(Exception):
+    """Raised when no SMTP connection becomes free before the checkout timeout"""
+
+
+class SMTPPool:
+    """Small pool of authenticated SMTP sessions shared by EmailTool.
+
+    The STARTTLS and AUTH handshake is paid once per session instead of once
+    per email. Sessions that sat idle are probed with NOOP before reuse, and
+    ones idle longer than the server is likely to keep them are closed.
+    """
+
+    def __init__(self, host: str, port: int, username: Optional[str] = None,
+                 password: Optional[str] = None, starttls: bool = True,
+                 max_size: int = 3, checkout_timeout: float = 30.0,
+                 noop_after: float = 10.0, idle_timeout: float = 240.0,
+                 timeout: float = 30.0):
+        if max_size < 1:
+            raise ValueError(f"Invalid pool size: max={max_size}")
+
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.noop_after = noop_after
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+
+        self._idle: List[Tuple[smtplib.SMTP, float]] = []
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+        self.connects = 0
+        self.reconnects = 0
+
+    def _open(self) -> smtplib.SMTP:
+        conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                conn.starttls()
+            if self.username and self.password:
+                conn.login(self.username, self.password)
+        except Exception:
+            self._discard(conn)
+            raise
+        self.connects += 1
+        return conn
+
+    @staticmethod
+    def _discard(conn: smtplib.SMTP):
+        try:
+            conn.quit()
+        except Exception:
+            conn.close()
+
+    def _is_healthy(self, conn: smtplib.SMTP, idle_for: float) -> bool:
+        if conn.sock is None or idle_for >= self.idle_timeout:
+            return False
+        if idle_for < self.noop_after:
+            return True
+        try:
+            return conn.noop()[0] == 250
+        except Exception:
+            return False
+
+    def getconn(self) -> smtplib.SMTP:
+        """Check out a live session, reconnecting if the idle one went stale"""
+        deadline = time.monotonic() + self.checkout_timeout
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise SMTPPoolExhaustedError("SMTP pool is closed")
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    conn = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise SMTPPoolExhaustedError(
+                        f"No SMTP connection available after {self.checkout_timeout}s "
+                        f"(max_size={self.max_size})"
+                    )
+                self._cond.wait(remaining)
+
+        try:
+            if conn is not None and not self._is_healthy(conn, time.monotonic() - last_used):
+                self._discard(conn)
+                self.reconnects += 1
+                conn = None
+            if conn is None:
+                conn = self._open()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        return conn
+
+    def putconn(self, conn: smtplib.SMTP, discard: bool = False):
+        with self._cond:
+            if discard or conn.sock is None or self._closed:
+                self._size -= 1
+                self._discard(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a session; it is dropped if the server hung up on us"""
+        conn = self.getconn()
+        discard = False
+        try:
+            yield conn
+        except OSError as e:
+            discard = is_disconnect(e) or not self._reset(conn)
+            raise
+        finally:
+            self.putconn(conn, discard=discard)
+
+    @staticmethod
+    def _reset(conn: smtplib.SMTP) -> bool:
+        """Clear a half-finished transaction; False if the session is unusable"""
+        try:
+            conn.rset()
+            return True
+        except Exception:
+            return False
+
+    def send(self, from_addr: str, to_addrs: Sequence[str], message: str) -> Dict:
+        """Send one message, retrying once on a fresh session if the old one died"""
+        for attempt in range(2):
+            try:
+                with self.connection() as conn:
+                    return conn.sendmail(from_addr, list(to_addrs), message)
+            except OSError as e:
+                if attempt or not is_disconnect(e):
+                    raise
+                self.reconnects += 1
+
+    def send_many(self, messages: Iterable[Envelope]) -> List[Optional[Exception]]:
+        """Send a batch over one session; returns None or the error for each message.
+
+        A dropped session is replaced and the failed message retried once,
+        so one disconnect does not fail the rest of the batch.
+        """
+        results: List[Optional[Exception]] = []
+        conn = None
+        try:
+            for from_addr, to_addrs, message in messages:
+                for attempt in range(2):
+                    try:
+                        if conn is None:
+                            conn = self.getconn()
+                        conn.sendmail(from_addr, list(to_addrs), message)
+                        results.append(None)
+                        break
+                    except OSError as e:
+                        if is_disconnect(e):
+                            if conn is not None:
+                                self.putconn(conn, discard=True)
+                                conn = None
+                            if not attempt:
+                                self.reconnects += 1
+                                continue
+                        elif conn is not None and not self._reset(conn):
+                            # Refused recipient or similar, and the session broke too
+                            self.putconn(conn, discard=True)
+                            conn = None
+                        results.append(e)
+                        break
+        finally:
+            if conn is not None:
+                self.putconn(conn)
+        return results
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "max_size": self.max_size,
+                "connects": self.connects,
+                "reconnects": self.reconnects,
+            }
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._discard(conn)
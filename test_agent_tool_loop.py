@@ -0,0 +1,87 @@
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+# agent.py imports its tools as top-level `mcp_tools`, the way `cd src && python agent.py` sees them
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from agent import AppointmentAgent
+
+
+def text_block(text):
+    return SimpleNamespace(type="text", text=text)
+
+
+def tool_block(block_id, name, tool_input):
+    return SimpleNamespace(type="tool_use", id=block_id, name=name, input=tool_input)
+
+
+class FakeMessages:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def create(self, **kwargs):
+        self.requests.append(kwargs)
+        return self.responses.pop(0)
+
+
+def make_agent(responses, parallel_tools=False):
+    agent = AppointmentAgent.__new__(AppointmentAgent)
+    agent.client = SimpleNamespace(messages=FakeMessages(responses))
+    agent.conversation_history = []
+    agent.parallel_tools = parallel_tools
+    agent.system_prompt = "test"
+    agent.tools = []
+    agent.calls = []
+    lock = threading.Lock()
+
+    def process_tool_call(name, tool_input):
+        with lock:
+            agent.calls.append((name, dict(tool_input)))
+        return f"result of {name} {tool_input}"
+
+    agent.process_tool_call = process_tool_call
+    return agent
+
+
+TOOL_TURN = SimpleNamespace(stop_reason="tool_use", content=[
+    text_block("Let me check."),
+    tool_block("t1", "check_availability", {"doctor_name": "Dr. Ahuja", "date": "2026-02-17"}),
+    tool_block("t2", "check_availability", {"doctor_name": "Dr. Sharma", "date": "2026-02-17"}),
+    tool_block("t3", "book_appointment", {"doctor_name": "Dr. Ahuja", "patient_name": "A",
+                                          "patient_email": "a@example.com",
+                                          "appointment_datetime": "2026-02-17T10:00:00"}),
+])
+FINAL_TURN = SimpleNamespace(stop_reason="end_turn", content=[text_block("Booked!")])
+
+
+def run_turn(parallel_tools):
+    agent = make_agent([TOOL_TURN, FINAL_TURN], parallel_tools=parallel_tools)
+    assert agent.chat("Book Dr. Ahuja tomorrow at 10") == "Booked!"
+    return agent
+
+
+def test_each_tool_use_executes_exactly_once():
+    for parallel_tools in (False, True):
+        agent = run_turn(parallel_tools)
+        names = sorted(name for name, _ in agent.calls)
+        assert names == ["book_appointment", "check_availability", "check_availability"]
+
+
+def test_tool_results_reuse_the_single_execution():
+    agent = run_turn(parallel_tools=True)
+    tool_results = agent.conversation_history[2]["content"]
+    assert [r["tool_use_id"] for r in tool_results] == ["t1", "t2", "t3"]
+    assert tool_results[0]["content"].startswith("result of check_availability")
+    assert tool_results[2]["content"].startswith("result of book_appointment")
+    # The second request to the model carries the assistant turn and its results
+    assert len(agent.client.messages.requests) == 2
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
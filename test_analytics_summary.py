@@ -0,0 +1,123 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from src.mcp_tools.analytics_tool import DayStats, SummaryReport, format_summary_report, summary_window
+from src.mcp_tools.hll import HyperLogLog
+
+
+def sketch(start, stop):
+    hll = HyperLogLog()
+    hll.update(f"patient{i}@example.com" for i in range(start, stop))
+    return hll.to_bytes()
+
+
+def test_summary_windows():
+    wednesday = date(2026, 2, 18)
+    assert summary_window("day", wednesday) == (date(2026, 2, 17), date(2026, 2, 19))
+    assert summary_window("week", wednesday) == (date(2026, 2, 16), date(2026, 2, 22))
+    assert summary_window("month", wednesday) == (date(2026, 2, 1), date(2026, 2, 28))
+    assert summary_window("month", date(2026, 12, 31)) == (date(2026, 12, 1), date(2026, 12, 31))
+
+
+def test_summary_is_one_query_with_every_day_filled_in(make_analytics):
+    today = datetime.now().date()
+    yesterday = today - timedelta(days=1)
+    tool = make_analytics([
+        {"day": yesterday, "appointments": 4, "unique_patients": 3, "cancelled": 1, "window_patients": 4},
+        {"day": today, "appointments": 2, "unique_patients": 2, "cancelled": 0, "window_patients": 4},
+    ])
+    report = tool.get_summary("ahuja")
+
+    assert len(tool.pool.statements) == 1
+    sql, params = tool.pool.statements[0]
+    assert "appointment_daily_rollup" in sql and params["doctor_id"] == 1
+    assert report.doctor == "Dr. Ahuja"
+    assert [stats.day for stats in report.days] == [yesterday, today, today + timedelta(days=1)]
+    assert report.day(yesterday).unique_patients == 3
+    assert report.day(today + timedelta(days=1)).appointments == 0
+    assert report.total_appointments == 6 and report.total_cancelled == 1
+    assert report.exact_patients and report.unique_patients == 4
+
+
+def test_month_summary_unions_sketches(make_analytics):
+    start = date(2026, 2, 1)
+    tool = make_analytics([
+        # Two doctors on the 2nd share patients 0-99; the 3rd brings 100 more
+        {"day": date(2026, 2, 2), "appointments": 250, "cancelled": 3,
+         "sketches": [sketch(0, 150), sketch(0, 100)]},
+        {"day": date(2026, 2, 3), "appointments": 200, "cancelled": 0,
+         "sketches": [sketch(100, 250)]},
+        {"day": date(2026, 2, 4), "appointments": 0, "cancelled": 2, "sketches": None},
+    ])
+    report = tool.get_summary(start_date="2026-02-01", end_date="2026-02-28")
+
+    sql, _ = tool.pool.statements[0]
+    assert "patient_sketch" in sql and "COUNT(DISTINCT" not in sql
+    assert not report.exact_patients and len(report.days) == 28
+    assert abs(report.day(date(2026, 2, 2)).unique_patients - 150) <= 3
+    assert abs(report.day(date(2026, 2, 3)).unique_patients - 150) <= 3
+    assert report.day(date(2026, 2, 4)).unique_patients == 0
+    assert abs(report.unique_patients - 250) <= 5
+    assert report.day(start).appointments == 0
+
+
+def test_unique_patients_exact_for_short_ranges(make_analytics):
+    tool = make_analytics([(42,)])
+    result = tool.get_unique_patients("2026-02-01", "2026-02-07", "ahuja")
+    assert result == {"start_date": "2026-02-01", "end_date": "2026-02-07", "doctor": "Dr. Ahuja",
+                      "unique_patients": 42, "exact": True}
+    assert "COUNT(DISTINCT" in tool.pool.statements[0][0]
+
+
+def test_unique_patients_estimated_for_long_ranges(make_analytics):
+    tool = make_analytics([(sketch(0, 400),), (sketch(300, 900),)])
+    result = tool.get_unique_patients("2026-01-01", "2026-03-31")
+    assert not result["exact"] and abs(result["unique_patients"] - 900) <= 20
+    assert tool.get_unique_patients("2026-01-01", "2026-01-02", "nobody") == {
+        "error": "Doctor nobody not found"
+    }
+
+
+def test_summary_unknown_doctor(make_analytics):
+    tool = make_analytics([])
+    try:
+        tool.get_summary("Dr. Nobody")
+    except ValueError as e:
+        assert "not found" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+    assert tool.pool.statements == []
+
+
+def test_default_report_keeps_three_day_layout():
+    today = date(2026, 2, 18)
+    report = SummaryReport(
+        start=today - timedelta(days=1), end=today + timedelta(days=1), today=today,
+        days=[DayStats(today - timedelta(days=1), 5, 4, 1), DayStats(today, 6, 6, 0),
+              DayStats(today + timedelta(days=1), 7, 7, 0)],
+        generated_at=datetime(2026, 2, 18, 8, 30),
+    )
+    text = format_summary_report(report)
+    assert "*Doctor:* All Doctors" in text
+    assert "*📅 Yesterday (2026-02-17)*\n- Unique patients visited: *4*" in text
+    assert "*📅 Today (2026-02-18)*\n- Scheduled appointments: *6*" in text
+    assert "*📅 Tomorrow (2026-02-19)*\n- Scheduled appointments: *7*" in text
+
+
+def test_week_report_lists_busy_days_and_totals():
+    monday = date(2026, 2, 16)
+    report = SummaryReport(
+        start=monday, end=monday + timedelta(days=6), today=monday, doctor="Dr. Ahuja",
+        window="week",
+        days=[DayStats(monday + timedelta(days=i), i, i, 0) for i in range(7)],
+    )
+    text = format_summary_report(report)
+    assert "*📅 2026-02-16 to 2026-02-22*" in text
+    assert "Mon Feb 16" not in text and "Tue Feb 17: *1* appointments" in text
+    assert "*Total:* 21 appointments, 0 cancelled, 0 unique patients" in text
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,168 @@
+from datetime import date, datetime, time
+
+import pytest
+
+from src.mcp_tools.database import MAX_SEARCH_DAYS, DatabaseTool
+from src.mcp_tools.doctor_directory import DoctorDirectory
+from src.mcp_tools.schedule_cache import ScheduleCache
+
+MONDAY = date(2026, 2, 16)
+TUESDAY = date(2026, 2, 17)
+
+
+@pytest.fixture
+def directory():
+    directory = DoctorDirectory(ttl_seconds=3600)
+    directory.refresh([
+        {"id": 1, "name": "Dr. Ahuja", "specialty": "Cardiology", "email": "ahuja@clinic.com"},
+        {"id": 2, "name": "Dr. Sharma", "specialty": "Pediatrics", "email": "sharma@clinic.com"},
+        {"id": 3, "name": "Dr. Mehta", "specialty": "Cardiology", "email": "mehta@clinic.com"},
+    ])
+    return directory
+
+
+@pytest.fixture
+def schedule():
+    """Ahuja: Mon 9-12; Mehta: Mon 9-11, Tue 10-11; Sharma: Mon 9-17"""
+    schedule = ScheduleCache(ttl_seconds=3600)
+    schedule.refresh([
+        {"doctor_id": 1, "day_of_week": 0, "start_time": time(9), "end_time": time(12)},
+        {"doctor_id": 3, "day_of_week": 0, "start_time": time(9), "end_time": time(11)},
+        {"doctor_id": 3, "day_of_week": 1, "start_time": time(10), "end_time": time(11)},
+        {"doctor_id": 2, "day_of_week": 0, "start_time": time(9), "end_time": time(17)},
+    ])
+    return schedule
+
+
+@pytest.fixture
+def make_tool(monkeypatch, make_pool, directory, schedule):
+    """DatabaseTool whose range query returns the given booking rows"""
+    monkeypatch.setenv("DB_LISTEN", "0")
+
+    def make(*bookings, pool=None):
+        pool = pool or make_pool([
+            {"doctor_id": doctor_id, "appointment_time": when, "duration_minutes": minutes}
+            for doctor_id, when, minutes in bookings
+        ])
+        return DatabaseTool(pool=pool, directory=directory, schedule=schedule)
+
+    return make
+
+
+def slots(result):
+    return [(slot["date"][:3], slot["time"], slot["doctor"]) for slot in result["slots"]]
+
+
+def test_specialty_search_orders_by_time_across_doctors_and_days(make_tool):
+    result = make_tool().find_available_slots("cardiology", "2026-02-16", "2026-02-17", limit=50)
+
+    assert result["available"] and result["doctors"] == ["Dr. Ahuja", "Dr. Mehta"]
+    assert (result["start_date"], result["end_date"]) == ("2026-02-16", "2026-02-17")
+    assert slots(result) == [
+        ("Mon", "09:00", "Dr. Ahuja"), ("Mon", "09:00", "Dr. Mehta"),
+        ("Mon", "09:30", "Dr. Ahuja"), ("Mon", "09:30", "Dr. Mehta"),
+        ("Mon", "10:00", "Dr. Ahuja"), ("Mon", "10:00", "Dr. Mehta"),
+        ("Mon", "10:30", "Dr. Ahuja"), ("Mon", "10:30", "Dr. Mehta"),
+        ("Mon", "11:00", "Dr. Ahuja"), ("Mon", "11:30", "Dr. Ahuja"),
+        ("Tue", "10:00", "Dr. Mehta"), ("Tue", "10:30", "Dr. Mehta"),
+    ]
+    first = result["slots"][0]
+    assert first == {"doctor": "Dr. Ahuja", "doctor_id": 1, "specialty": "Cardiology",
+                     "date": "Monday, February 16, 2026", "time": "09:00",
+                     "datetime": "2026-02-16T09:00:00"}
+
+
+def test_one_range_query_for_every_doctor(make_tool):
+    tool = make_tool()
+    tool.find_available_slots("cardiology", "2026-02-16", "2026-02-17")
+
+    assert len(tool.pool.statements) == 1
+    sql, (doctor_ids, start, end) = tool.pool.statements[0]
+    assert "doctor_id = ANY(%s)" in sql and "status != 'cancelled'" in sql
+    assert doctor_ids == [1, 3] and (start, end) == (MONDAY, date(2026, 2, 18))
+
+
+def test_limit_cuts_off_mid_day(make_tool):
+    result = make_tool().find_available_slots("cardiology", "2026-02-16", "2026-02-17", limit=3)
+    assert slots(result) == [
+        ("Mon", "09:00", "Dr. Ahuja"), ("Mon", "09:00", "Dr. Mehta"), ("Mon", "09:30", "Dr. Ahuja"),
+    ]
+
+
+def test_limit_is_capped_at_fifty(make_tool):
+    # Sharma has 16 free slots every Monday, 80 over the five Mondays in range
+    result = make_tool().find_available_slots("Dr. Sharma", "2026-02-16", "2026-03-17", limit=500)
+    assert len(result["slots"]) == 50
+    assert result["slots"][-1]["datetime"] == "2026-03-09T09:30:00"
+
+
+def test_booked_intervals_are_removed(make_tool):
+    # Only live bookings come back from the query; cancelled ones free their slot
+    tool = make_tool(
+        (1, datetime(2026, 2, 16, 9, 0), 30),
+        (1, datetime(2026, 2, 16, 10, 0), 60),
+        (3, datetime(2026, 2, 17, 10, 15), 30),
+    )
+    result = tool.find_available_slots("cardiology", "2026-02-16", "2026-02-17", limit=50)
+    by_doctor = {}
+    for day, at, doctor in slots(result):
+        by_doctor.setdefault((doctor, day), []).append(at)
+    assert by_doctor[("Dr. Ahuja", "Mon")] == ["09:30", "11:00", "11:30"]
+    assert ("Dr. Mehta", "Tue") not in by_doctor
+
+
+def test_nothing_free(make_tool):
+    tool = make_tool((1, datetime(2026, 2, 16, 9, 0), 180))
+    result = tool.find_available_slots("ahuja", "2026-02-16", "2026-02-17")
+    assert result["doctors"] == ["Dr. Ahuja"]
+    assert not result["available"] and result["slots"] == []
+
+
+def test_invalid_ranges_and_unknown_terms(make_tool):
+    tool = make_tool()
+    assert tool.find_available_slots("cardiology", "2026-02-17", "2026-02-16") == {
+        "error": "end_date must not be before start_date"
+    }
+    assert tool.find_available_slots("cardiology", "2026-02-16", "2026-03-19") == {
+        "error": f"Search range is limited to {MAX_SEARCH_DAYS} days"
+    }
+    assert tool.find_available_slots("dermatology", "2026-02-16") == {
+        "error": "No doctor or specialty matching dermatology"
+    }
+    assert tool.pool.statements == []
+
+
+def test_range_query_warms_the_booked_cache(make_tool):
+    tool = make_tool((1, datetime(2026, 2, 16, 9, 0), 30))
+    tool.find_available_slots("cardiology", "2026-02-16", "2026-02-17")
+
+    assert tool.booked_cache.get(1, MONDAY) == [(datetime(2026, 2, 16, 9), datetime(2026, 2, 16, 9, 30))]
+    assert tool.booked_cache.get(1, TUESDAY) == []
+    assert tool.booked_cache.get(3, TUESDAY) == []
+    assert tool.booked_cache.get(2, MONDAY) is None
+    assert tool.booked_cache.stats()["entries"] == 4
+
+    # check_availability is now served without another query
+    tool.check_availability("Dr. Ahuja", "2026-02-16")
+    assert len(tool.pool.statements) == 1
+
+
+def test_cache_is_not_warmed_when_a_change_lands_during_the_query(make_tool, make_pool):
+    class InvalidatingPool(make_pool):
+        """A booking by another node is notified while the range query runs"""
+
+        def execute(self, sql, params=None):
+            super().execute(sql, params)
+            self.tool.booked_cache.handle_notification("1:2026-02-16")
+
+    pool = InvalidatingPool()
+    tool = pool.tool = make_tool(pool=pool)
+    result = tool.find_available_slots("cardiology", "2026-02-16", "2026-02-17")
+
+    assert result["available"]
+    assert tool.booked_cache.stats()["entries"] == 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-v"]))
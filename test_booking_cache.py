@@ -0,0 +1,65 @@
+from datetime import date, datetime
+
+from src.mcp_tools.booking_cache import BookedIntervalCache
+
+DAY = date(2026, 2, 16)
+NINE = (datetime(2026, 2, 16, 9), datetime(2026, 2, 16, 9, 30))
+TEN = (datetime(2026, 2, 16, 10), datetime(2026, 2, 16, 10, 30))
+
+
+def test_hit_and_miss_counters():
+    cache = BookedIntervalCache()
+    assert cache.get(1, DAY) is None
+    cache.put(1, DAY, [NINE], cache.epoch())
+    assert cache.get(1, DAY) == [NINE]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_write_through_add_keeps_entry_current():
+    cache = BookedIntervalCache()
+    cache.put(1, DAY, [NINE], cache.epoch())
+    cache.add(1, DAY, TEN)
+    assert cache.get(1, DAY) == [NINE, TEN]
+
+
+def test_load_that_raced_an_invalidation_is_not_cached():
+    cache = BookedIntervalCache()
+    epoch = cache.epoch()
+    cache.invalidate(1, DAY)
+    cache.put(1, DAY, [], epoch)
+    assert cache.get(1, DAY) is None
+
+
+def test_load_that_raced_a_local_booking_is_not_cached():
+    cache = BookedIntervalCache()
+    epoch = cache.epoch()       # a reader starts loading the day
+    cache.add(1, DAY, TEN)      # a booking commits before it finishes
+    cache.put(1, DAY, [], epoch)
+    assert cache.get(1, DAY) is None
+
+
+def test_notification_payloads():
+    cache = BookedIntervalCache()
+    cache.put(1, DAY, [NINE], cache.epoch())
+    cache.put(2, DAY, [NINE], cache.epoch())
+    cache.handle_notification("1:2026-02-16")
+    assert cache.get(1, DAY) is None and cache.get(2, DAY) == [NINE]
+    cache.handle_notification("TRUNCATE")
+    assert cache.get(2, DAY) is None
+
+
+def test_lru_eviction():
+    cache = BookedIntervalCache(max_entries=2)
+    for doctor_id in (1, 2):
+        cache.put(doctor_id, DAY, [], cache.epoch())
+    cache.get(1, DAY)
+    cache.put(3, DAY, [], cache.epoch())
+    assert cache.get(2, DAY) is None
+    assert cache.get(1, DAY) == [] and cache.stats()["evictions"] == 1
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
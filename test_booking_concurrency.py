@@ -0,0 +1,64 @@
+"""Hammer one slot from many threads; the exclusion constraint, or the advisory-lock
+fallback used without it, must pick exactly one winner.
+
+Needs a migrated database (python -m src.mcp_tools.migrate) with Dr. Ahuja seeded.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+
+import pytest
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from src.mcp_tools.database import DatabaseTool
+from src.mcp_tools.db_pool import get_pool
+
+STRESS_EMAIL = "stress-booking@example.com"
+THREADS = 32
+
+
+@pytest.fixture(params=["constraint", "advisory lock"])
+def db(request):
+    try:
+        tool = DatabaseTool()
+        guarded = tool.has_overlap_constraint()
+    except Exception as e:
+        pytest.skip(f"database not reachable: {e}")
+    if request.param == "constraint" and not guarded:
+        pytest.skip("appointments_no_overlap is missing: migration 002 needs the btree_gist extension")
+    if request.param == "advisory lock":
+        tool._overlap_constraint = False
+    yield tool
+    with get_pool().connection() as conn, conn.cursor() as cur:
+        cur.execute("DELETE FROM appointments WHERE patient_email = %s", (STRESS_EMAIL,))
+
+
+def hammer(db, slots):
+    barrier = Barrier(len(slots))
+
+    def attempt(slot):
+        barrier.wait()
+        return db.book_appointment("Dr. Ahuja", "Stress Patient", STRESS_EMAIL, slot)
+
+    with ThreadPoolExecutor(max_workers=len(slots)) as executor:
+        return list(executor.map(attempt, slots))
+
+
+def test_same_slot_has_exactly_one_winner(db):
+    results = hammer(db, ["2099-03-02T10:00:00"] * THREADS)
+    winners = [r for r in results if r.get("success")]
+    assert len(winners) == 1
+    assert all(r.get("error") == "This time slot is already booked" for r in results if not r.get("success"))
+
+
+def test_overlapping_starts_have_exactly_one_winner(db):
+    # Starts 5 minutes apart all overlap a 30-minute booking at 11:00-11:30
+    slots = [f"2099-03-02T11:{5 * (i % 6):02d}:00" for i in range(THREADS)]
+    results = hammer(db, slots)
+    assert len([r for r in results if r.get("success")]) == 1
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,166 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.mcp_tools.calendar_tool import CalendarTool
+from src.mcp_tools.outbox import CALENDAR_EVENT, booking_batch_handlers
+from src.mcp_tools.rate_limit import TokenBucket
+
+
+class FakeCalendar(BaseHTTPRequestHandler):
+    """Google's batch endpoint, backed by an in-memory event table.
+
+    server.script maps a patient name to the statuses to answer with,
+    one per attempt, before finally creating the event.
+    """
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        if self.path != "/batch/calendar/v3":
+            self.send_error(404)
+            return
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.server.fail_batches:
+            self.server.fail_batches -= 1
+            self.send_error(503)
+            return
+        self.server.batches.append(0)
+
+        request = BytesParser().parsebytes(
+            f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body
+        )
+        boundary = "fake-batch-response"
+        out = []
+        for part in request.get_payload():
+            self.server.batches[-1] += 1
+            content_id = part["Content-ID"][1:-1]
+            payload = part.get_payload()
+            event = json.loads(payload.split("\n\n", 1)[1] if "\n\n" in payload else "{}")
+            status, result = self.insert(event)
+            out.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n\r\n"
+                f"{json.dumps(result)}\r\n"
+            )
+        data = ("".join(out) + f"--{boundary}--\r\n").encode()
+        self.send_response(200)
+        self.send_header("Content-Type", f"multipart/mixed; boundary={boundary}")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def insert(self, event):
+        name = event["summary"].split(": ", 1)[1]
+        script = self.server.script.get(name)
+        if script:
+            status = script.pop(0)
+            return status, {"error": {"code": status, "message": "scripted"}}
+        with self.server.lock:
+            if event["id"] in self.server.events:
+                return 409, {"error": {"code": 409, "message": "The requested identifier already exists."}}
+            self.server.events[event["id"]] = event
+        return 200, {"id": event["id"], "htmlLink": f"https://calendar/{event['id']}"}
+
+
+@contextmanager
+def fake_calendar():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeCalendar)
+    server.events, server.script, server.batches = {}, {}, []
+    server.fail_batches = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    saved = {key: os.environ.get(key) for key in ("GOOGLE_CALENDAR_ENDPOINT", "GOOGLE_CREDENTIALS_FILE")}
+    os.environ["GOOGLE_CALENDAR_ENDPOINT"] = f"http://127.0.0.1:{server.server_address[1]}/calendar/v3/"
+    os.environ["GOOGLE_CREDENTIALS_FILE"] = "/nonexistent.json"
+    try:
+        tool = CalendarTool()
+        tool.calendar_id = "clinic"
+        tool.limiter = TokenBucket(10_000, capacity=10_000)
+        yield server, tool
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        server.shutdown()
+        server.server_close()
+
+
+def appointments(count, start=1):
+    return [{
+        "appointment_id": i, "doctor_email": "ahuja@example.com",
+        "patient_name": f"Patient {i}", "patient_email": f"p{i}@example.com",
+        "start_time_iso": f"2026-02-16T{9 + i % 8:02d}:00:00",
+    } for i in range(start, start + count)]
+
+
+def test_groups_inserts_into_batches_of_fifty():
+    with fake_calendar() as (server, tool):
+        result = tool.create_events_batch(appointments(120))
+    assert server.batches == [50, 50, 20]
+    assert sorted(result["created"]) == list(range(1, 121)) and not result["failed"]
+    assert result["created"][7] == tool.event_id_for("appointment:7:calendar_event")
+
+
+def test_retries_rate_limited_items_and_maps_failures():
+    with fake_calendar() as (server, tool):
+        server.script = {"Patient 2": [429, 503], "Patient 3": [400]}
+        result = tool.create_events_batch(appointments(5), retry_base_seconds=0.01)
+    assert sorted(result["created"]) == [1, 2, 4, 5]
+    assert list(result["failed"]) == [3] and "400" in result["failed"][3]
+    assert server.batches == [5, 1, 1]
+
+
+def test_rerun_is_idempotent_and_whole_batch_failure_is_retried():
+    with fake_calendar() as (server, tool):
+        tool.create_events_batch(appointments(3))
+        server.fail_batches = 1
+        result = tool.create_events_batch(appointments(4), retry_base_seconds=0.01)
+        assert sorted(result["created"]) == [1, 2, 3, 4] and not result["failed"]
+        assert len(server.events) == 4
+
+
+def test_batches_respect_the_token_bucket():
+    with fake_calendar() as (server, tool):
+        now = [0.0]
+        tool.limiter = TokenBucket(50, capacity=50, clock=lambda: now[0],
+                                   sleep=lambda seconds: now.__setitem__(0, now[0] + seconds))
+        tool.create_events_batch(appointments(150), batch_size=50)
+    # 150 calls at 50/s with a burst of 50: the second and third batches wait a second each
+    assert abs(now[0] - 2.0) < 1e-6
+
+
+def test_outbox_failures_map_to_the_right_row():
+    # Two rows for appointment 42 and one with no appointment at all
+    def outbox_row(id, appointment_id, key, patient):
+        return {"id": id, "appointment_id": appointment_id, "kind": CALENDAR_EVENT,
+                "idempotency_key": key, "attempts": 1, "payload": {
+                    "doctor_email": "ahuja@example.com", "patient_name": patient,
+                    "patient_email": "p@example.com", "start_time_iso": "2026-02-16T09:00:00"}}
+
+    rows = [
+        outbox_row(10, 42, "appointment:42:calendar_event", "Asha"),
+        outbox_row(11, 42, "appointment:42:calendar_event:rescheduled", "Bina"),
+        outbox_row(12, None, "import:7:calendar_event", "Chand"),
+    ]
+    with fake_calendar() as (server, tool):
+        server.script = {"Bina": [400]}
+        failed = booking_batch_handlers(tool)[CALENDAR_EVENT](rows)
+        assert list(failed) == [11] and "400" in failed[11]
+        assert sorted(event["summary"] for event in server.events.values()) == [
+            "📅 Appointment: Asha", "📅 Appointment: Chand"
+        ]
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
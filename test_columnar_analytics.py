@@ -0,0 +1,141 @@
+import struct
+from datetime import datetime, timedelta
+
+from src.mcp_tools.columnar_analytics import STATUSES, ColumnarAnalytics, parse_copy_binary
+
+PG_EPOCH = datetime(2000, 1, 1)
+
+
+def copy_binary(rows):
+    """Encode rows the way Postgres writes COPY ... (FORMAT binary)"""
+    out = [b"PGCOPY\n\xff\r\n\0", struct.pack(">ii", 0, 0)]
+    for row in rows:
+        micros = (row["appointment_time"] - PG_EPOCH) // timedelta(microseconds=1)
+        status = STATUSES.index(row["status"]) if row["status"] in STATUSES else len(STATUSES) - 1
+        out.append(struct.pack(">hiiiiiqiiih", 5, 4, row["id"], 4, row["doctor_id"], 8, micros,
+                               4, row["duration_minutes"], 2, status))
+    out.append(struct.pack(">h", -1))
+    return b"".join(out)
+
+
+class TableColumnar(ColumnarAnalytics):
+    """Serves _copy from an in-memory appointments list through the real parser"""
+
+    def __init__(self, rows):
+        super().__init__()
+        self.rows = rows
+        self.copies = []
+
+    def _copy(self, where, params=()):
+        self.copies.append(where)
+        if where == "TRUE":
+            rows = self.rows
+        elif where.startswith("id > "):
+            rows = [r for r in self.rows if r["id"] > params[0]]
+        else:
+            keys = set(zip(params[1], params[2]))
+            rows = [r for r in self.rows if r["id"] <= params[0]
+                    and (r["doctor_id"], r["appointment_time"].date()) in keys]
+        return parse_copy_binary(copy_binary(sorted(rows, key=lambda r: r["id"])))
+
+
+def appointment(id, doctor_id, when, status="confirmed", duration=30):
+    return {"id": id, "doctor_id": doctor_id, "appointment_time": when,
+            "duration_minutes": duration, "status": status}
+
+
+MONDAY = datetime(2026, 2, 16)
+
+
+def sample_rows():
+    return [
+        appointment(1, 1, MONDAY.replace(hour=9)),
+        appointment(2, 1, MONDAY.replace(hour=9, minute=30), duration=60),
+        appointment(3, 2, MONDAY.replace(hour=14), status="cancelled"),
+        appointment(4, 2, (MONDAY + timedelta(days=2)).replace(hour=10), status="no_show"),
+        appointment(5, 2, (MONDAY + timedelta(days=2)).replace(hour=11)),
+        appointment(6, 1, (MONDAY + timedelta(days=4)).replace(hour=16), status="rescheduled"),
+    ]
+
+
+def test_parse_copy_binary():
+    columns = parse_copy_binary(copy_binary(sample_rows()))
+    assert columns["id"].tolist() == [1, 2, 3, 4, 5, 6]
+    assert columns["time"][1].item() == MONDAY.replace(hour=9, minute=30)
+    assert columns["duration"].tolist() == [30, 60, 30, 30, 30, 30]
+    assert [STATUSES[s] for s in columns["status"]] == [
+        "confirmed", "confirmed", "cancelled", "no_show", "confirmed", "other"
+    ]
+    assert len(parse_copy_binary(copy_binary([]))["id"]) == 0
+    for bad in (b"nope", copy_binary(sample_rows())[:-2], copy_binary(sample_rows())[:-5] + b"\xff\xff"):
+        try:
+            parse_copy_binary(bad)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("expected ValueError")
+
+
+def test_group_by_queries():
+    engine = TableColumnar(sample_rows())
+    assert engine.load() == 6
+
+    assert engine.count_by("doctor") == {1: 3, 2: 2}
+    assert engine.count_by("doctor", minutes=True) == {1: 120, 2: 60}
+    assert engine.count_by("day", doctor_id=2) == {"2026-02-18": 2}
+    assert engine.count_by("status") == {"confirmed": 3, "cancelled": 1, "no_show": 1, "other": 1}
+    assert engine.count_by("weekday", start_date="2026-02-17") == {2: 2, 4: 1}
+
+    hourly = engine.hourly_load()
+    assert hourly[9] == 2 and hourly[14] == 0 and sum(hourly) == 5
+    heatmap = engine.weekday_heatmap(end_date="2026-02-18")
+    assert heatmap[0][9] == 2 and heatmap[2][10] == 1 and sum(map(sum, heatmap)) == 4
+    assert engine.no_show_rates() == {1: 0.0, 2: 0.5}
+
+
+def test_refresh_appends_past_the_high_water_mark():
+    rows = sample_rows()
+    engine = TableColumnar(rows)
+    engine.load()
+    rows.append(appointment(7, 2, MONDAY.replace(hour=15)))
+    assert engine.refresh() == 1
+    assert engine.copies[-1].startswith("id > ")
+    assert engine.count_by("doctor") == {1: 3, 2: 3}
+    assert engine.stats()["high_water_mark"] == 7
+
+
+def test_refresh_rereads_notified_days():
+    rows = sample_rows()
+    engine = TableColumnar(rows)
+    engine.load()
+
+    # Cancel #1, move #5 from Wednesday to Friday, delete #2
+    rows[0]["status"] = "cancelled"
+    rows[4]["appointment_time"] = (MONDAY + timedelta(days=4)).replace(hour=11)
+    del rows[1]
+    for payload in ("1:2026-02-16", "2:2026-02-18", "2:2026-02-20"):
+        engine.handle_notification(payload)
+    assert engine.stats()["pending_days"] == 3
+
+    engine.refresh()
+    assert sorted(engine._columns.id.tolist()) == [1, 3, 4, 5, 6]
+    assert engine.count_by("doctor") == {1: 1, 2: 2}
+    assert engine.count_by("day", doctor_id=2) == {"2026-02-18": 1, "2026-02-20": 1}
+    assert engine.stats()["pending_days"] == 0
+
+
+def test_unparseable_notification_forces_full_reload():
+    rows = sample_rows()
+    engine = TableColumnar(rows)
+    engine.load()
+    rows[:] = rows[:2]
+    engine.handle_notification("TRUNCATE")
+    assert engine.refresh() == 2
+    assert engine.copies[-1] == "TRUE" and engine.stats()["rows"] == 2
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,213 @@
+import threading
+
+import psycopg2
+import pytest
+from psycopg2 import extensions
+
+from src.mcp_tools import db_pool
+from src.mcp_tools.analytics_tool import AnalyticsTool
+from src.mcp_tools.db_pool import ConnectionPool, PoolExhaustedError
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        if self.conn.server_gone:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+        self.conn.statements.append(sql)
+        self.conn.status = extensions.TRANSACTION_STATUS_INTRANS
+
+
+class FakeConnection:
+    """Just the psycopg2 connection surface ConnectionPool uses"""
+
+    def __init__(self):
+        self.closed = 0
+        self.server_gone = False
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def get_transaction_status(self):
+        return extensions.TRANSACTION_STATUS_UNKNOWN if self.closed else self.status
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+
+    def rollback(self):
+        if self.closed:
+            raise psycopg2.InterfaceError("connection already closed")
+        self.rollbacks += 1
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def connect(monkeypatch):
+    """Replaces psycopg2.connect; .opened lists every connection made, .fail makes it raise"""
+
+    def fake_connect(**kwargs):
+        if fake_connect.fail:
+            raise psycopg2.OperationalError("could not connect to server")
+        conn = FakeConnection()
+        fake_connect.opened.append(conn)
+        return conn
+
+    fake_connect.opened = []
+    fake_connect.fail = False
+    monkeypatch.setattr(psycopg2, "connect", fake_connect)
+    return fake_connect
+
+
+def test_connections_are_reused(connect):
+    pool = ConnectionPool(min_size=1, max_size=3)
+    for _ in range(5):
+        with pool.connection() as conn, conn.cursor() as cur:
+            cur.execute("SELECT 1")
+    assert len(connect.opened) == 1 and connect.opened[0].commits == 5
+    assert pool.stats() == {"size": 1, "idle": 1, "in_use": 0, "min_size": 1, "max_size": 3}
+
+
+def test_checkout_times_out_when_exhausted(connect):
+    pool = ConnectionPool(min_size=0, max_size=1, checkout_timeout=0.05)
+    held = pool.getconn()
+    with pytest.raises(PoolExhaustedError):
+        pool.getconn()
+    pool.putconn(held)
+    assert pool.getconn() is held
+
+
+def test_connection_returned_mid_transaction_is_rolled_back(connect):
+    pool = ConnectionPool(min_size=0, max_size=1)
+    conn = pool.getconn()
+    with conn.cursor() as cur:
+        cur.execute("UPDATE appointments SET status = 'cancelled'")
+    pool.putconn(conn)
+    assert conn.rollbacks == 1 and conn.status == extensions.TRANSACTION_STATUS_IDLE
+    assert pool.getconn() is conn
+
+
+def test_idle_connection_left_aborted_is_reset_on_checkout(connect):
+    pool = ConnectionPool(min_size=1, max_size=1)
+    conn = connect.opened[0]
+    conn.status = extensions.TRANSACTION_STATUS_INERROR
+    assert pool.getconn() is conn
+    assert conn.rollbacks == 1 and len(connect.opened) == 1
+
+
+def test_error_in_block_rolls_back_and_keeps_connection(connect):
+    pool = ConnectionPool(min_size=0, max_size=1)
+    with pytest.raises(ValueError):
+        with pool.connection() as conn, conn.cursor() as cur:
+            cur.execute("INSERT INTO appointments DEFAULT VALUES")
+            raise ValueError("bad input")
+    assert conn.rollbacks == 1 and conn.commits == 0 and not conn.closed
+    assert pool.stats()["idle"] == 1
+
+
+@pytest.mark.parametrize("error", [psycopg2.OperationalError, psycopg2.InterfaceError])
+def test_broken_connection_is_discarded(connect, error):
+    pool = ConnectionPool(min_size=0, max_size=1)
+    with pytest.raises(error):
+        with pool.connection() as conn:
+            raise error("connection lost")
+    assert conn.closed and pool.stats()["size"] == 0
+    assert pool.getconn() is connect.opened[1]
+
+
+def test_stale_connection_is_pinged_and_replaced(connect):
+    pool = ConnectionPool(min_size=1, max_size=1, health_check_interval=0)
+    stale = connect.opened[0]
+    stale.server_gone = True
+    fresh = pool.getconn()
+    assert fresh is connect.opened[1] and stale.closed
+    pool.putconn(fresh)
+
+    # A healthy idle connection is pinged and handed out again
+    assert pool.getconn() is fresh
+    assert fresh.statements == ["SELECT 1"] and fresh.status == extensions.TRANSACTION_STATUS_IDLE
+
+
+def test_recently_used_connection_is_not_pinged(connect):
+    pool = ConnectionPool(min_size=1, max_size=1, health_check_interval=60)
+    assert pool.getconn().statements == []
+
+
+def test_failed_connect_releases_its_slot(connect):
+    pool = ConnectionPool(min_size=0, max_size=1, checkout_timeout=0.05)
+    connect.fail = True
+    for _ in range(3):
+        with pytest.raises(psycopg2.OperationalError):
+            pool.getconn()
+    assert pool.stats()["size"] == 0
+
+    # Replacing a dead idle connection can fail too, without leaking the slot
+    connect.fail = False
+    conn = pool.getconn()
+    pool.putconn(conn)
+    conn.closed = 1
+    connect.fail = True
+    with pytest.raises(psycopg2.OperationalError):
+        pool.getconn()
+    assert pool.stats()["size"] == 0
+
+    connect.fail = False
+    assert pool.getconn() is connect.opened[-1]
+
+
+def test_close_wakes_waiting_checkouts(connect):
+    pool = ConnectionPool(min_size=0, max_size=1, checkout_timeout=30)
+    held = pool.getconn()
+    waiting = threading.Event()
+    errors = []
+
+    def checkout():
+        waiting.set()
+        try:
+            pool.getconn()
+        except PoolExhaustedError as e:
+            errors.append(str(e))
+
+    waiter = threading.Thread(target=checkout)
+    waiter.start()
+    assert waiting.wait(5)
+    pool.close()
+    waiter.join(5)  # a deadlock guard, far below checkout_timeout
+    assert not waiter.is_alive()
+    assert errors == ["Connection pool is closed"]
+
+    # A connection handed back after close() is closed, not pooled
+    pool.putconn(held)
+    assert held.closed and pool.stats()["size"] == 0
+
+
+def test_tool_close_leaves_shared_pool_open(connect, directory, schedule):
+    db_pool.close_pool()
+    shared = db_pool.get_pool()
+    try:
+        AnalyticsTool(directory=directory, schedule=schedule).close()
+        assert db_pool.get_pool() is shared and not shared._closed
+        with shared.connection() as conn:
+            pass
+    finally:
+        db_pool.close_pool()
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-v"]))
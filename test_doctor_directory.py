@@ -0,0 +1,49 @@
+from src.mcp_tools.doctor_directory import DoctorDirectory, normalize_name
+
+ROWS = [
+    {'id': 1, 'name': 'Dr. Ahuja', 'specialty': 'Cardiology', 'email': 'ahuja@clinic.com'},
+    {'id': 2, 'name': 'Dr. Sharma', 'specialty': 'Pediatrics', 'email': 'sharma@clinic.com'},
+    {'id': 3, 'name': 'Dr. Priya Sharma', 'specialty': 'Dermatology', 'email': 'priya@clinic.com'},
+]
+
+
+def make_directory():
+    directory = DoctorDirectory(ttl_seconds=3600)
+    directory.refresh(ROWS)
+    return directory
+
+
+def test_normalize_name():
+    assert normalize_name("Dr. Ahuja") == "ahuja"
+    assert normalize_name("  DOCTOR   ahuja ") == "ahuja"
+    assert normalize_name("dr.priya-sharma") == "priya sharma"
+
+
+def test_resolve_exact_and_normalized():
+    directory = make_directory()
+    assert directory.resolve("Dr. Ahuja")['id'] == 1
+    assert directory.resolve("dr ahuja")['id'] == 1
+    assert directory.resolve("AHUJA")['id'] == 1
+    assert directory.resolve("Sharma")['id'] == 2
+    assert directory.resolve("Priya Sharma")['id'] == 3
+
+
+def test_resolve_partial_and_typos():
+    directory = make_directory()
+    assert directory.resolve("Ahu")['id'] == 1
+    assert directory.resolve("Dr. Ahuha")['id'] == 1
+    assert directory.resolve("sharmaa")['id'] == 2
+    assert directory.resolve("Dr. Nobody") is None
+
+
+def test_match_specialty_or_name():
+    directory = make_directory()
+    assert [d['id'] for d in directory.match("cardio")] == [1]
+    assert [d['id'] for d in directory.match("Dr. Sharma")] == [2]
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,63 @@
+import email
+from email.header import decode_header, make_header
+
+from src.mcp_tools.email_templates import KINDS, MessageSkeleton, Template, get_templates
+
+VALUES = {
+    "patient_name": "Asha <script>alert(1)</script> & co",
+    "doctor_name": "Dr. Ahuja",
+    "appointment_time": "Monday, February 16, 2026 at 09:00 AM",
+}
+
+
+def parse(message: str):
+    parsed = email.message_from_string(message)
+    text, html = [part.get_payload(decode=True).decode("utf-8")
+                  for part in parsed.walk() if not part.is_multipart()]
+    return parsed, text, html
+
+
+def test_fields_and_partials_compile_once():
+    template = Template("<p>{{> body}}</p>", escape=True, partials={"body": "Hi {{ name }}!"})
+    assert template.fields == ["name"]
+    assert template.render({"name": "<Bo>"}) == "<p>Hi &lt;Bo&gt;!</p>"
+    assert Template("{{a}}{{b}}{{a}}").render({"a": 1, "b": 2}) == "121"
+
+
+def test_every_kind_has_the_same_fields():
+    for kind in KINDS:
+        assert get_templates()[kind].fields == sorted(VALUES)
+
+
+def test_html_is_escaped_and_text_is_not():
+    skeleton = MessageSkeleton("clinic@example.com")
+    template = get_templates()["confirmation"]
+    message = skeleton.build(template.subject.render(VALUES), "asha@example.com",
+                             template.text.render(VALUES), template.html.render(VALUES), "<id@x>")
+    parsed, text, html = parse(message)
+    assert "Asha <script>alert(1)</script> & co" in text
+    assert "<script>" not in html and "Asha &lt;script&gt;alert(1)&lt;/script&gt; &amp; co" in html
+    assert "border-radius: 16px;" in html  # CSS from the shared layout
+    assert str(make_header(decode_header(parsed["Subject"]))) == "✅ Appointment Confirmed - Dr. Ahuja"
+    assert parsed["Message-ID"] == "<id@x>" and parsed["To"] == "asha@example.com"
+    assert parsed.get_content_type() == "multipart/alternative"
+
+
+def test_header_injection_is_flattened():
+    skeleton = MessageSkeleton("clinic@example.com")
+    message = skeleton.build("Hi\r\nBcc: evil@example.com", "a@example.com", "t", "h")
+    parsed, _, _ = parse(message)
+    assert parsed["Bcc"] is None and parsed["Subject"] == "Hi Bcc: evil@example.com"
+
+
+def test_kinds_render_distinct_messages():
+    subjects = {get_templates()[kind].subject.render(VALUES) for kind in KINDS}
+    assert len(subjects) == len(KINDS)
+    assert "cancelled" in get_templates()["cancellation"].html.render(VALUES)
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
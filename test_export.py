@@ -0,0 +1,118 @@
+import io
+import csv
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from src.mcp_tools.export import COLUMNS, export_chunks, iter_batches
+
+START = datetime(2026, 2, 16)
+
+
+class ServerCursorPool:
+    """Pool whose named cursor hands out generated rows through fetchmany only"""
+
+    def __init__(self, count):
+        self.count = count
+        self.fetched = 0
+        self.fetches = []
+        self.cursor_names = []
+        self.params = None
+        self.released = False
+
+    @contextmanager
+    def connection(self):
+        try:
+            yield self
+        finally:
+            self.released = True
+
+    def cursor(self, name=None):
+        self.cursor_names.append(name)
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.params = params
+
+    def fetchall(self):
+        raise AssertionError("export must not fetchall")
+
+    def fetchmany(self, size):
+        batch = []
+        while len(batch) < size and self.fetched < self.count:
+            i = self.fetched
+            batch.append((i + 1, 1 + i % 3, f"Dr. {1 + i % 3}", f"Patient, {i}", f"p{i}@example.com",
+                          START + timedelta(minutes=30 * i), 30, "confirmed"))
+            self.fetched += 1
+        self.fetches.append(len(batch))
+        return batch
+
+
+def test_batches_stream_from_a_named_cursor():
+    pool = ServerCursorPool(25)
+    batches = iter_batches(START, START + timedelta(days=1), doctor_id=2,
+                           include_cancelled=False, chunk_size=10, pool=pool)
+    first = next(batches)
+    assert len(first) == 10 and pool.fetched == 10
+    assert pool.cursor_names == ["export_appointments"]
+    assert pool.params["doctor_id"] == 2 and pool.params["include_cancelled"] is False
+    assert [len(batch) for batch in batches] == [10, 5]
+    assert pool.released
+
+
+def test_csv_export_round_trips():
+    pool = ServerCursorPool(25)
+    chunks = list(export_chunks("csv", START, START + timedelta(days=1), chunk_size=10, pool=pool))
+    assert len(chunks) == 3
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+    assert tuple(rows[0]) == COLUMNS
+    assert len(rows) == 26
+    assert rows[1] == ["1", "1", "Dr. 1", "Patient, 0", "p0@example.com",
+                       "2026-02-16 00:00:00", "30", "confirmed"]
+
+
+def test_csv_export_of_nothing_is_just_the_header():
+    chunks = list(export_chunks("csv", START, START, pool=ServerCursorPool(0)))
+    assert b"".join(chunks).decode() == ",".join(COLUMNS) + "\n"
+
+
+def test_parquet_export_writes_a_row_group_per_chunk():
+    import pyarrow.parquet as pq
+
+    pool = ServerCursorPool(25)
+    chunks = list(export_chunks("parquet", START, START + timedelta(days=1), chunk_size=10, pool=pool))
+    data = io.BytesIO(b"".join(chunks))
+    parquet = pq.ParquetFile(data)
+    assert parquet.num_row_groups == 3 and parquet.metadata.num_rows == 25
+    table = parquet.read()
+    assert table.column_names == list(COLUMNS)
+    assert table.column("appointment_time")[24].as_py() == START + timedelta(minutes=30 * 24)
+
+
+def test_closing_early_releases_the_connection():
+    pool = ServerCursorPool(1000)
+    chunks = export_chunks("csv", START, START + timedelta(days=30), chunk_size=10, pool=pool)
+    next(chunks)
+    chunks.close()
+    assert pool.released and pool.fetched == 10
+
+
+def test_unknown_format():
+    try:
+        export_chunks("xlsx", START, START, pool=ServerCursorPool(0))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
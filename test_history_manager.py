@@ -0,0 +1,67 @@
+from google.genai import types
+
+from backend.app.services.history_manager import HistoryManager
+
+
+def turn(i: int, slots: int = 16):
+    return [
+        types.Content(role='user', parts=[types.Part(text=f"Check Dr. Ahuja on day {i}")]),
+        types.Content(role='model', parts=[types.Part(function_call=types.FunctionCall(
+            name='check_availability', args={'doctor_name': 'Dr. Ahuja', 'date': f'2026-02-{10 + i:02d}'}
+        ))]),
+        types.Content(role='user', parts=[types.Part(function_response=types.FunctionResponse(
+            name='check_availability',
+            response={'result': {'available': True, 'slots': [f"{9 + s // 2:02d}:{30 * (s % 2):02d}"
+                                                                for s in range(slots)]}}
+        ))]),
+        types.Content(role='model', parts=[types.Part(text=f"Dr. Ahuja has {slots} slots on day {i}.")]),
+    ]
+
+
+def history(turns: int):
+    return [content for i in range(turns) for content in turn(i)]
+
+
+def test_split_turns_groups_tool_exchanges_with_their_user_message():
+    turns = HistoryManager.split_turns(history(3))
+    assert [len(t) for t in turns] == [4, 4, 4]
+
+
+def test_compact_keeps_recent_turns_verbatim():
+    manager = HistoryManager(keep_recent_turns=2)
+    compacted = manager.compact(history(4))
+    assert compacted[-8:] == history(4)[-8:]
+    # Older turns become user text + one summary message
+    assert len(compacted) == 2 * 2 + 8
+    summary = compacted[1].parts[0].text
+    assert "[tool] check_availability(doctor_name=Dr. Ahuja, date=2026-02-10)" in summary
+    assert "16 total" in summary and "Dr. Ahuja has 16 slots on day 0." in summary
+    assert not any(part.function_call for content in compacted[:4] for part in content.parts)
+
+
+def test_compaction_is_idempotent():
+    manager = HistoryManager(keep_recent_turns=1)
+    once = manager.compact(history(5))
+    assert manager.compact(once) == once
+
+
+def test_build_prompt_enforces_budget_but_keeps_current_turn():
+    manager = HistoryManager(token_budget=300, keep_recent_turns=2)
+    contents, tokens = manager.build_prompt(history(20))
+    assert tokens <= 300 or len(HistoryManager.split_turns(contents)) == 1
+    assert contents[-4:] == history(20)[-4:]
+    assert contents[0].role == 'user' and contents[0].parts[0].text
+
+
+def test_prompt_size_stops_growing_with_session_length():
+    manager = HistoryManager(token_budget=2000, keep_recent_turns=3)
+    long = manager.build_prompt(history(200))[1]
+    longer = manager.build_prompt(history(400))[1]
+    assert long <= 2000 and longer <= 2000
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
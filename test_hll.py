@@ -0,0 +1,93 @@
+import random
+
+from src.mcp_tools.hll import HyperLogLog, register_for, union
+
+
+def emails(start, stop):
+    return [f"patient{i}@example.com" for i in range(start, stop)]
+
+
+def relative_error(sketch, exact):
+    return abs(sketch.count() - exact) / exact
+
+
+def test_small_counts_are_nearly_exact():
+    for n in (1, 10, 100, 1000):
+        sketch = HyperLogLog()
+        sketch.update(emails(0, n))
+        assert relative_error(sketch, n) < 0.02, (n, sketch.count())
+
+
+def test_error_is_bounded_for_large_counts():
+    # Standard error at p=12 is ~1.6%; allow four of them
+    for n in (10_000, 100_000):
+        sketch = HyperLogLog()
+        sketch.update(emails(0, n))
+        assert relative_error(sketch, n) < 0.065, (n, sketch.count())
+
+
+def test_duplicates_and_case_do_not_inflate():
+    sketch = HyperLogLog()
+    for _ in range(5):
+        sketch.update(emails(0, 500))
+    sketch.add("PATIENT1@EXAMPLE.COM")
+    assert relative_error(sketch, 500) < 0.02
+
+
+def test_union_matches_exact_distinct_across_days():
+    # 30 days x 5 doctors with a returning patient population
+    rng = random.Random(7)
+    population = emails(0, 20_000)
+    seen, sketches = set(), []
+    for _ in range(30 * 5):
+        day = rng.sample(population, 120)
+        seen.update(day)
+        sketch = HyperLogLog()
+        sketch.update(day)
+        sketches.append(sketch.to_bytes())
+    merged = union(sketches + [None])
+    assert relative_error(merged, len(seen)) < 0.065, (len(seen), merged.count())
+
+
+def test_merge_is_a_union():
+    a, b, both = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    a.update(emails(0, 3000))
+    b.update(emails(2000, 5000))
+    both.update(emails(0, 5000))
+    assert a.merge(b).to_bytes() == both.to_bytes()
+
+
+def test_serialization_round_trip_and_validation():
+    sketch = HyperLogLog()
+    sketch.update(emails(0, 50))
+    data = sketch.to_bytes()
+    assert len(data) == 4096
+    assert HyperLogLog.from_bytes(data).count() == sketch.count()
+    try:
+        HyperLogLog.from_bytes(b"\0" * 3000)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+    try:
+        HyperLogLog(10).merge(HyperLogLog(12))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_registers_match_the_sql_definition():
+    # md5('patient1@example.com') = aa19a90f26809966...; the top 12 bits pick
+    # the register, the rank is 1 + leading zeros of the remaining 52 bits
+    index, rank = register_for("patient1@example.com")
+    h = int("aa19a90f26809966", 16)
+    assert index == h >> 52
+    assert rank == 52 - (h & ((1 << 52) - 1)).bit_length() + 1
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,116 @@
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+from src.mcp_tools import outbox
+from src.mcp_tools.calendar_tool import CalendarTool
+from src.mcp_tools.outbox import OutboxWorker, booking_handlers, retry_delay
+
+
+def row(kind, attempts=1, **payload):
+    return {"id": 7, "kind": kind, "payload": payload, "attempts": attempts,
+            "idempotency_key": outbox.idempotency_key(42, kind)}
+
+
+def test_backoff_grows_and_caps():
+    delays = [retry_delay(n, base_seconds=5, cap_seconds=60, jitter=0) for n in range(1, 7)]
+    assert delays == [5, 10, 20, 40, 60, 60]
+    assert 4 <= retry_delay(1, base_seconds=5, jitter=0.2) <= 6
+
+
+def test_booking_rows_share_the_callers_cursor(make_pool):
+    cur = make_pool()
+    outbox.enqueue_booking_notifications(cur, 42, {
+        "doctor": "Dr. Ahuja", "doctor_email": "ahuja@example.com", "patient": "Asha",
+        "patient_email": "asha@example.com", "time": "2026-02-16T09:00:00",
+        "formatted_time": "Monday, February 16, 2026 at 09:00 AM",
+    })
+    keys = [params[3] for _, params in cur.statements]
+    assert keys == ["appointment:42:calendar_event", "appointment:42:confirmation_email"]
+    assert all("ON CONFLICT (idempotency_key) DO NOTHING" in sql for sql, _ in cur.statements)
+
+
+def test_success_failure_and_dead_letter(make_pool):
+    pool = make_pool()
+    calls = []
+
+    def flaky(payload, key):
+        calls.append(key)
+        if payload.get("fail"):
+            raise RuntimeError("smtp down")
+
+    worker = OutboxWorker({"ping": flaky}, pool=pool, max_attempts=3)
+    assert worker.process(row("ping"))
+    assert "SET status = 'done'" in pool.statements[-1][0]
+
+    assert not worker.process(row("ping", attempts=1, fail=True))
+    assert pool.statements[-1][1][:2] == ("pending", "smtp down")
+
+    assert not worker.process(row("ping", attempts=3, fail=True))
+    assert pool.statements[-1][1][0] == "dead"
+
+    assert not worker.process(row("unknown"))
+    assert "No handler" in pool.statements[-1][1][1]
+    assert calls == ["appointment:42:ping"] * 3
+
+
+def test_batch_handler_failures_map_back_to_rows(make_pool):
+    pool = make_pool()
+    handled = []
+
+    def batch(rows):
+        handled.append([r["id"] for r in rows])
+        return {rows[1]["id"]: "quota exceeded"}
+
+    worker = OutboxWorker({}, pool=pool, batch_handlers={"ping": batch})
+    rows = [dict(row("ping"), id=n) for n in (1, 2, 3)]
+    assert worker.process_batch("ping", rows) == 2
+    assert handled == [[1, 2, 3]]
+    outcomes = {params[-1]: sql for sql, params in pool.statements}
+    assert "'done'" in outcomes[1] and "'done'" in outcomes[3]
+    assert "last_error" in outcomes[2] and "'done'" not in outcomes[2]
+
+
+def test_confirmation_email_through_local_smtp(smtp_server, email_tool, make_calendar_tool):
+    handlers = booking_handlers(make_calendar_tool(lambda body: body), email_tool)
+    key = outbox.idempotency_key(42, outbox.CONFIRMATION_EMAIL)
+    handlers[outbox.CONFIRMATION_EMAIL]({
+        "to_email": "asha@example.com", "patient_name": "Asha",
+        "doctor_name": "Dr. Ahuja", "appointment_time": "Monday 09:00 AM",
+    }, key)
+
+    assert len(smtp_server.messages) == 1
+    assert smtp_server.messages[0]["Message-ID"] == email_tool.message_id_for(key)
+    assert smtp_server.messages[0]["To"] == "asha@example.com"
+
+
+def test_failed_email_is_retried(make_pool, make_email_tool, make_calendar_tool):
+    email_tool = make_email_tool(1)  # nothing listens on port 1
+    handler = booking_handlers(make_calendar_tool(lambda body: body), email_tool)[outbox.CONFIRMATION_EMAIL]
+    worker = OutboxWorker({outbox.CONFIRMATION_EMAIL: handler}, pool=make_pool())
+    assert not worker.process(row(outbox.CONFIRMATION_EMAIL, to_email="a@example.com",
+                                  patient_name="A", doctor_name="B", appointment_time="now"))
+
+
+def test_calendar_event_id_is_deterministic_and_conflict_is_success(make_calendar_tool):
+    seen = []
+
+    def insert(body):
+        seen.append(body["id"])
+        if len(seen) > 1:
+            raise HttpError(httplib2.Response({"status": 409}), b"duplicate")
+        return {"id": body["id"], "htmlLink": "https://calendar/event"}
+
+    handler = booking_handlers(make_calendar_tool(insert), None)[outbox.CALENDAR_EVENT]
+    payload = {"doctor_email": "ahuja@example.com", "patient_name": "Asha",
+               "patient_email": "asha@example.com", "start_time_iso": "2026-02-16T09:00:00"}
+    key = outbox.idempotency_key(42, outbox.CALENDAR_EVENT)
+    handler(payload, key)
+    handler(payload, key)  # a retry after a lost response must not double-book
+    assert seen[0] == seen[1] == CalendarTool.event_id_for(key)
+    assert set(seen[0]) <= set("0123456789abcdefghijklmnopqrstuv")
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,90 @@
+"""The rollup trigger must keep patient sketches in step with live bookings.
+
+Needs a migrated database (python -m src.mcp_tools.migrate) with Dr. Ahuja seeded.
+"""
+import pytest
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from src.mcp_tools.analytics_tool import AnalyticsTool
+from src.mcp_tools.db_pool import get_pool
+from src.mcp_tools.hll import HyperLogLog
+
+EMAIL_PATTERN = "sketch-test-%@example.com"
+DAY, NEXT_DAY = "2099-03-03", "2099-03-04"
+
+
+@pytest.fixture
+def db():
+    try:
+        tool = AnalyticsTool()
+        doctor_id, _ = tool._doctor("Dr. Ahuja")
+    except Exception as e:
+        pytest.skip(f"database not reachable: {e}")
+    yield tool, doctor_id
+    with get_pool().connection() as conn, conn.cursor() as cur:
+        cur.execute("DELETE FROM appointments WHERE patient_email LIKE %s", (EMAIL_PATTERN,))
+        cur.execute("DELETE FROM appointment_daily_rollup WHERE day IN (%s, %s)", (DAY, NEXT_DAY))
+
+
+def execute(sql, params):
+    with get_pool().connection() as conn, conn.cursor() as cur:
+        cur.execute(sql, params)
+
+
+def sketched(doctor_id, day):
+    """Estimated patients in the rollup sketch for one doctor-day"""
+    with get_pool().connection() as conn, conn.cursor() as cur:
+        cur.execute("""
+            SELECT patient_sketch FROM appointment_daily_rollup WHERE doctor_id = %s AND day = %s
+        """, (doctor_id, day))
+        row = cur.fetchone()
+    return HyperLogLog.from_bytes(bytes(row[0])).count() if row and row[0] else 0
+
+
+def test_sketches_forget_cancelled_moved_and_deleted_patients(db):
+    tool, doctor_id = db
+    for hour, name in ((10, "a"), (11, "b"), (12, "c"), (13, "d")):
+        execute("""
+            INSERT INTO appointments (doctor_id, patient_name, patient_email, appointment_time)
+            VALUES (%s, %s, %s, %s)
+        """, (doctor_id, name, f"sketch-test-{name}@example.com", f"{DAY} {hour}:00"))
+    assert sketched(doctor_id, DAY) == 4
+
+    execute("UPDATE appointments SET status = 'cancelled' WHERE patient_email = %s",
+            ("sketch-test-b@example.com",))
+    assert sketched(doctor_id, DAY) == 3
+
+    execute("UPDATE appointments SET appointment_time = appointment_time + INTERVAL '1 day' "
+            "WHERE patient_email = %s", ("sketch-test-c@example.com",))
+    assert (sketched(doctor_id, DAY), sketched(doctor_id, NEXT_DAY)) == (2, 1)
+
+    execute("UPDATE appointments SET patient_email = %s WHERE patient_email = %s",
+            ("sketch-test-e@example.com", "sketch-test-d@example.com"))
+    assert sketched(doctor_id, DAY) == 2
+
+    execute("DELETE FROM appointments WHERE patient_email = %s", ("sketch-test-a@example.com",))
+    assert sketched(doctor_id, DAY) == 1
+
+    # Exact and sketch-based counts agree on the same data
+    exact = tool.get_unique_patients(DAY, NEXT_DAY, "Dr. Ahuja", exact=True)
+    estimated = tool.get_unique_patients(DAY, NEXT_DAY, "Dr. Ahuja", exact=False)
+    assert exact["unique_patients"] == estimated["unique_patients"] == 2
+
+
+def test_cancelling_a_repeat_patient_keeps_them_counted(db):
+    _, doctor_id = db
+    for hour in (10, 11):
+        execute("""
+            INSERT INTO appointments (doctor_id, patient_name, patient_email, appointment_time)
+            VALUES (%s, 'Repeat', 'sketch-test-repeat@example.com', %s)
+        """, (doctor_id, f"{DAY} {hour}:00"))
+    execute("UPDATE appointments SET status = 'cancelled' WHERE patient_email = %s "
+            "AND appointment_time = %s", ("sketch-test-repeat@example.com", f"{DAY} 10:00"))
+    assert sketched(doctor_id, DAY) == 1
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-v"]))
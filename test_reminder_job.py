@@ -0,0 +1,112 @@
+from datetime import date, datetime
+
+import pytest
+
+from src.mcp_tools.rate_limit import TokenBucket
+from src.mcp_tools.reminder_job import ReminderJob
+
+DAY = date(2026, 2, 17)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class MemoryCheckpoints:
+    def __init__(self):
+        self.rows = {}
+
+    def load(self, job_name):
+        return dict(self.rows.get(job_name) or
+                    {"last_id": 0, "processed": 0, "failed": 0, "completed": False})
+
+    def save(self, job_name, last_id, processed, failed, completed=False):
+        self.rows[job_name] = {"last_id": last_id, "processed": processed,
+                               "failed": failed, "completed": completed}
+
+
+class FakeAnalytics:
+    """iter_appointments over an in-memory table; optionally dies mid-stream"""
+
+    def __init__(self, count, crash_after=None):
+        self.rows = [{
+            "id": i, "patient_name": f"Patient {i}", "patient_email": f"p{i}@example.com",
+            "doctor_name": "Dr. Ahuja", "doctor_id": 1,
+            "appointment_time": datetime(2026, 2, 17, 9) ,
+        } for i in range(1, count + 1)]
+        self.crash_after = crash_after
+
+    def iter_appointments(self, start_date, end_date=None, after_id=0, page_size=1000):
+        for n, row in enumerate(r for r in self.rows if r["id"] > after_id):
+            if self.crash_after is not None and n == self.crash_after:
+                raise ConnectionError("worker killed")
+            yield row
+
+
+def make_job(analytics, email_tool, checkpoints, **kwargs):
+    job = ReminderJob(analytics, email_tool, checkpoints, **kwargs)
+    clock = FakeClock()
+    job.limiter = TokenBucket(job.limiter.rate, clock=clock, sleep=clock.sleep)
+    return job, clock
+
+
+def test_token_bucket_throttles_to_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(10, capacity=2, clock=clock, sleep=clock.sleep)
+    waits = [bucket.acquire() for _ in range(12)]
+    assert waits[:2] == [0, 0]
+    assert abs(clock.now - 1.0) < 1e-9
+    assert not bucket.try_acquire()
+
+
+def test_sends_every_reminder_once_at_the_configured_rate(smtp_server, email_tool):
+    job, clock = make_job(FakeAnalytics(20), email_tool, MemoryCheckpoints(), rate=10)
+    result = job.run(DAY)
+    assert result["sent"] == 20 and result["completed"]
+    assert len(smtp_server.messages) == 20 and smtp_server.connections == 1
+    assert clock.now >= 1.0  # 20 messages at 10/s after a burst of 10
+    assert smtp_server.messages[0]["Message-ID"] == email_tool.message_id_for("appointment:1:reminder")
+
+
+def test_crash_resumes_without_duplicates(smtp_server, email_tool):
+    checkpoints = MemoryCheckpoints()
+    job, _ = make_job(FakeAnalytics(10, crash_after=4), email_tool, checkpoints, rate=100)
+    try:
+        job.run(DAY)
+    except ConnectionError:
+        pass
+    assert checkpoints.rows["reminders:2026-02-17"]["last_id"] == 4
+
+    job, _ = make_job(FakeAnalytics(10), email_tool, checkpoints, rate=100)
+    result = job.run(DAY)
+    assert result["resumed_from"] == 4 and result["sent"] == 6
+
+    # A completed day is not sent again
+    assert make_job(FakeAnalytics(10), email_tool, checkpoints)[0].run(DAY)["sent"] == 0
+    recipients = [message["To"] for message in smtp_server.messages]
+    assert recipients == [f"p{i}@example.com" for i in range(1, 11)]
+
+
+def test_outage_stops_run_and_keeps_checkpoint_before_streak(email_tool):
+    checkpoints = MemoryCheckpoints()
+    analytics = FakeAnalytics(10)
+    for row in analytics.rows[3:]:
+        row["patient_email"] = f"refused{row['id']}@example.com"
+    analytics.rows[1]["patient_email"] = "refused@example.com"
+    job, _ = make_job(analytics, email_tool, checkpoints, rate=100, max_consecutive_failures=3)
+    result = job.run(DAY)
+    assert result["error"] and result["sent"] == 2 and result["failed"] == 4
+    # Appointment 2 was a lone failure and is skipped; 4-6 will be retried
+    assert checkpoints.rows["reminders:2026-02-17"]["last_id"] == 3
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-v"]))
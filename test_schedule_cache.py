@@ -0,0 +1,52 @@
+from datetime import date, time
+
+from src.mcp_tools.schedule_cache import ScheduleCache
+
+AVAILABILITY = [
+    {'doctor_id': 1, 'day_of_week': 0, 'start_time': time(14), 'end_time': time(17)},
+    {'doctor_id': 1, 'day_of_week': 0, 'start_time': time(9), 'end_time': time(12)},
+    {'doctor_id': 1, 'day_of_week': 4, 'start_time': time(9), 'end_time': time(12)},
+]
+EXCEPTIONS = [
+    # Holiday on Monday 2026-02-23
+    {'doctor_id': 1, 'exception_date': date(2026, 2, 23), 'start_time': None, 'end_time': None},
+    # Short Friday 2026-02-20
+    {'doctor_id': 1, 'exception_date': date(2026, 2, 20), 'start_time': time(10), 'end_time': time(11)},
+]
+
+
+def make_schedule():
+    schedule = ScheduleCache(ttl_seconds=3600)
+    schedule.refresh(AVAILABILITY, EXCEPTIONS)
+    return schedule
+
+
+def test_multiple_weekly_intervals_sorted():
+    schedule = make_schedule()
+    assert schedule.hours_for(1, date(2026, 2, 16)) == [(time(9), time(12)), (time(14), time(17))]
+
+
+def test_exceptions_override_weekly_hours():
+    schedule = make_schedule()
+    assert schedule.hours_for(1, date(2026, 2, 23)) == []
+    assert schedule.hours_for(1, date(2026, 2, 20)) == [(time(10), time(11))]
+    assert schedule.hours_for(1, date(2026, 2, 27)) == [(time(9), time(12))]
+
+
+def test_unknown_doctor_or_day_has_no_hours():
+    schedule = make_schedule()
+    assert schedule.hours_for(1, date(2026, 2, 17)) == []
+    assert schedule.hours_for(99, date(2026, 2, 16)) == []
+
+
+def test_working_intervals_apply_time_preference():
+    schedule = make_schedule()
+    afternoon = schedule.working_intervals(1, date(2026, 2, 16), 'afternoon')
+    assert [(s.time(), e.time()) for s, e in afternoon] == [(time(14), time(17))]
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,122 @@
+import time
+
+import pytest
+from google.genai import types
+
+from backend.app.services.session_store import (
+    MemorySessionStore, PostgresSessionStore, SessionStore, SQLiteSessionStore,
+    serialize_history, deserialize_history
+)
+
+
+def sample_history(turns: int = 2):
+    history = []
+    for i in range(turns):
+        history.append(types.Content(role='user', parts=[types.Part(text=f"Check Dr. Ahuja on day {i}")]))
+        history.append(types.Content(role='model', parts=[types.Part(
+            function_call=types.FunctionCall(name='check_availability',
+                                             args={'doctor_name': 'Dr. Ahuja', 'date': '2026-02-17'}),
+            thought_signature=b'\x00\x01sig'
+        )]))
+        history.append(types.Content(role='user', parts=[types.Part(
+            function_response=types.FunctionResponse(
+                name='check_availability',
+                response={'result': {'available': True, 'slots': ['09:00', '09:30']}}
+            )
+        )]))
+    return history
+
+
+def test_serialization_round_trip():
+    history = sample_history()
+    assert deserialize_history(serialize_history(history)) == history
+
+
+def test_incomplete_store_fails_when_created():
+    class LoadOnly(SessionStore):
+        def load(self, session_id):
+            return []
+
+    with pytest.raises(TypeError, match="save"):
+        LoadOnly()
+
+
+def test_memory_store_enforces_byte_cap():
+    blob_size = len(serialize_history(sample_history()))
+    store = MemorySessionStore(max_bytes=blob_size * 3)
+    for i in range(5):
+        store.save(f"s{i}", sample_history())
+    assert store.stats()["sessions"] == 3
+    assert store.stats()["bytes"] <= blob_size * 3
+    assert store.load("s0") == [] and store.load("s4") == sample_history()
+
+
+def test_memory_store_lru_keeps_recently_loaded_sessions():
+    store = MemorySessionStore(max_sessions=2)
+    store.save("a", sample_history(1))
+    store.save("b", sample_history(1))
+    store.load("a")
+    store.save("c", sample_history(1))
+    assert store.load("b") == []
+    assert store.load("a") != []
+
+
+def test_memory_store_expires_idle_sessions():
+    store = MemorySessionStore(ttl_seconds=0.05)
+    store.save("a", sample_history(1))
+    time.sleep(0.06)
+    assert store.load("a") == []
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    worker_one = SQLiteSessionStore(path)
+    worker_two = SQLiteSessionStore(path)
+    worker_one.save("shared", sample_history())
+    assert worker_two.load("shared") == sample_history()
+    worker_two.delete("shared")
+    assert worker_one.load("shared") == []
+
+
+
+def test_sqlite_save_removes_expired_rows(tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"), ttl_seconds=60)
+    store.save("stale", sample_history(1))
+    with store._connection() as conn:
+        conn.execute("UPDATE agent_sessions SET updated_at = updated_at - 120")
+    store.save("fresh", sample_history(1))
+    assert store.stats()["sessions"] == 1 and store.load("fresh") != []
+
+
+@pytest.fixture
+def postgres_store():
+    """PostgresSessionStore on a migrated database (python -m src.mcp_tools.migrate)"""
+    from dotenv import load_dotenv
+    from src.mcp_tools.db_pool import get_pool
+
+    load_dotenv()
+    try:
+        store = PostgresSessionStore(ttl_seconds=60)
+        store.delete("test-stale")
+    except Exception as e:
+        pytest.skip(f"database not reachable: {e}")
+    yield store
+    with get_pool().connection() as conn, conn.cursor() as cur:
+        cur.execute("DELETE FROM agent_sessions WHERE session_id LIKE 'test-%'")
+
+
+def test_postgres_save_removes_expired_rows(postgres_store):
+    postgres_store.save("test-stale", sample_history(1))
+    with postgres_store.pool.connection() as conn, conn.cursor() as cur:
+        cur.execute("UPDATE agent_sessions SET updated_at = NOW() - INTERVAL '2 minutes' "
+                    "WHERE session_id = 'test-stale'")
+    postgres_store.save("test-fresh", sample_history(1))
+
+    with postgres_store.pool.connection() as conn, conn.cursor() as cur:
+        cur.execute("SELECT session_id FROM agent_sessions WHERE session_id LIKE 'test-%'")
+        assert cur.fetchall() == [("test-fresh",)]
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-v"]))
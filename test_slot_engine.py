@@ -0,0 +1,61 @@
+from datetime import datetime, date, time
+
+from src.mcp_tools import slot_engine
+
+DAY = date(2026, 2, 16)
+
+
+def at(hh, mm=0):
+    return datetime.combine(DAY, time(hh, mm))
+
+
+def test_merge_intervals():
+    merged = slot_engine.merge_intervals([(at(10), at(11)), (at(9), at(10)), (at(10, 30), at(12))])
+    assert merged == [(at(9), at(12))]
+
+
+def test_subtract_intervals():
+    free = slot_engine.subtract_intervals(
+        [(at(9), at(17))],
+        [(at(8), at(9, 30)), (at(12), at(13)), (at(16, 45), at(18))]
+    )
+    assert free == [(at(9, 30), at(12)), (at(13), at(16, 45))]
+
+
+def test_free_slots_matches_legacy_grid():
+    working = slot_engine.working_intervals(DAY, [(time(9), time(12))])
+    booked = slot_engine.booked_intervals([
+        {'appointment_time': at(10), 'duration_minutes': 30},
+        {'appointment_time': at(11, 15), 'duration_minutes': 30},
+    ])
+    slots = slot_engine.free_slots(working, booked)
+    assert [s.strftime('%H:%M') for s in slots] == ['09:00', '09:30', '10:30']
+
+
+def test_minute_level_hours_and_slot_length():
+    working = slot_engine.working_intervals(DAY, [(time(9, 15), time(10, 30))])
+    slots = slot_engine.free_slots(working, [], slot_minutes=20)
+    assert [s.strftime('%H:%M') for s in slots] == ['09:15', '09:35', '09:55']
+
+
+def test_time_preference_clips_working_hours():
+    hours = [(time(9), time(19))]
+    assert slot_engine.working_intervals(DAY, hours, 'morning') == [(at(9), at(12))]
+    assert slot_engine.working_intervals(DAY, hours, 'afternoon') == [(at(12), at(17))]
+    assert slot_engine.working_intervals(DAY, hours, 'evening') == [(at(17), at(19))]
+    assert slot_engine.working_intervals(DAY, hours, 'any') == [(at(9), at(19))]
+
+
+def test_is_free_detects_partial_overlap():
+    booked = [(at(10), at(10, 30)), (at(14), at(15))]
+    assert slot_engine.is_free(booked, at(9, 30), at(10))
+    assert not slot_engine.is_free(booked, at(10, 15), at(10, 45))
+    assert not slot_engine.is_free(booked, at(13, 45), at(14, 15))
+    assert slot_engine.is_free(booked, at(15), at(15, 30))
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
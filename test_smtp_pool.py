@@ -0,0 +1,57 @@
+import pytest
+
+from src.mcp_tools.smtp_pool import SMTPPool
+
+MESSAGE = "Subject: hi\r\n\r\nhello"
+
+
+def pool_for(server, **kwargs):
+    return SMTPPool("127.0.0.1", server.server_address[1], "clinic@example.com", "secret",
+                    starttls=False, **kwargs)
+
+
+def test_sessions_are_reused(smtp_server):
+    pool = pool_for(smtp_server)
+    for _ in range(5):
+        pool.send("clinic@example.com", ["a@example.com"], MESSAGE)
+    pool.close()
+    assert len(smtp_server.messages) == 5 and smtp_server.connections == 1
+
+
+def test_stale_session_is_replaced_after_noop(smtp_server):
+    smtp_server.drop_after = 1  # the server hangs up while the session sits idle
+    pool = pool_for(smtp_server, noop_after=0)
+    pool.send("clinic@example.com", ["a@example.com"], MESSAGE)
+    pool.send("clinic@example.com", ["a@example.com"], MESSAGE)
+    pool.close()
+    assert len(smtp_server.messages) == 2 and smtp_server.connections == 2
+    assert pool.stats()["reconnects"] == 1
+
+
+def test_send_many_survives_a_dropped_session(smtp_server):
+    smtp_server.drop_after = 3
+    pool = pool_for(smtp_server)
+    results = pool.send_many(
+        ("clinic@example.com", [f"p{i}@example.com"], MESSAGE) for i in range(7)
+    )
+    pool.close()
+    assert results == [None] * 7
+    assert len(smtp_server.messages) == 7 and smtp_server.connections == 3
+
+
+def test_send_many_reports_refused_recipients(smtp_server):
+    pool = pool_for(smtp_server)
+    results = pool.send_many([
+        ("clinic@example.com", ["ok@example.com"], MESSAGE),
+        ("clinic@example.com", ["refused@example.com"], MESSAGE),
+        ("clinic@example.com", ["ok2@example.com"], MESSAGE),
+    ])
+    pool.close()
+    assert results[0] is None and results[2] is None
+    assert results[1] is not None
+    assert len(smtp_server.messages) == 2 and smtp_server.connections == 1
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,71 @@
+import asyncio
+import threading
+import time
+
+from backend.app.services.tool_executor import ToolExecutor
+
+
+def make_tool(delay=0.01, barrier=None, gated=()):
+    """Fake tool that tracks concurrency; gated calls wait at the barrier before finishing"""
+    active = {"reads": 0, "max_reads": 0, "writes": 0, "max_writes": 0}
+    order = []
+    lock = threading.Lock()
+
+    def tool(name, args):
+        kind = "writes" if name == "book_appointment" else "reads"
+        with lock:
+            active[kind] += 1
+            active[f"max_{kind}"] = max(active[f"max_{kind}"], active[kind])
+        if (name, args["n"]) in gated:
+            barrier.wait()
+        time.sleep(delay)
+        with lock:
+            active[kind] -= 1
+            order.append((name, args["n"]))
+        return {"name": name, "n": args["n"]}
+
+    return tool, active, order
+
+
+CALLS = [
+    ("check_availability", {"n": 0}),
+    ("book_appointment", {"n": 1}),
+    ("check_availability", {"n": 2}),
+    ("book_appointment", {"n": 3}),
+    ("get_report", {"n": 4}),
+]
+
+
+def test_results_come_back_in_call_order():
+    tool, _, _ = make_tool()
+    results = ToolExecutor(max_workers=8).run_all(tool, CALLS)
+    assert [r["n"] for r in results] == [0, 1, 2, 3, 4]
+
+
+def test_reads_run_concurrently_and_writes_serially_in_order():
+    # Every read and the first write must all be in flight before any can
+    # finish, so a sequential executor breaks the barrier instead of passing.
+    # The timeout only guards against a deadlock.
+    gated = {("check_availability", 0), ("check_availability", 2), ("get_report", 4),
+             ("book_appointment", 1)}
+    barrier = threading.Barrier(len(gated), timeout=5)
+    tool, active, order = make_tool(barrier=barrier, gated=gated)
+    ToolExecutor(max_workers=8).run_all(tool, CALLS)
+    assert not barrier.broken
+    assert active["max_reads"] == 3
+    assert active["max_writes"] == 1
+    assert [n for name, n in order if name == "book_appointment"] == [1, 3]
+
+
+def test_async_path_matches_sync_path():
+    tool, active, _ = make_tool()
+    results = asyncio.run(ToolExecutor(max_workers=8).arun_all(tool, CALLS))
+    assert [r["n"] for r in results] == [0, 1, 2, 3, 4]
+    assert active["max_writes"] == 1
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"✅ {name}")
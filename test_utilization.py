@@ -0,0 +1,59 @@
+from datetime import datetime
+
+import pytest
+
+
+def bookings(*rows):
+    return [{"doctor_id": doctor_id, "appointment_time": when, "duration_minutes": minutes}
+            for doctor_id, when, minutes in rows]
+
+
+def test_utilization_per_doctor_and_day(make_analytics):
+    # Working hours come from the conftest schedule fixture
+    tool = make_analytics(bookings(
+        (1, datetime(2026, 2, 16, 9, 0), 30),
+        (1, datetime(2026, 2, 16, 9, 30), 30),
+        (1, datetime(2026, 2, 16, 11, 30), 60),   # runs 30 minutes into lunch
+        (1, datetime(2026, 2, 17, 10, 0), 30),
+        (2, datetime(2026, 2, 16, 16, 0), 30),
+    ))
+    result = tool.get_utilization("2026-02-16", "2026-02-17")
+
+    assert len(tool.pool.statements) == 1
+    assert [d["doctor"] for d in result["doctors"]] == ["Dr. Ahuja", "Dr. Sharma"]
+    ahuja, sharma = result["doctors"]
+    monday, tuesday = ahuja["days"]
+    assert monday == {"date": "2026-02-16", "booked_minutes": 90, "capacity_minutes": 420,
+                      "utilization": 21.4, "longest_free_minutes": 240}
+    assert tuesday == {"date": "2026-02-17", "booked_minutes": 30, "capacity_minutes": 180,
+                       "utilization": 16.7, "longest_free_minutes": 90}
+    assert (ahuja["booked_minutes"], ahuja["capacity_minutes"]) == (120, 600)
+    # Sharma does not work Tuesdays, so only Monday is listed
+    assert [d["date"] for d in sharma["days"]] == ["2026-02-16"]
+    assert sharma["days"][0]["longest_free_minutes"] == 420
+    assert result["utilization"] == round(100 * 150 / 1080, 1)
+
+
+def test_utilization_respects_exceptions_and_filters(make_analytics):
+    tool = make_analytics()
+    result = tool.get_utilization("2026-02-23", doctor_name="ahuja")
+    assert [d["doctor"] for d in result["doctors"]] == ["Dr. Ahuja"]
+    assert result["doctors"][0]["days"][0]["utilization"] == 0.0
+
+    leave = make_analytics().get_utilization("2026-02-23")
+    assert leave["doctors"][1]["days"] == [] and leave["doctors"][1]["utilization"] == 0.0
+
+
+def test_utilization_validates_input(make_analytics):
+    tool = make_analytics()
+    assert "error" in tool.get_utilization("2026-02-17", "2026-02-16")
+    assert "error" in tool.get_utilization("2026-01-01", "2026-12-31")
+    assert tool.get_utilization("2026-02-16", doctor_name="nobody") == {
+        "error": "Doctor nobody not found"
+    }
+    assert tool.pool.statements == []
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-v"]))